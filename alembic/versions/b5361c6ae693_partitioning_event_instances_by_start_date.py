@@ -0,0 +1,246 @@
+"""partitioning event_instances by start_date
+
+Revision ID: b5361c6ae693
+Revises: 1fae958b997a
+Create Date: 2026-10-19 18:05:31.394577
+
+"""
+
+from datetime import date
+from typing import Any, Dict, List, Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b5361c6ae693"
+down_revision: Union[str, None] = "1fae958b997a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# tables referencing event_instances, with the names of their foreign keys
+CHILD_TABLES = {
+    "attendance": "event_instance_id_fkey",
+    "event_instances_x_event_types": "event_instances_x_event_types_event_instance_id_fkey",
+    "event_tags_x_event_instances": "event_tags_x_event_instances_event_instance_id_fkey",
+}
+# months of partitions created ahead of today (see f3_data_models.partitions.MONTHS_AHEAD)
+MONTHS_AHEAD = 24
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _grants(conn, relation: str) -> List[str]:
+    rows = conn.execute(
+        sa.text(
+            """
+            SELECT CASE WHEN a.grantee = 0 THEN 'PUBLIC' ELSE a.grantee::regrole::text END, a.privilege_type
+            FROM pg_class c, aclexplode(c.relacl) a
+            WHERE c.oid = CAST(:relation AS regclass) AND a.grantee <> c.relowner
+            """
+        ),
+        {"relation": relation},
+    ).all()
+    return [f"GRANT {privilege} ON {relation} TO {grantee}" for grantee, privilege in rows]
+
+
+def _dependent_views(conn) -> List[Dict[str, Any]]:
+    """Views and materialized views built on event_instances, in creation order, with their indexes and grants."""
+    rows = conn.execute(
+        sa.text(
+            """
+            WITH RECURSIVE deps(oid, depth) AS (
+                SELECT r.ev_class, 1
+                FROM pg_depend d JOIN pg_rewrite r ON r.oid = d.objid
+                WHERE d.refobjid = 'event_instances'::regclass AND r.ev_class <> 'event_instances'::regclass
+                UNION
+                SELECT r.ev_class, deps.depth + 1
+                FROM deps JOIN pg_depend d ON d.refobjid = deps.oid JOIN pg_rewrite r ON r.oid = d.objid
+                WHERE r.ev_class <> deps.oid
+            )
+            SELECT c.oid::regclass::text, c.relkind, pg_get_viewdef(c.oid), max(deps.depth) AS depth
+            FROM deps JOIN pg_class c ON c.oid = deps.oid
+            GROUP BY c.oid, c.relkind
+            ORDER BY depth
+            """
+        )
+    ).all()
+    views = []
+    for name, relkind, definition, _ in rows:
+        indexes = conn.scalars(
+            sa.text("SELECT pg_get_indexdef(indexrelid) FROM pg_index WHERE indrelid = CAST(:name AS regclass)"),
+            {"name": name},
+        ).all()
+        views.append(
+            {
+                "name": name,
+                "kind": "MATERIALIZED VIEW" if relkind == "m" else "VIEW",
+                "definition": definition,
+                "indexes": indexes,
+                "grants": _grants(conn, name),
+            }
+        )
+    return views
+
+
+def _rebuild_event_instances(partitioned: bool) -> None:
+    """
+    Copy event_instances into a new table, partitioned by month of start_date or not, and swap it in with the same
+    indexes, foreign keys, triggers, grants and dependent views. Foreign keys referencing event_instances must be
+    dropped first.
+    """
+    conn = op.get_bind()
+    views = _dependent_views(conn)
+    indexes = conn.scalars(
+        sa.text(
+            "SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+            "WHERE indrelid = 'event_instances'::regclass AND NOT indisprimary"
+        )
+    ).all()
+    foreign_keys = conn.execute(
+        sa.text(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = 'event_instances'::regclass AND contype = 'f'"
+        )
+    ).all()
+    triggers = conn.scalars(
+        sa.text(
+            "SELECT pg_get_triggerdef(oid) FROM pg_trigger "
+            "WHERE tgrelid = 'event_instances'::regclass AND NOT tgisinternal"
+        )
+    ).all()
+    grants = _grants(conn, "event_instances")
+    columns = ", ".join(
+        conn.scalars(
+            sa.text(
+                "SELECT quote_ident(column_name) FROM information_schema.columns "
+                "WHERE table_schema = current_schema() AND table_name = 'event_instances' AND is_generated = 'NEVER' "
+                "ORDER BY ordinal_position"
+            )
+        ).all()
+    )
+    sequence = conn.scalar(sa.text("SELECT pg_get_serial_sequence('event_instances', 'id')"))
+
+    for view in reversed(views):
+        op.execute(f"DROP {view['kind']} IF EXISTS {view['name']};")
+
+    op.execute(
+        f"""
+        CREATE TABLE event_instances_rebuilt (
+            LIKE event_instances INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING CONSTRAINTS INCLUDING STORAGE
+        ){" PARTITION BY RANGE (start_date)" if partitioned else ""};
+        """
+    )
+    if partitioned:
+        # every month with events, and the coming months; the rest are created on demand
+        months = set(
+            conn.scalars(sa.text("SELECT DISTINCT date_trunc('month', start_date)::date FROM event_instances")).all()
+        )
+        current = date.today().replace(day=1)
+        months.update(_add_months(current, n) for n in range(MONTHS_AHEAD + 1))
+        for month in sorted(months):
+            op.execute(
+                f"CREATE TABLE event_instances_{month:%Y_%m} PARTITION OF event_instances_rebuilt "
+                f"FOR VALUES FROM ('{month}') TO ('{_add_months(month, 1)}');"
+            )
+    op.execute(f"INSERT INTO event_instances_rebuilt ({columns}) SELECT {columns} FROM event_instances;")
+
+    # the id sequence is owned by the old table, and would be dropped with it
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE;")
+    op.execute("DROP TABLE event_instances;")
+    op.execute("ALTER TABLE event_instances_rebuilt RENAME TO event_instances;")
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY event_instances.id;")
+    primary_key = "id, start_date" if partitioned else "id"
+    op.execute(f"ALTER TABLE event_instances ADD CONSTRAINT event_instances_pkey PRIMARY KEY ({primary_key});")
+    for index in indexes:
+        op.execute(index.replace(" ON ONLY ", " ON ") + ";")
+    for name, definition in foreign_keys:
+        op.execute(f"ALTER TABLE event_instances ADD CONSTRAINT {name} {definition};")
+    for trigger in triggers:
+        op.execute(trigger + ";")
+    for grant in grants:
+        op.execute(grant + ";")
+
+    for view in views:
+        op.execute(f"CREATE {view['kind']} {view['name']} AS {view['definition']}")
+        for statement in view["indexes"] + view["grants"]:
+            op.execute(statement + ";")
+
+
+def upgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    conn = op.get_bind()
+    # before 15, an update moving a row to another partition ran the delete action of foreign keys referencing it,
+    # so rescheduling an event instance into another month would delete its attendance
+    if conn.dialect.server_version_info < (15,):
+        raise RuntimeError("Partitioning event_instances requires PostgreSQL 15 or later")
+
+    # children carry the event instance's start_date, the second half of its key; it is filled in when not given
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION set_event_instance_start_date()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF NEW.start_date IS NULL OR (
+                TG_OP = 'UPDATE'
+                AND NEW.event_instance_id IS DISTINCT FROM OLD.event_instance_id
+                AND NEW.start_date IS NOT DISTINCT FROM OLD.start_date
+            ) THEN
+                SELECT start_date INTO NEW.start_date FROM event_instances WHERE id = NEW.event_instance_id;
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    for tbl, fkey in CHILD_TABLES.items():
+        op.add_column(tbl, sa.Column("start_date", sa.Date(), nullable=True))
+        # a backfill, not a change: don't bump `updated` or fill the change log
+        op.execute(f"ALTER TABLE {tbl} DISABLE TRIGGER USER;")
+        op.execute(f"""
+            UPDATE {tbl} AS c SET start_date = e.start_date
+            FROM event_instances AS e WHERE e.id = c.event_instance_id;
+        """)
+        op.execute(f"ALTER TABLE {tbl} ENABLE TRIGGER USER;")
+        op.alter_column(tbl, "start_date", nullable=False)
+        op.execute(f"""
+            CREATE TRIGGER set_event_instance_start_date_{tbl}
+            BEFORE INSERT OR UPDATE OF event_instance_id ON {tbl}
+            FOR EACH ROW EXECUTE FUNCTION set_event_instance_start_date();
+        """)
+        op.drop_constraint(fkey, tbl, type_="foreignkey")
+    op.create_index("idx_attendance_start_date", "attendance", ["start_date"], unique=False)
+
+    _rebuild_event_instances(partitioned=True)
+
+    for tbl, fkey in CHILD_TABLES.items():
+        op.create_foreign_key(
+            fkey,
+            tbl,
+            "event_instances",
+            ["event_instance_id", "start_date"],
+            ["id", "start_date"],
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        )
+    # ### end Alembic commands ###
+
+
+def downgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    for tbl, fkey in CHILD_TABLES.items():
+        op.drop_constraint(fkey, tbl, type_="foreignkey")
+
+    _rebuild_event_instances(partitioned=False)
+
+    op.drop_index("idx_attendance_start_date", table_name="attendance")
+    for tbl, fkey in CHILD_TABLES.items():
+        op.create_foreign_key(fkey, tbl, "event_instances", ["event_instance_id"], ["id"], ondelete="CASCADE")
+        op.execute(f"DROP TRIGGER IF EXISTS set_event_instance_start_date_{tbl} ON {tbl};")
+        op.drop_column(tbl, "start_date")
+    op.execute("DROP FUNCTION IF EXISTS set_event_instance_start_date();")
+    # ### end Alembic commands ###
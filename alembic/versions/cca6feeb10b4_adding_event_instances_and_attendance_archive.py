@@ -0,0 +1,67 @@
+"""adding event_instances and attendance archive
+
+Revision ID: cca6feeb10b4
+Revises: b5361c6ae693
+Create Date: 2026-10-19 18:09:50.272152
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "cca6feeb10b4"
+down_revision: Union[str, None] = "b5361c6ae693"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Same columns and types as the hot tables; LIKE leaves out defaults, keys, foreign keys and partitioning, and
+    # copies generated columns as plain ones
+    op.execute("CREATE TABLE event_instances_archive (LIKE event_instances)")
+    op.add_column(
+        "event_instances_archive",
+        sa.Column("event_type_ids", postgresql.ARRAY(sa.Integer()), server_default="{}", nullable=False),
+    )
+    op.add_column(
+        "event_instances_archive",
+        sa.Column("event_tag_ids", postgresql.ARRAY(sa.Integer()), server_default="{}", nullable=False),
+    )
+    op.add_column(
+        "event_instances_archive",
+        sa.Column("archived", sa.DateTime(), server_default=sa.text("timezone('utc', now())"), nullable=False),
+    )
+    op.create_primary_key("event_instances_archive_pkey", "event_instances_archive", ["id"])
+    op.create_index(
+        "idx_event_instances_archive_org_id_start_date",
+        "event_instances_archive",
+        ["org_id", "start_date"],
+        unique=False,
+    )
+    op.create_index("idx_event_instances_archive_start_date", "event_instances_archive", ["start_date"], unique=False)
+
+    op.execute("CREATE TABLE attendance_archive (LIKE attendance)")
+    op.add_column(
+        "attendance_archive",
+        sa.Column("attendance_type_ids", postgresql.ARRAY(sa.Integer()), server_default="{}", nullable=False),
+    )
+    op.add_column(
+        "attendance_archive",
+        sa.Column("archived", sa.DateTime(), server_default=sa.text("timezone('utc', now())"), nullable=False),
+    )
+    op.create_primary_key("attendance_archive_pkey", "attendance_archive", ["id"])
+    op.create_index(
+        "idx_attendance_archive_event_instance_id", "attendance_archive", ["event_instance_id"], unique=False
+    )
+    op.create_index("idx_attendance_archive_user_id", "attendance_archive", ["user_id"], unique=False)
+    op.create_index("idx_attendance_archive_start_date", "attendance_archive", ["start_date"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_table("attendance_archive")
+    op.drop_table("event_instances_archive")
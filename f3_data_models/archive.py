@@ -0,0 +1,193 @@
+from datetime import date
+from typing import List, Optional, Type, Union
+
+from sqlalchemy import Column, Table, delete, func, insert, select
+from sqlalchemy import text as sql_text
+from sqlalchemy.sql.visitors import replacement_traverse
+
+from f3_data_models.models import (
+    Attendance,
+    Attendance_x_AttendanceType,
+    AttendanceArchive,
+    Base,
+    EventInstance,
+    EventInstanceArchive,
+    EventTag_x_EventInstance,
+    EventType_x_EventInstance,
+)
+from f3_data_models.partitions import drop_empty_partitions
+from f3_data_models.utils import DbManager, _notify_write, _require_write_backend, get_engine, session_scope
+
+
+def _id_array(column, key_column, key):
+    # The ids as an array, empty rather than null when there are none
+    return func.coalesce(select(func.array_agg(column)).where(key_column == key).scalar_subquery(), sql_text("'{}'"))
+
+
+def archive_event_instances(
+    before: date, batch_size: int = 500, drop_partitions: bool = True, backend: Optional[str] = None
+) -> int:
+    """
+    Move event instances that started before `before`, with their attendance, to event_instances_archive and
+    attendance_archive. Event types and tags, and attendance types, are kept as id arrays on the archived rows.
+
+    Each batch is copied and deleted in its own short transaction, so the job can be interrupted and resumed. The
+    batch's event instances are locked first, so no attendance can be added to them in between; event instances
+    locked by other sessions are skipped and picked up on the next run. Afterwards, the partitions of
+    event_instances left empty are dropped.
+
+    Args:
+        before (date): Event instances starting before this date are archived.
+        batch_size (int): The number of event instances moved per transaction.
+        drop_partitions (bool): Whether to drop the emptied partitions of event_instances.
+        backend (Optional[str]): The database backend to write to.
+
+    Returns:
+        int: The number of event instances archived.
+    """
+    _require_write_backend(backend)
+    batch = (
+        select(EventInstance.id)
+        .where(EventInstance.start_date < before)
+        .order_by(EventInstance.start_date, EventInstance.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    event_instance_columns = [c.name for c in EventInstance.__table__.columns]
+    attendance_columns = [c.name for c in Attendance.__table__.columns]
+
+    total = 0
+    while True:
+        with session_scope(backend=backend) as session:
+            ids = session.scalars(batch).all()
+            if ids:
+                session.execute(
+                    insert(AttendanceArchive).from_select(
+                        attendance_columns + ["attendance_type_ids"],
+                        select(
+                            *Attendance.__table__.columns,
+                            _id_array(
+                                Attendance_x_AttendanceType.attendance_type_id,
+                                Attendance_x_AttendanceType.attendance_id,
+                                Attendance.id,
+                            ),
+                        ).where(Attendance.event_instance_id.in_(ids), Attendance.start_date < before),
+                    )
+                )
+                session.execute(
+                    insert(EventInstanceArchive).from_select(
+                        event_instance_columns + ["event_type_ids", "event_tag_ids"],
+                        select(
+                            *EventInstance.__table__.columns,
+                            _id_array(
+                                EventType_x_EventInstance.event_type_id,
+                                EventType_x_EventInstance.event_instance_id,
+                                EventInstance.id,
+                            ),
+                            _id_array(
+                                EventTag_x_EventInstance.event_tag_id,
+                                EventTag_x_EventInstance.event_instance_id,
+                                EventInstance.id,
+                            ),
+                        ).where(EventInstance.id.in_(ids), EventInstance.start_date < before),
+                    )
+                )
+                # Attendance and the type and tag associations are deleted by cascade
+                session.execute(
+                    delete(EventInstance).where(EventInstance.id.in_(ids), EventInstance.start_date < before)
+                )
+        total += len(ids)
+        if len(ids) < batch_size:
+            break
+    if total:
+        _notify_write(EventInstance, Attendance, EventInstanceArchive, AttendanceArchive)
+
+    engine = get_engine(backend=backend)
+    if drop_partitions and engine.dialect.name == "postgresql":
+        with engine.begin() as connection:
+            drop_empty_partitions(connection, EventInstance.__tablename__, before)
+    return total
+
+
+def archive_horizon(backend: Optional[str] = None) -> Optional[date]:
+    """The start date of the latest archived event instance, or None if none are archived."""
+    with session_scope(backend=backend) as session:
+        return session.scalar(select(func.max(EventInstanceArchive.start_date)))
+
+
+def _for_archive(condition, source: Table, archive: Table):
+    # The same condition on the archive table's columns of the same names
+    def swap(element):
+        if isinstance(element, Column) and element.table is source:
+            return archive.c[element.name]
+        return None
+
+    return replacement_traverse(getattr(condition, "expression", condition), {}, swap)
+
+
+def _find_across_tiers(
+    cls: Type[Base],
+    archive_cls: Type[Base],
+    start: date,
+    end: date,
+    filters: Optional[List],
+    include_archived: bool,
+    backend: Optional[str],
+) -> List:
+    filters = [cls.start_date >= start, cls.start_date < end, *(filters or [])]
+    records = list(DbManager.find_records(cls, filters, backend=backend))
+    if include_archived:
+        horizon = archive_horizon(backend=backend)
+        if horizon is not None and start <= horizon:
+            archive_filters = [_for_archive(f, cls.__table__, archive_cls.__table__) for f in filters]
+            records.extend(DbManager.find_records(archive_cls, archive_filters, backend=backend))
+    return sorted(records, key=lambda record: (record.start_date, record.id))
+
+
+def find_event_instances(
+    start: date,
+    end: date,
+    filters: Optional[List] = None,
+    include_archived: bool = True,
+    backend: Optional[str] = None,
+) -> List[Union[EventInstance, EventInstanceArchive]]:
+    """
+    Find the event instances starting in [start, end), reading the archive too when the range reaches back into it.
+
+    Args:
+        start (date): The first start date included.
+        end (date): The first start date excluded.
+        filters (Optional[List]): Further filters on EventInstance columns, e.g. `[EventInstance.org_id == 5]`. They
+            are applied to the archive's columns of the same names.
+        include_archived (bool): Whether to read archived event instances.
+        backend (Optional[str]): The database backend to read from.
+
+    Returns:
+        List[Union[EventInstance, EventInstanceArchive]]: The event instances, by start date and id.
+    """
+    return _find_across_tiers(EventInstance, EventInstanceArchive, start, end, filters, include_archived, backend)
+
+
+def find_attendance(
+    start: date,
+    end: date,
+    filters: Optional[List] = None,
+    include_archived: bool = True,
+    backend: Optional[str] = None,
+) -> List[Union[Attendance, AttendanceArchive]]:
+    """
+    Find the attendance at event instances starting in [start, end), reading the archive too when the range reaches
+    back into it.
+
+    Args:
+        start (date): The first start date included.
+        end (date): The first start date excluded.
+        filters (Optional[List]): Further filters on Attendance columns, e.g. `[Attendance.user_id == 5]`. They are
+            applied to the archive's columns of the same names.
+        include_archived (bool): Whether to read archived attendance.
+        backend (Optional[str]): The database backend to read from.
+
+    Returns:
+        List[Union[Attendance, AttendanceArchive]]: The attendance, by start date and id.
+    """
+    return _find_across_tiers(Attendance, AttendanceArchive, start, end, filters, include_archived, backend)
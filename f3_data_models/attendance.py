@@ -0,0 +1,180 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Set
+
+from sqlalchemy import delete, exists, func, insert, or_, select, tuple_, update
+from sqlalchemy.orm import aliased
+
+from f3_data_models.models import Attendance, Attendance_x_AttendanceType, AttendanceArchive, EventInstance
+from f3_data_models.utils import _notify_write, _require_write_backend, session_scope
+
+# The attendance type of PAX with no other role (see AttendanceType)
+PAX_TYPE_ID = 1
+# EventInstance counts that can be given to record_backblast
+COUNT_COLUMNS = ("pax_count", "fng_count")
+
+
+@dataclass
+class BackblastOutcome:
+    """
+    The changes made by recording a backblast.
+
+    Attributes:
+        event_instance_id (int): The ID of the event instance.
+        added (List[int]): The users whose attendance was added.
+        removed (List[int]): The users whose attendance was removed.
+        retyped (List[int]): The users whose attendance types changed.
+        pax_count (Optional[int]): The event instance's new pax_count.
+        fng_count (Optional[int]): The event instance's new fng_count.
+    """
+
+    event_instance_id: int
+    added: List[int] = field(default_factory=list)
+    removed: List[int] = field(default_factory=list)
+    retyped: List[int] = field(default_factory=list)
+    pax_count: Optional[int] = None
+    fng_count: Optional[int] = None
+
+
+def _roster(attendees: Sequence[int], types: Optional[Dict[int, Sequence[int]]]) -> Dict[int, Set[int]]:
+    """The attendance types of each user in the backblast, in the order given. Users without types are PAX."""
+    types = types or {}
+    return {user_id: set(types.get(user_id) or ()) or {PAX_TYPE_ID} for user_id in dict.fromkeys([*attendees, *types])}
+
+
+def record_backblast(
+    event_instance_id: int,
+    attendees: Sequence[int],
+    types: Optional[Dict[int, Sequence[int]]] = None,
+    counts: Optional[Dict[str, int]] = None,
+    backend: Optional[str] = None,
+) -> BackblastOutcome:
+    """
+    Make an event instance's actual (not planned) attendance match a submitted backblast, and recompute its counts,
+    in one transaction.
+
+    The roster is compared with the attendance already recorded, and only the differences are written: at most
+    one bulk delete and one bulk insert each for attendance and its attendance types, plus one update of the event
+    instance, whatever the size of the roster. Re-submitting the same backblast changes nothing but the counts.
+    Planned attendance is left untouched.
+
+    pax_count is recomputed as the number of users attending, and fng_count as the number of them attending for
+    the first time (with no earlier actual attendance, archived or not). Values in `counts` are used instead, e.g.
+    a pax_count that includes PAX who are not users.
+
+    Args:
+        event_instance_id (int): The ID of the event instance.
+        attendees (Sequence[int]): The IDs of the users who attended.
+        types (Optional[Dict[int, Sequence[int]]]): Attendance type IDs by user ID, e.g. `{12: [2]}` for a Q. Users
+            listed here attended, even if left out of `attendees`; users without types attended as PAX.
+        counts (Optional[Dict[str, int]]): Counts to record instead of the recomputed ones, by column ('pax_count'
+            or 'fng_count').
+        backend (Optional[str]): The database backend to write to.
+
+    Returns:
+        BackblastOutcome: The attendance added, removed and retyped, and the new counts.
+    """
+    _require_write_backend(backend)
+    counts = counts or {}
+    unknown = set(counts) - set(COUNT_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown counts: {', '.join(sorted(unknown))}")
+    roster = _roster(attendees, types)
+    outcome = BackblastOutcome(event_instance_id)
+
+    with session_scope(backend=backend) as session:
+        # Locked, so concurrent submissions for the same event instance are applied one after the other
+        start_date = session.scalar(
+            select(EventInstance.start_date).where(EventInstance.id == event_instance_id).with_for_update()
+        )
+        if start_date is None:
+            raise ValueError(f"Event instance {event_instance_id} not found")
+        # The event instance's attendance, filtered by start_date too so only its partition is read
+        of_instance = (
+            Attendance.event_instance_id == event_instance_id,
+            Attendance.start_date == start_date,
+            Attendance.is_planned.is_(False),
+        )
+
+        recorded: Dict[int, int] = {}
+        recorded_types: Dict[int, Set[int]] = {}
+        rows = session.execute(
+            select(Attendance.user_id, Attendance.id, Attendance_x_AttendanceType.attendance_type_id)
+            .outerjoin(Attendance_x_AttendanceType)
+            .where(*of_instance)
+        ).all()
+        for user_id, attendance_id, attendance_type_id in rows:
+            recorded[user_id] = attendance_id
+            types_of_user = recorded_types.setdefault(user_id, set())
+            if attendance_type_id is not None:
+                types_of_user.add(attendance_type_id)
+
+        outcome.removed = [user_id for user_id in recorded if user_id not in roster]
+        outcome.added = [user_id for user_id in roster if user_id not in recorded]
+        kept = [user_id for user_id in roster if user_id in recorded]
+        outcome.retyped = [user_id for user_id in kept if roster[user_id] != recorded_types[user_id]]
+
+        removed_ids = [recorded[user_id] for user_id in outcome.removed]
+        stale_types = [
+            (recorded[user_id], attendance_type_id)
+            for user_id in outcome.retyped
+            for attendance_type_id in recorded_types[user_id] - roster[user_id]
+        ]
+        if removed_ids or stale_types:
+            session.execute(
+                delete(Attendance_x_AttendanceType).where(
+                    or_(
+                        Attendance_x_AttendanceType.attendance_id.in_(removed_ids),
+                        tuple_(
+                            Attendance_x_AttendanceType.attendance_id, Attendance_x_AttendanceType.attendance_type_id
+                        ).in_(stale_types),
+                    )
+                )
+            )
+        if removed_ids:
+            session.execute(delete(Attendance).where(Attendance.id.in_(removed_ids), *of_instance))
+
+        if outcome.added:
+            added_ids = session.scalars(
+                insert(Attendance).returning(Attendance.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "event_instance_id": event_instance_id,
+                        "user_id": user_id,
+                        "is_planned": False,
+                        "start_date": start_date,
+                    }
+                    for user_id in outcome.added
+                ],
+            ).all()
+            recorded.update(zip(outcome.added, added_ids, strict=True))
+        links = [
+            {"attendance_id": recorded[user_id], "attendance_type_id": attendance_type_id}
+            for user_id in outcome.added + outcome.retyped
+            for attendance_type_id in sorted(roster[user_id] - recorded_types.get(user_id, set()))
+        ]
+        if links:
+            session.execute(insert(Attendance_x_AttendanceType), links)
+
+        # Counted in the database, after the writes above, within this transaction
+        earlier = aliased(Attendance)
+        first_time = ~exists().where(
+            earlier.user_id == Attendance.user_id,
+            earlier.start_date < start_date,
+            earlier.is_planned.is_(False),
+        ) & ~exists().where(
+            AttendanceArchive.user_id == Attendance.user_id,
+            AttendanceArchive.start_date < start_date,
+            AttendanceArchive.is_planned.is_(False),
+        )
+        pax_count = counts.get("pax_count", select(func.count()).where(*of_instance).scalar_subquery())
+        fng_count = counts.get("fng_count", select(func.count()).where(*of_instance, first_time).scalar_subquery())
+        outcome.pax_count, outcome.fng_count = session.execute(
+            update(EventInstance)
+            .where(EventInstance.id == event_instance_id, EventInstance.start_date == start_date)
+            .values(pax_count=pax_count, fng_count=fng_count)
+            .returning(EventInstance.pax_count, EventInstance.fng_count)
+            .execution_options(synchronize_session=False)
+        ).one()
+
+    _notify_write(EventInstance, Attendance, Attendance_x_AttendanceType)
+    return outcome
@@ -0,0 +1,235 @@
+import threading
+from typing import Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import select
+
+from f3_data_models.cache import CacheBackend, LRUCache
+from f3_data_models.models import Org, Permission, Role, Role_x_Permission, Role_x_User_x_Org
+from f3_data_models.utils import add_write_listener, remove_write_listener, session_scope
+
+# Writes to any of these tables can change someone's effective permissions
+AUTHORIZATION_TABLES = frozenset({"roles", "permissions", "roles_x_permissions", "roles_x_users_x_org", "orgs"})
+VERSION_TAG = "authorization"
+
+Grants = Dict[int, Tuple[FrozenSet[str], FrozenSet[str]]]
+
+
+class PermissionResolver:
+    """
+    Resolves a user's effective roles and permissions for an org. Grants made on an org are inherited by every
+    org below it (a region admin is also an admin of the region's AOs).
+
+    Each user's direct grants are loaded with a single query and the org tree is loaded once, so a check is a
+    handful of dictionary lookups. Everything is tagged with a version that is bumped whenever DbManager
+    writes to a role, permission or org table; with a shared `version_source` (e.g. a RedisCacheBackend) a
+    write in one process invalidates every process.
+
+    Args:
+        maxsize (int): The maximum number of users whose grants are kept in memory.
+        ttl (Optional[float]): Lifetime of a user's cached grants in seconds, as a backstop for writes that
+            bypass DbManager. None keeps them until invalidated.
+        version_source (Optional[CacheBackend]): Shared store for the invalidation version.
+        backend (Optional[str]): The database backend to read from.
+        listen_for_writes (bool): Whether to invalidate automatically on DbManager writes.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        ttl: Optional[float] = 600,
+        version_source: Optional[CacheBackend] = None,
+        backend: Optional[str] = None,
+        listen_for_writes: bool = True,
+    ):
+        self.version_source = version_source
+        self.backend = backend
+        self._grants = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._effective = LRUCache(maxsize=maxsize * 4, ttl=ttl)
+        self._local_version = 0
+        self._tree_version = None
+        self._parents: Dict[int, Optional[int]] = {}
+        self._children: Dict[int, Set[int]] = {}
+        self._lock = threading.Lock()
+        if listen_for_writes:
+            add_write_listener(self._on_write)
+
+    def close(self) -> None:
+        remove_write_listener(self._on_write)
+
+    def _on_write(self, tables: Set[str]) -> None:
+        if tables & AUTHORIZATION_TABLES:
+            self.invalidate()
+
+    def invalidate(self) -> None:
+        """Discard all cached grants and the org tree, here and (with a version_source) in every process."""
+        with self._lock:
+            self._local_version += 1
+        if self.version_source is not None:
+            self.version_source.bump_version(VERSION_TAG)
+
+    def _version(self) -> Tuple[int, int]:
+        shared = self.version_source.get_versions([VERSION_TAG])[0] if self.version_source is not None else 0
+        return self._local_version, shared
+
+    def _ensure_org_tree(self, version: Tuple[int, int]) -> None:
+        if self._tree_version == version:
+            return
+        with session_scope(backend=self.backend) as session:
+            rows = session.execute(select(Org.id, Org.parent_id)).all()
+        parents = dict(rows)
+        children: Dict[int, Set[int]] = {}
+        for org_id, parent_id in parents.items():
+            if parent_id is not None:
+                children.setdefault(parent_id, set()).add(org_id)
+        with self._lock:
+            self._parents, self._children, self._tree_version = parents, children, version
+
+    def _load_grants(self, user_id: int) -> Grants:
+        query = (
+            select(Role_x_User_x_Org.org_id, Role.name, Permission.name)
+            .join(Role, Role.id == Role_x_User_x_Org.role_id)
+            .outerjoin(Role_x_Permission, Role_x_Permission.role_id == Role_x_User_x_Org.role_id)
+            .outerjoin(Permission, Permission.id == Role_x_Permission.permission_id)
+            .where(Role_x_User_x_Org.user_id == user_id)
+        )
+        with session_scope(backend=self.backend) as session:
+            rows = session.execute(query).all()
+        roles: Dict[int, Set[str]] = {}
+        permissions: Dict[int, Set[str]] = {}
+        for org_id, role_name, permission_name in rows:
+            roles.setdefault(org_id, set()).add(role_name)
+            if permission_name is not None:
+                permissions.setdefault(org_id, set()).add(permission_name)
+        return {
+            org_id: (frozenset(role_names), frozenset(permissions.get(org_id, ())))
+            for org_id, role_names in roles.items()
+        }
+
+    def _user_grants(self, user_id: int, version: Tuple[int, int]) -> Grants:
+        cached = self._grants.get(user_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        grants = self._load_grants(user_id)
+        self._grants.set(user_id, (version, grants))
+        return grants
+
+    def _ancestors(self, org_id: int) -> Iterable[int]:
+        seen = set()
+        current: Optional[int] = org_id
+        while current is not None and current not in seen:
+            seen.add(current)
+            yield current
+            current = self._parents.get(current)
+
+    def _effective_grants(self, user_id: int, org_id: int) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+        version = self._version()
+        cached = self._effective.get((user_id, org_id))
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        self._ensure_org_tree(version)
+        grants = self._user_grants(user_id, version)
+        roles: Set[str] = set()
+        permissions: Set[str] = set()
+        for ancestor_id in self._ancestors(org_id):
+            if ancestor_id in grants:
+                roles |= grants[ancestor_id][0]
+                permissions |= grants[ancestor_id][1]
+        effective = (frozenset(roles), frozenset(permissions))
+        self._effective.set((user_id, org_id), (version, effective))
+        return effective
+
+    def effective_permissions(self, user_id: int, org_id: int) -> FrozenSet[str]:
+        """
+        Get the names of the permissions a user holds for an org, directly or inherited from a parent org.
+
+        Args:
+            user_id (int): The ID of the user.
+            org_id (int): The ID of the org.
+
+        Returns:
+            FrozenSet[str]: The permission names.
+        """
+        return self._effective_grants(user_id, org_id)[1]
+
+    def effective_roles(self, user_id: int, org_id: int) -> FrozenSet[str]:
+        """
+        Get the names of the roles a user holds for an org, directly or inherited from a parent org.
+
+        Args:
+            user_id (int): The ID of the user.
+            org_id (int): The ID of the org.
+
+        Returns:
+            FrozenSet[str]: The role names.
+        """
+        return self._effective_grants(user_id, org_id)[0]
+
+    def has_permission(self, user_id: int, org_id: int, permission: str) -> bool:
+        """
+        Check whether a user holds a permission for an org, directly or inherited from a parent org.
+
+        Args:
+            user_id (int): The ID of the user.
+            org_id (int): The ID of the org.
+            permission (str): The name of the permission.
+
+        Returns:
+            bool: True if the user holds the permission.
+        """
+        return permission in self._effective_grants(user_id, org_id)[1]
+
+    def has_role(self, user_id: int, org_id: int, role: str) -> bool:
+        """
+        Check whether a user holds a role for an org, directly or inherited from a parent org.
+
+        Args:
+            user_id (int): The ID of the user.
+            org_id (int): The ID of the org.
+            role (str): The name of the role.
+
+        Returns:
+            bool: True if the user holds the role.
+        """
+        return role in self._effective_grants(user_id, org_id)[0]
+
+    def permissions_by_org(self, user_id: int) -> Dict[int, FrozenSet[str]]:
+        """
+        Expand a user's grants down the org tree, e.g. to list every org the user can edit.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            Dict[int, FrozenSet[str]]: The effective permission names for every org the user has any grant on.
+        """
+        version = self._version()
+        self._ensure_org_tree(version)
+        grants = self._user_grants(user_id, version)
+        effective: Dict[int, Set[str]] = {}
+        visited: Set[int] = set()
+        stack = [(org_id, grant[1]) for org_id, grant in grants.items()]
+        while stack:
+            org_id, inherited = stack.pop()
+            current = effective.setdefault(org_id, set())
+            if org_id in visited and inherited <= current:
+                continue
+            visited.add(org_id)
+            current |= inherited
+            stack.extend((child_id, frozenset(current)) for child_id in self._children.get(org_id, ()))
+        return {org_id: frozenset(permissions) for org_id, permissions in effective.items()}
+
+
+_DEFAULT_RESOLVER: Optional[PermissionResolver] = None
+
+
+def get_permission_resolver() -> PermissionResolver:
+    """Get the process-wide PermissionResolver, creating it on first use."""
+    global _DEFAULT_RESOLVER
+    if _DEFAULT_RESOLVER is None:
+        _DEFAULT_RESOLVER = PermissionResolver()
+    return _DEFAULT_RESOLVER
+
+
+def has_permission(user_id: int, org_id: int, permission: str) -> bool:
+    """Check a permission using the process-wide PermissionResolver. See PermissionResolver.has_permission."""
+    return get_permission_resolver().has_permission(user_id, org_id, permission)
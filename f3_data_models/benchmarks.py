@@ -0,0 +1,214 @@
+"""
+Benchmarks that run against the configured database. Rows seeded by a benchmark are prefixed with 'benchmark:'
+and removed when it finishes. Point the connection environment variables at a scratch database before running.
+
+    python -m f3_data_models.benchmarks auth-sweep --rows 2000000
+    python -m f3_data_models.benchmarks queries --iterations 20000
+    python -m f3_data_models.benchmarks import-time
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import delete, select, text
+
+from f3_data_models.models import NextAuthVerificationToken, Org, Org_Type
+from f3_data_models.nextauth import sweep_expired
+from f3_data_models.utils import QUERY_REGISTRY, session_scope
+
+BENCHMARK_PREFIX = "benchmark:"
+# Drivers and clients that must only be imported when an engine for them is created
+LAZY_MODULES = (
+    "google.cloud.bigquery",
+    "google.cloud.sql.connector",
+    "pg8000",
+    "psycopg2",
+    "redis",
+    "sqlalchemy_bigquery",
+)
+# The median cold import time of f3_data_models.utils that tests/test_benchmarks.py enforces
+IMPORT_TIME_BUDGET_MS = 1500
+
+
+def _timed(fn: Callable, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _summary(durations: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": statistics.median(durations) * 1000,
+        "max_ms": max(durations) * 1000,
+    }
+
+
+def seed_expired_tokens(rows: int, backend: Optional[str] = None) -> None:
+    """Insert `rows` verification tokens that expired a day ago, server-side with generate_series."""
+    with session_scope(backend=backend) as session:
+        session.execute(
+            text(
+                "INSERT INTO auth_verification_tokens (identifier, token, expires) "
+                "SELECT :prefix || g, md5(g::text), timezone('utc', now()) - interval '1 day' "
+                "FROM generate_series(1, :rows) AS g"
+            ),
+            {"prefix": BENCHMARK_PREFIX, "rows": rows},
+        )
+
+
+def bench_auth_sweep(rows: int = 1_000_000, batch_size: int = 5000, backend: Optional[str] = None) -> Dict[str, float]:
+    """
+    Seed expired verification tokens and sweep them one batch at a time. The per-batch latency is the longest
+    any sign-in could wait on the sweeper's row locks.
+
+    Args:
+        rows (int): The number of expired tokens to seed.
+        batch_size (int): The sweeper batch size.
+        backend (Optional[str]): The database backend to use.
+
+    Returns:
+        Dict[str, float]: Seeding and sweeping times, throughput and batch latency.
+    """
+    _, seed_seconds = _timed(seed_expired_tokens, rows, backend=backend)
+    with session_scope(backend=backend) as session:
+        session.execute(text("ANALYZE auth_verification_tokens"))
+
+    durations = []
+    deleted = 0
+    while True:
+        count, seconds = _timed(sweep_expired, NextAuthVerificationToken, batch_size, max_batches=1, backend=backend)
+        durations.append(seconds)
+        deleted += count
+        if count < batch_size:
+            break
+    sweep_seconds = sum(durations)
+    return {
+        "rows": rows,
+        "deleted": deleted,
+        "seed_s": seed_seconds,
+        "sweep_s": sweep_seconds,
+        "rows_per_s": deleted / sweep_seconds if sweep_seconds else 0.0,
+        "batches": len(durations),
+        **_summary(durations),
+    }
+
+
+def bench_queries(iterations: int = 10_000, backend: Optional[str] = None) -> Dict[str, float]:
+    """
+    Compare a primary key lookup built per call, as DbManager.get did, with the QueryRegistry statement. Both run
+    in one session against the same row, so the difference is the Python-side cost of building and compiling.
+
+    Args:
+        iterations (int): The number of lookups of each kind.
+        backend (Optional[str]): The database backend to use.
+
+    Returns:
+        Dict[str, float]: CPU and wall time per lookup for both, the CPU saving and the compiled cache hit rate.
+    """
+    with session_scope(backend=backend) as session:
+        org_id = session.scalar(select(Org.id).limit(1))
+        seeded = org_id is None
+        if seeded:
+            org = Org(name=f"{BENCHMARK_PREFIX}org", org_type=Org_Type.region, is_active=False)
+            session.add(org)
+            session.flush()
+            org_id = org.id
+
+    def adhoc(session):
+        session.scalars(select(Org).filter(Org.id == org_id)).unique().one()
+
+    def registered(session):
+        QUERY_REGISTRY.execute(session, QUERY_REGISTRY.get_by_id(Org).name, id=org_id)
+
+    results: Dict[str, float] = {"iterations": iterations}
+    try:
+        with session_scope(backend=backend) as session:
+            for name, lookup in (("adhoc", adhoc), ("registry", registered)):
+                lookup(session)
+                QUERY_REGISTRY.reset_stats()
+                cpu, wall = time.process_time(), time.perf_counter()
+                for _ in range(iterations):
+                    lookup(session)
+                    session.expunge_all()
+                results[f"{name}_cpu_us"] = (time.process_time() - cpu) / iterations * 1e6
+                results[f"{name}_wall_us"] = (time.perf_counter() - wall) / iterations * 1e6
+        results["cpu_saved_pct"] = 100 * (1 - results["registry_cpu_us"] / results["adhoc_cpu_us"])
+        results["hit_rate"] = QUERY_REGISTRY.stats()["hit_rate"]
+    finally:
+        if seeded:
+            with session_scope(backend=backend) as session:
+                session.execute(delete(Org).where(Org.id == org_id))
+    return results
+
+
+def bench_import_time(runs: int = 5, module: str = "f3_data_models.utils") -> Dict[str, float]:
+    """
+    Time a cold import of the package in fresh interpreters with `python -X importtime`, and count the driver
+    modules (LAZY_MODULES) the import loaded. Needs no database.
+
+    Args:
+        runs (int): The number of interpreters to start.
+        module (str): The module to import.
+
+    Returns:
+        Dict[str, float]: The import time of `module` including its dependencies, and the number of driver
+            modules loaded.
+    """
+    check = f"import sys, {module}; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    durations = []
+    loaded = set()
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", check], capture_output=True, text=True, check=True
+        )
+        loaded.update(filter(None, proc.stdout.strip().split(",")))
+        # Lines look like "import time: self [us] | cumulative | imported package"
+        for line in proc.stderr.splitlines():
+            fields = [field.strip() for field in line.split("|")]
+            if len(fields) == 3 and fields[2] == module:
+                durations.append(int(fields[1]) / 1e6)
+    for name in sorted(loaded):
+        print(f"Imported eagerly: {name}")
+    return {"runs": runs, "drivers_loaded": len(loaded), **_summary(durations)}
+
+
+BENCHMARKS: Dict[str, Callable[[argparse.Namespace], Dict[str, float]]] = {
+    "auth-sweep": lambda args: bench_auth_sweep(rows=args.rows, batch_size=args.batch_size, backend=args.backend),
+    "import-time": lambda args: bench_import_time(runs=args.runs),
+    "queries": lambda args: bench_queries(iterations=args.iterations, backend=args.backend),
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m f3_data_models.benchmarks", description=__doc__.split("\n\n")[0])
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows to seed (default: 1000000)")
+    parser.add_argument("--iterations", type=int, default=10_000, help="Calls to time (default: 10000)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Batch size (default: 5000)")
+    parser.add_argument("--backend", default=None, help="Database backend (default: postgresql)")
+    parser.add_argument("--runs", type=int, default=5, help="Interpreters to start for import-time (default: 5)")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=IMPORT_TIME_BUDGET_MS,
+        help=f"Fail if the median import time exceeds this (import-time, default: {IMPORT_TIME_BUDGET_MS})",
+    )
+    args = parser.parse_args(argv)
+
+    results = BENCHMARKS[args.benchmark](args)
+    for key, value in results.items():
+        print(f"{key:>14}: {value:,.2f}" if isinstance(value, float) else f"{key:>14}: {value:,}")
+    if results.get("drivers_loaded"):
+        return 1
+    if args.budget_ms is not None and results.get("p50_ms", 0.0) > args.budget_ms:
+        print(f"Over budget: {results['p50_ms']:,.2f} ms > {args.budget_ms:,.2f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
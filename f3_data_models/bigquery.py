@@ -0,0 +1,238 @@
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Iterator, List, Optional, Tuple
+
+from sqlalchemy import column
+from sqlalchemy.sql.schema import Column
+from sqlalchemy.sql.visitors import replacement_traverse
+
+
+@dataclass
+class ReadStats:
+    """
+    What a BigQuery read requested and cost.
+
+    Attributes:
+        table (str): The table read.
+        selected_fields (List[str]): The projected columns; empty means all columns.
+        row_restriction (Optional[str]): The filter pushed down to the read, as BigQuery SQL.
+        streams (int): The number of read streams the server returned.
+        bytes_scanned (int): The estimated bytes scanned, which is what the read is billed on.
+        rows (int): The rows received so far.
+        batches (int): The Arrow record batches received so far.
+    """
+
+    table: str
+    selected_fields: List[str] = field(default_factory=list)
+    row_restriction: Optional[str] = None
+    streams: int = 0
+    bytes_scanned: int = 0
+    rows: int = 0
+    batches: int = 0
+
+
+class ArrowReadBackend:
+    """
+    Source of Arrow record batches for a projected, filtered table read. `read` returns the batches lazily,
+    with the estimated bytes scanned and the number of streams.
+    """
+
+    def read(
+        self, table: str, selected_fields: List[str], row_restriction: Optional[str], max_streams: int
+    ) -> Tuple[Iterator[Any], int, int]:
+        raise NotImplementedError
+
+
+class StorageReadBackend(ArrowReadBackend):
+    """
+    Reads through the BigQuery Storage Read API, which streams Arrow batches straight from table storage
+    instead of paging JSON rows through the REST API. Column projection and the row restriction are applied by
+    the server, so only selected columns are scanned and only matching rows are sent.
+
+    Args:
+        client: A `google.cloud.bigquery_storage.BigQueryReadClient`.
+        project (str): The project holding the dataset.
+        dataset (str): The dataset holding the tables.
+        billing_project (Optional[str]): The project billed for the read. Defaults to `project`.
+    """
+
+    def __init__(self, client, project: str, dataset: str, billing_project: Optional[str] = None):
+        self.client = client
+        self.project = project
+        self.dataset = dataset
+        self.billing_project = billing_project or project
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "StorageReadBackend":
+        """Read the dataset named by BIGQUERY_PROJECT and BIGQUERY_DATASET, as the bigquery backend does."""
+        from google.cloud.bigquery_storage import BigQueryReadClient
+
+        return cls(BigQueryReadClient(), os.environ["BIGQUERY_PROJECT"], os.environ["BIGQUERY_DATASET"], **kwargs)
+
+    def read(
+        self, table: str, selected_fields: List[str], row_restriction: Optional[str], max_streams: int
+    ) -> Tuple[Iterator[Any], int, int]:
+        from google.cloud.bigquery_storage import types
+
+        session = self.client.create_read_session(
+            parent=f"projects/{self.billing_project}",
+            read_session=types.ReadSession(
+                table=f"projects/{self.project}/datasets/{self.dataset}/tables/{table}",
+                data_format=types.DataFormat.ARROW,
+                read_options=types.ReadSession.TableReadOptions(
+                    selected_fields=selected_fields, row_restriction=row_restriction or ""
+                ),
+            ),
+            max_stream_count=max_streams,
+        )
+
+        def batches():
+            for stream in session.streams:
+                for page in self.client.read_rows(stream.name).rows(session).pages:
+                    yield page.to_arrow()
+
+        return batches(), session.estimated_total_bytes_scanned, len(session.streams)
+
+
+class DuckDBReadBackend(ArrowReadBackend):
+    """
+    Local stand-in for the Storage Read API, for tests and development. Tables are read from a DuckDB connection
+    under the models' table names. Bytes scanned are estimated as BigQuery bills them: the size of the selected
+    columns over the whole table, regardless of the row restriction.
+
+    Args:
+        connection: A `duckdb.DuckDBPyConnection`.
+        batch_size (int): The rows per record batch.
+    """
+
+    def __init__(self, connection, batch_size: int = 10000):
+        self.connection = connection
+        self.batch_size = batch_size
+
+    def read(
+        self, table: str, selected_fields: List[str], row_restriction: Optional[str], max_streams: int
+    ) -> Tuple[Iterator[Any], int, int]:
+        projection = ", ".join(f'"{name}"' for name in selected_fields) or "*"
+        scanned = self.connection.execute(f'SELECT {projection} FROM "{table}"').fetch_arrow_table().nbytes
+        where = f" WHERE {row_restriction}" if row_restriction else ""
+        # On its own cursor, so a later query on the connection does not invalidate the unconsumed reader
+        reader = (
+            self.connection.cursor()
+            .execute(f'SELECT {projection} FROM "{table}"{where}')
+            .fetch_record_batch(self.batch_size)
+        )
+        return iter(reader), scanned, 1
+
+
+def _restriction_dialect():
+    try:
+        from sqlalchemy_bigquery import BigQueryDialect
+    except ImportError:
+        # The DuckDB stand-in accepts the same unqualified, literal SQL
+        from sqlalchemy.dialects.postgresql import dialect as BigQueryDialect
+    # Rendered with literal values and never executed as a DB-API statement, so percent signs (e.g. in LIKE
+    # patterns) must not be escaped as they are for the pyformat paramstyle
+    return BigQueryDialect(paramstyle="named")
+
+
+def row_restriction(filters: Optional[List]) -> Optional[str]:
+    """
+    Render SQLAlchemy filter expressions as a Storage Read API row restriction: one SQL condition with literal
+    values and unqualified column names.
+
+    Args:
+        filters (Optional[List]): Filters as passed to `DbManager.find_records`, e.g. `[EventInstance.org_id == 5]`.
+
+    Returns:
+        Optional[str]: The restriction, or None without filters.
+    """
+    if not filters:
+        return None
+
+    def unqualify(element):
+        if isinstance(element, Column) and element.table is not None:
+            return column(element.name, type_=element.type)
+        return None
+
+    dialect = _restriction_dialect()
+    conditions = []
+    for condition in filters:
+        expression = replacement_traverse(getattr(condition, "expression", condition), {}, unqualify)
+        conditions.append(f"({expression.compile(dialect=dialect, compile_kwargs={'literal_binds': True})})")
+    return " AND ".join(conditions)
+
+
+class ArrowRead:
+    """
+    A streaming read. Iterating yields `pyarrow.RecordBatch` objects as they arrive; `stats` is updated as they
+    are consumed.
+    """
+
+    def __init__(self, batches: Iterator[Any], stats: ReadStats):
+        self._batches = batches
+        self.stats = stats
+
+    def __iter__(self) -> Iterator[Any]:
+        for batch in self._batches:
+            self.stats.rows += batch.num_rows
+            self.stats.batches += 1
+            yield batch
+
+    def to_arrow(self):
+        """Collect the remaining batches into a `pyarrow.Table`."""
+        import pyarrow
+
+        batches = list(self)
+        if not batches:
+            return pyarrow.table({})
+        return pyarrow.Table.from_batches(batches)
+
+
+_DEFAULT_BACKEND: Optional[ArrowReadBackend] = None
+
+
+def configure_arrow_backend(backend: Optional[ArrowReadBackend]) -> None:
+    """Set the backend used by `read_arrow` (or, with None, go back to the Storage Read API from the environment)."""
+    global _DEFAULT_BACKEND
+    _DEFAULT_BACKEND = backend
+
+
+def get_arrow_backend() -> ArrowReadBackend:
+    """Get the process-wide read backend, creating a StorageReadBackend from the environment on first use."""
+    global _DEFAULT_BACKEND
+    if _DEFAULT_BACKEND is None:
+        _DEFAULT_BACKEND = StorageReadBackend.from_env()
+    return _DEFAULT_BACKEND
+
+
+def read_arrow(
+    cls,
+    columns: Optional[List] = None,
+    filters: Optional[List] = None,
+    max_streams: int = 1,
+    backend: Optional[ArrowReadBackend] = None,
+) -> ArrowRead:
+    """
+    Stream a model's table from BigQuery as Arrow record batches, for analytics-sized reads that would be slow as
+    ORM objects through `DbManager.find_records(..., backend="bigquery")`.
+
+    Args:
+        cls: The model whose table is read.
+        columns (Optional[List]): Columns to read, as attributes or names. Defaults to all columns.
+        filters (Optional[List]): Filters pushed down to the read; see `row_restriction`.
+        max_streams (int): The maximum number of server streams. Batches from one stream keep table order.
+        backend (Optional[ArrowReadBackend]): The read backend. Defaults to `get_arrow_backend()`.
+
+    Returns:
+        ArrowRead: The batches, with the read's stats.
+    """
+    table = cls.__tablename__
+    selected_fields = [c if isinstance(c, str) else c.expression.name for c in columns or []]
+    restriction = row_restriction(filters)
+    batches, bytes_scanned, streams = (backend or get_arrow_backend()).read(
+        table, selected_fields, restriction, max_streams
+    )
+    stats = ReadStats(table, selected_fields, restriction, streams=streams, bytes_scanned=bytes_scanned)
+    logging.debug(f"BigQuery read of {table}: {bytes_scanned:,} bytes scanned, restriction {restriction!r}")
+    return ArrowRead(batches, stats)
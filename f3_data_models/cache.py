@@ -0,0 +1,286 @@
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Type
+
+_MISSING = object()
+# The number of distinct statement structures whose compiled SQL digest QueryCache keeps
+SQL_DIGEST_CACHE_SIZE = 512
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU mapping with an optional per-entry time-to-live.
+
+    Args:
+        maxsize (int): The maximum number of entries kept before the least recently used is evicted.
+        ttl (Optional[float]): The default lifetime of an entry in seconds. None means entries never expire.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[Optional[float], Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+            return default if entry is _MISSING else entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheBackend:
+    """
+    Storage interface for the query cache. Values are opaque bytes; invalidation works by bumping per-tag
+    version counters that are folded into every key, so stale entries are never read and simply age out.
+    """
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def get_versions(self, tags: List[str]) -> List[int]:
+        raise NotImplementedError
+
+    def bump_version(self, tag: str) -> int:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process cache backend with LRU and TTL eviction.
+
+    Args:
+        maxsize (int): The maximum number of cached results.
+        ttl (Optional[float]): The default lifetime of a cached result in seconds.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 300):
+        self._entries = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        self._entries.set(key, value, ttl=ttl)
+
+    def get_versions(self, tags: List[str]) -> List[int]:
+        return [self._versions.get(tag, 0) for tag in tags]
+
+    def bump_version(self, tag: str) -> int:
+        with self._lock:
+            version = self._versions.get(tag, 0) + 1
+            self._versions[tag] = version
+            return version
+
+    def clear(self) -> None:
+        self._entries.clear()
+        with self._lock:
+            self._versions.clear()
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache backend shared across processes through Redis. Tag versions live in Redis as counters, so a write in
+    one worker invalidates the cached reads of every other worker.
+
+    Args:
+        client: A redis-py compatible client (get, set with `ex`, mget, incr, delete, scan_iter).
+        prefix (str): The key prefix for all entries written by this backend.
+        ttl (Optional[float]): The default lifetime of a cached result in seconds.
+    """
+
+    def __init__(self, client, prefix: str = "f3:cache:", ttl: Optional[float] = 300):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisCacheBackend":
+        import redis
+
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        self.client.set(self.prefix + key, value, ex=None if ttl is None else max(1, int(ttl)))
+
+    def get_versions(self, tags: List[str]) -> List[int]:
+        if not tags:
+            return []
+        values = self.client.mget([f"{self.prefix}version:{tag}" for tag in tags])
+        return [int(v) if v is not None else 0 for v in values]
+
+    def bump_version(self, tag: str) -> int:
+        return int(self.client.incr(f"{self.prefix}version:{tag}"))
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=f"{self.prefix}*"):
+            self.client.delete(key)
+
+
+class LocalRedisClient:
+    """
+    Minimal in-memory stand-in for a redis-py client, covering the commands used by RedisCacheBackend.
+    Intended for tests and local development.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, tuple[Optional[float], bytes]] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._live(key)
+
+    def mget(self, keys: Iterable[str]) -> List[Optional[bytes]]:
+        with self._lock:
+            return [self._live(key) for key in keys]
+
+    def set(self, key: str, value, ex: Optional[int] = None) -> bool:
+        if not isinstance(value, bytes):
+            value = str(value).encode()
+        with self._lock:
+            self._data[key] = (None if ex is None else time.monotonic() + ex, value)
+        return True
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value = int(self._live(key) or 0) + 1
+            self._data[key] = (None, str(value).encode())
+            return value
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(self._data.pop(key, None) is not None for key in keys)
+
+    def scan_iter(self, match: str = "*"):
+        prefix = match.rstrip("*")
+        with self._lock:
+            keys = [key for key in self._data if key.startswith(prefix)]
+        yield from keys
+
+
+class QueryCache:
+    """
+    Result cache for DbManager read methods. Only models listed in `models` are cached; reads are keyed on the
+    backend, the compiled statement (filters and loader options included) and its bound parameters, and are
+    tagged with every table the statement touches. Writes through DbManager bump those tags.
+
+    Args:
+        models (Iterable[Type]): The models whose reads should be cached, typically slow-changing reference data.
+        backend (Optional[CacheBackend]): Where cached results are stored. Defaults to an in-process backend.
+        ttl (Optional[float]): The lifetime of a cached result in seconds, overriding the backend default.
+    """
+
+    def __init__(self, models: Iterable[Type], backend: Optional[CacheBackend] = None, ttl: Optional[float] = None):
+        self.models = set(models)
+        self.backend = backend or MemoryCacheBackend()
+        self.ttl = ttl
+        self._sql_digests = LRUCache(maxsize=SQL_DIGEST_CACHE_SIZE)
+        self.hits = 0
+        self.misses = 0
+
+    def is_cacheable(self, cls: Type) -> bool:
+        return cls in self.models
+
+    def _statement_digest(self, statement, dialect) -> str:
+        """
+        A digest of the statement and its bound parameter values. The SQL is only compiled the first time a statement
+        of the same structure (SQLAlchemy's cache key, which ignores parameter values) is seen in this process; the
+        digest of its text is reused after that, so keys still agree between processes sharing a backend.
+        """
+        cache_key = statement._generate_cache_key()
+        if cache_key is None:
+            compiled = statement.compile(dialect=dialect)
+            return hashlib.sha1(f"{compiled}|{sorted(compiled.params.items())!r}".encode()).hexdigest()
+        structure = (dialect.name, cache_key.key)
+        sql_digest = self._sql_digests.get(structure)
+        if sql_digest is None:
+            sql_digest = hashlib.sha1(str(statement.compile(dialect=dialect)).encode()).hexdigest()
+            self._sql_digests.set(structure, sql_digest)
+        params = sorted(cache_key._generate_param_dict().items())
+        return hashlib.sha1(f"{sql_digest}|{params!r}".encode()).hexdigest()
+
+    def _key(self, kind: str, backend: str, statement, dialect, tags: List[str]) -> str:
+        digest = self._statement_digest(statement, dialect)
+        versions = self.backend.get_versions(tags)
+        tag_part = ",".join(f"{tag}={version}" for tag, version in zip(tags, versions, strict=True))
+        return f"{backend}:{kind}:{tag_part}:{digest}"
+
+    def get_or_load(
+        self, kind: str, backend: str, statement, dialect, tags: Iterable[str], loader: Callable[[], Any]
+    ) -> Any:
+        key = self._key(kind, backend, statement, dialect, sorted(set(tags)))
+        cached = self.backend.get(key)
+        if cached is not None:
+            self.hits += 1
+            return pickle.loads(cached)
+        self.misses += 1
+        result = loader()
+        self.backend.set(key, pickle.dumps(result), ttl=self.ttl)
+        return result
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        for tag in set(tags):
+            self.backend.bump_version(tag)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
@@ -0,0 +1,181 @@
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import BigInteger, Text, cast, delete, func, select, tuple_
+
+from f3_data_models.models import ChangeLog, ChangeLogOffset
+from f3_data_models.replication import INCREMENTAL_TABLES
+from f3_data_models.utils import _require_write_backend, get_engine, notify_tables, session_scope
+
+# Tables whose changes are logged: those with `updated` triggers, less the auth tables, whose session and
+# verification tokens churn constantly and should not be copied into a log
+CAPTURED_TABLES = INCREMENTAL_TABLES
+
+
+@dataclass(frozen=True)
+class Change:
+    """
+    A change read from the change log. See ChangeLog for the fields.
+    """
+
+    id: int
+    tx_id: int
+    table_name: str
+    row_id: str
+    operation: str
+    diff: Optional[Dict[str, Any]]
+    changed: datetime
+
+
+def _committed_horizon():
+    # Every transaction with a lower id has finished, so the log below it can no longer grow
+    return cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger)
+
+
+class ChangeFeed:
+    """
+    Reads the change log in batches on behalf of a named consumer, whose offset is stored in change_log_offsets so
+    it survives restarts. Delivery is at least once: a batch is returned again until it is committed.
+
+    Only changes of finished transactions are read, so a transaction that commits late cannot be skipped: changes
+    are ordered by transaction id, and reads stop at the oldest transaction still running.
+
+    Args:
+        consumer (str): The consumer's name, identifying its offset.
+        tables (Optional[Iterable[str]]): Only read changes to these tables.
+        batch_size (int): The maximum number of changes per batch.
+        backend (Optional[str]): The database backend to use.
+    """
+
+    def __init__(
+        self,
+        consumer: str,
+        tables: Optional[Iterable[str]] = None,
+        batch_size: int = 1000,
+        backend: Optional[str] = None,
+    ):
+        self.consumer = consumer
+        self.tables = frozenset(tables) if tables is not None else None
+        self.batch_size = batch_size
+        self.backend = backend
+        self._offset: Optional[Tuple[int, int]] = None
+
+    @property
+    def offset(self) -> Tuple[int, int]:
+        """The (tx_id, change id) of the last committed change."""
+        if self._offset is None:
+            with session_scope(backend=self.backend) as session:
+                stored = session.get(ChangeLogOffset, self.consumer)
+                self._offset = (stored.tx_id, stored.change_id) if stored else (0, 0)
+        return self._offset
+
+    def poll(self) -> List[Change]:
+        """
+        Read the next batch after the committed offset, without committing it.
+
+        Returns:
+            List[Change]: Up to `batch_size` changes in (tx_id, id) order.
+        """
+        stmt = (
+            select(ChangeLog)
+            .where(tuple_(ChangeLog.tx_id, ChangeLog.id) > tuple_(*self.offset))
+            .order_by(ChangeLog.tx_id, ChangeLog.id)
+            .limit(self.batch_size)
+        )
+        if self.tables is not None:
+            stmt = stmt.where(ChangeLog.table_name.in_(self.tables))
+        if get_engine(backend=self.backend).dialect.name == "postgresql":
+            stmt = stmt.where(ChangeLog.tx_id < _committed_horizon())
+        with session_scope(backend=self.backend) as session:
+            return [
+                Change(row.id, row.tx_id, row.table_name, row.row_id, row.operation, row.diff, row.changed)
+                for row in session.scalars(stmt)
+            ]
+
+    def commit(self, changes: List[Change]) -> None:
+        """Store the offset after the last of `changes`."""
+        _require_write_backend(self.backend)
+        if not changes:
+            return
+        last = changes[-1]
+        with session_scope(backend=self.backend) as session:
+            session.merge(ChangeLogOffset(consumer=self.consumer, tx_id=last.tx_id, change_id=last.id))
+        self._offset = (last.tx_id, last.id)
+
+    def consume(self, handler: Callable[[List[Change]], None], max_batches: Optional[int] = None) -> int:
+        """
+        Pass batches to `handler`, committing each after the handler returns, until the log is drained.
+
+        Args:
+            handler (Callable[[List[Change]], None]): Called with each batch. If it raises, the batch is not
+                committed and is read again next time.
+            max_batches (Optional[int]): Stop after this many batches.
+
+        Returns:
+            int: The number of changes handled.
+        """
+        handled = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            changes = self.poll()
+            if not changes:
+                break
+            handler(changes)
+            self.commit(changes)
+            handled += len(changes)
+            batches += 1
+        return handled
+
+    def follow(
+        self, handler: Callable[[List[Change]], None], interval: float = 1.0, stop: Optional[threading.Event] = None
+    ) -> None:
+        """Consume continuously, checking for new changes every `interval` seconds, until `stop` is set."""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            self.consume(handler)
+            stop.wait(interval)
+
+
+def notify_changes(changes: List[Change]) -> None:
+    """
+    A ChangeFeed handler that invalidates this process's cached reads and calls its write listeners for the
+    changed tables, so caches follow writes made by other processes.
+    """
+    notify_tables({change.table_name for change in changes})
+
+
+def prune_change_log(
+    retention: timedelta = timedelta(days=7), batch_size: int = 10000, backend: Optional[str] = None
+) -> int:
+    """
+    Delete changes older than `retention` that every consumer has read, in bounded batches.
+
+    Args:
+        retention (timedelta): Changes are kept at least this long, so new consumers can start from recent history.
+        batch_size (int): The maximum number of rows deleted per transaction.
+        backend (Optional[str]): The database backend to write to.
+
+    Returns:
+        int: The number of changes deleted.
+    """
+    _require_write_backend(backend)
+    with session_scope(backend=backend) as session:
+        floor = session.execute(
+            select(ChangeLogOffset.tx_id, ChangeLogOffset.change_id)
+            .order_by(ChangeLogOffset.tx_id, ChangeLogOffset.change_id)
+            .limit(1)
+        ).first()
+    conditions = [ChangeLog.changed < datetime.now(timezone.utc).replace(tzinfo=None) - retention]
+    if floor is not None:
+        conditions.append(tuple_(ChangeLog.tx_id, ChangeLog.id) <= tuple_(*floor))
+    stmt = delete(ChangeLog).where(ChangeLog.id.in_(select(ChangeLog.id).where(*conditions).limit(batch_size)))
+
+    total = 0
+    while True:
+        with session_scope(backend=backend) as session:
+            deleted = session.execute(stmt).rowcount
+        total += deleted
+        if deleted < batch_size:
+            return total
@@ -0,0 +1,197 @@
+import threading
+import time
+from array import array
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select
+
+from f3_data_models.models import CodexReference
+from f3_data_models.utils import add_write_listener, session_scope
+
+DIRECTIONS = {"out", "in", "both"}
+
+
+def _csr(edges: List[Tuple[int, int]], size: int) -> Tuple[array, array]:
+    """Compressed sparse row adjacency: the neighbors of node i are targets[offsets[i]:offsets[i + 1]]."""
+    offsets = array("l", [0] * (size + 1))
+    for source, _ in edges:
+        offsets[source + 1] += 1
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+    targets = array("l", [0] * len(edges))
+    cursor = array("l", offsets[:-1])
+    for source, target in edges:
+        targets[cursor[source]] = target
+        cursor[source] += 1
+    return offsets, targets
+
+
+class CodexGraph:
+    """
+    Read-only graph of codex references (from_entry_id -> to_entry_id), held in compact CSR arrays for both
+    directions so neighbor and backlink lookups are slices rather than queries.
+
+    Args:
+        edges (Iterable[Tuple[int, int]]): (from_entry_id, to_entry_id) pairs. Duplicates are collapsed.
+    """
+
+    def __init__(self, edges: Iterable[Tuple[int, int]] = ()):
+        pairs = sorted(set(edges))
+        self.entry_ids = array("l", sorted({entry_id for pair in pairs for entry_id in pair}))
+        self._index: Dict[int, int] = {entry_id: i for i, entry_id in enumerate(self.entry_ids)}
+        indexed = [(self._index[source], self._index[target]) for source, target in pairs]
+        self._out = _csr(indexed, len(self.entry_ids))
+        self._in = _csr([(target, source) for source, target in indexed], len(self.entry_ids))
+        self.edge_count = len(pairs)
+
+    @classmethod
+    def from_database(cls, backend: Optional[str] = None) -> "CodexGraph":
+        """Load every reference with a single query."""
+        with session_scope(backend=backend) as session:
+            edges = session.execute(select(CodexReference.from_entry_id, CodexReference.to_entry_id)).all()
+        return cls((source, target) for source, target in edges)
+
+    def _slice(self, adjacency: Tuple[array, array], node: int) -> array:
+        offsets, targets = adjacency
+        return targets[offsets[node] : offsets[node + 1]]
+
+    def _adjacent(self, node: int, direction: str) -> Iterable[int]:
+        if direction in ("out", "both"):
+            yield from self._slice(self._out, node)
+        if direction in ("in", "both"):
+            yield from self._slice(self._in, node)
+
+    def references(self, entry_id: int) -> List[int]:
+        """The entries that an entry references."""
+        node = self._index.get(entry_id)
+        return [] if node is None else [self.entry_ids[i] for i in self._slice(self._out, node)]
+
+    def backlinks(self, entry_id: int) -> List[int]:
+        """The entries that reference an entry."""
+        node = self._index.get(entry_id)
+        return [] if node is None else [self.entry_ids[i] for i in self._slice(self._in, node)]
+
+    def bfs(self, entry_id: int, depth: int = 1, direction: str = "out") -> Dict[int, int]:
+        """
+        Breadth-first walk from an entry, e.g. for "related exercises".
+
+        Args:
+            entry_id (int): The starting entry.
+            depth (int): The maximum number of hops.
+            direction (str): 'out' follows references, 'in' follows backlinks, 'both' ignores direction.
+
+        Returns:
+            Dict[int, int]: The reachable entry IDs (excluding the start) mapped to their distance in hops.
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(
+                f"Unsupported direction '{direction}'. Supported directions: {', '.join(sorted(DIRECTIONS))}"
+            )
+        start = self._index.get(entry_id)
+        if start is None:
+            return {}
+        distances = {start: 0}
+        frontier = deque([start])
+        while frontier:
+            node = frontier.popleft()
+            if distances[node] >= depth:
+                continue
+            for neighbor in self._adjacent(node, direction):
+                if neighbor not in distances:
+                    distances[neighbor] = distances[node] + 1
+                    frontier.append(neighbor)
+        return {self.entry_ids[node]: distance for node, distance in distances.items() if node != start}
+
+    def shortest_path(self, from_entry_id: int, to_entry_id: int, direction: str = "out") -> Optional[List[int]]:
+        """
+        Find a shortest chain of references between two entries.
+
+        Args:
+            from_entry_id (int): The starting entry.
+            to_entry_id (int): The target entry.
+            direction (str): 'out', 'in' or 'both', as for `bfs`.
+
+        Returns:
+            Optional[List[int]]: The entry IDs along the path, both ends included, or None if unreachable.
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(
+                f"Unsupported direction '{direction}'. Supported directions: {', '.join(sorted(DIRECTIONS))}"
+            )
+        start, goal = self._index.get(from_entry_id), self._index.get(to_entry_id)
+        if start is None or goal is None:
+            return [from_entry_id] if from_entry_id == to_entry_id else None
+        previous = {start: start}
+        frontier = deque([start])
+        while frontier and goal not in previous:
+            node = frontier.popleft()
+            for neighbor in self._adjacent(node, direction):
+                if neighbor not in previous:
+                    previous[neighbor] = node
+                    frontier.append(neighbor)
+        if goal not in previous:
+            return None
+        path = [goal]
+        while path[-1] != start:
+            path.append(previous[path[-1]])
+        return [self.entry_ids[node] for node in reversed(path)]
+
+
+_GRAPHS: Dict[str, Tuple[CodexGraph, Tuple[object, ...], float]] = {}
+_STALE: Set[str] = set()
+_LOCK = threading.Lock()
+
+
+def _mark_stale(tables: Set[str]) -> None:
+    if "codex_references" in tables:
+        with _LOCK:
+            _STALE.update(_GRAPHS)
+
+
+add_write_listener(_mark_stale)
+
+
+def _fingerprint(backend: Optional[str]) -> Tuple[object, ...]:
+    # max(updated) is bumped by a trigger on update (migration dcd1bb4f6479); the id sums also catch a retarget
+    # committed late by a transaction that started before the latest write
+    with session_scope(backend=backend) as session:
+        return tuple(
+            session.execute(
+                select(
+                    func.count(),
+                    func.max(CodexReference.updated),
+                    func.sum(CodexReference.from_entry_id),
+                    func.sum(CodexReference.to_entry_id),
+                ).select_from(CodexReference)
+            ).one()
+        )
+
+
+def get_codex_graph(backend: Optional[str] = None, check_interval: float = 60) -> CodexGraph:
+    """
+    Get the shared CodexGraph, loading it on first use. The graph reloads right after DbManager writes to
+    codex_references, and every `check_interval` seconds a cheap fingerprint query (count, max(updated) and sums
+    of the entry ids) catches changes made by other processes.
+
+    Args:
+        backend (Optional[str]): The database backend to read from.
+        check_interval (float): Seconds between fingerprint checks.
+
+    Returns:
+        CodexGraph: The current graph.
+    """
+    key = backend or "postgresql"
+    now = time.monotonic()
+    cached = _GRAPHS.get(key)
+    if cached is not None and key not in _STALE and now - cached[2] < check_interval:
+        return cached[0]
+    fingerprint = _fingerprint(backend)
+    if cached is not None and key not in _STALE and fingerprint == cached[1]:
+        _GRAPHS[key] = (cached[0], fingerprint, now)
+        return cached[0]
+    with _LOCK:
+        _STALE.discard(key)
+    graph = CodexGraph.from_database(backend=backend)
+    _GRAPHS[key] = (graph, fingerprint, now)
+    return graph
@@ -0,0 +1,254 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, insert, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from f3_data_models.models import (
+    Codex_Submission_Status,
+    CodexEntry,
+    CodexEntryTag,
+    CodexTag,
+    CodexUserSubmission,
+)
+from f3_data_models.utils import _notify_write, _require_write_backend, session_scope
+
+SUBMISSION_TYPES = ("entry", "edit", "tag")
+ENTRY_FIELDS = ("title", "definition", "type", "aliases", "video_link")
+REQUIRED_ENTRY_FIELDS = ("title", "definition", "type")
+
+
+@dataclass
+class ModerationResult:
+    """
+    The outcome of a batch moderation call.
+
+    Attributes:
+        processed (List[int]): The IDs of the submissions approved or rejected by this call.
+        skipped (List[int]): The IDs of submissions that were no longer pending, e.g. handled by an earlier call.
+        invalid (Dict[int, str]): Validation errors by submission ID. These submissions stay pending.
+        created_entry_ids (Dict[int, int]): The new CodexEntry ID for each approved 'entry' submission.
+    """
+
+    processed: List[int] = field(default_factory=list)
+    skipped: List[int] = field(default_factory=list)
+    invalid: Dict[int, str] = field(default_factory=dict)
+    created_entry_ids: Dict[int, int] = field(default_factory=dict)
+
+
+def pending_submissions(
+    limit: int = 50,
+    after: Optional[Tuple[datetime, int]] = None,
+    submission_type: Optional[str] = None,
+    backend: Optional[str] = None,
+) -> List[CodexUserSubmission]:
+    """
+    Page through the moderation queue, oldest first. Served by the partial index on pending submissions, so the
+    cost does not grow with the number of approved and rejected rows.
+
+    Args:
+        limit (int): The page size.
+        after (Optional[Tuple[datetime, int]]): The (timestamp, id) of the last submission on the previous page.
+        submission_type (Optional[str]): Only return submissions of this type.
+        backend (Optional[str]): The database backend to read from.
+
+    Returns:
+        List[CodexUserSubmission]: The next page of pending submissions.
+    """
+    query = select(CodexUserSubmission).where(CodexUserSubmission.status == Codex_Submission_Status.pending)
+    if after is not None:
+        query = query.where(tuple_(CodexUserSubmission.timestamp, CodexUserSubmission.id) > tuple_(*after))
+    if submission_type is not None:
+        query = query.where(CodexUserSubmission.submission_type == submission_type)
+    query = query.order_by(CodexUserSubmission.timestamp, CodexUserSubmission.id).limit(limit)
+    with session_scope(backend=backend) as session:
+        submissions = session.scalars(query).all()
+        session.expunge_all()
+    return list(submissions)
+
+
+def pending_count(backend: Optional[str] = None) -> int:
+    """The number of submissions waiting for moderation."""
+    query = select(func.count()).where(CodexUserSubmission.status == Codex_Submission_Status.pending)
+    with session_scope(backend=backend) as session:
+        return session.scalar(query)
+
+
+def _is_name_list(value: Any) -> bool:
+    return isinstance(value, list) and all(isinstance(item, str) and item.strip() for item in value)
+
+
+def validate_submission(submission: CodexUserSubmission) -> Optional[str]:
+    """
+    Check that a submission's data can be applied. The supported shapes are:
+
+    - 'entry': {"title", "definition", "type", optional "aliases", "video_link", "tags"}
+    - 'edit': {"entry_id", any of "title", "definition", "type", "aliases", "video_link", optional "tags"}
+    - 'tag': {"name"}
+
+    Args:
+        submission (CodexUserSubmission): The submission to check.
+
+    Returns:
+        Optional[str]: A description of the problem, or None if the submission is valid.
+    """
+    data = submission.data
+    if not isinstance(data, dict):
+        return "data must be an object"
+    if submission.submission_type not in SUBMISSION_TYPES:
+        return f"unsupported submission type '{submission.submission_type}'"
+    if submission.submission_type == "tag":
+        if not isinstance(data.get("name"), str) or not data["name"].strip():
+            return "tag submissions need a name"
+        return None
+
+    if submission.submission_type == "entry":
+        missing = [key for key in REQUIRED_ENTRY_FIELDS if not data.get(key)]
+        if missing:
+            return f"missing {', '.join(missing)}"
+    elif not isinstance(data.get("entry_id"), int) or isinstance(data["entry_id"], bool):
+        return "edit submissions need an integer entry_id"
+    elif not any(key in data for key in (*ENTRY_FIELDS, "tags")):
+        return "edit submissions need at least one field to change"
+    for key in REQUIRED_ENTRY_FIELDS:
+        if key in data and not isinstance(data[key], str):
+            return f"{key} must be a string"
+    if data.get("video_link") is not None and not isinstance(data["video_link"], str):
+        return "video_link must be a string"
+    for key in ("aliases", "tags"):
+        if key in data and not _is_name_list(data[key]):
+            return f"{key} must be a list of non-blank strings"
+    return None
+
+
+def _claim(session, submission_ids: Sequence[int], result: ModerationResult) -> List[CodexUserSubmission]:
+    """Lock the requested submissions and keep the ones still pending, so a repeated call is a no-op."""
+    submissions = session.scalars(
+        select(CodexUserSubmission)
+        .where(CodexUserSubmission.id.in_(submission_ids))
+        .order_by(CodexUserSubmission.id)
+        .with_for_update()
+    ).all()
+    pending = []
+    for submission in submissions:
+        if submission.status == Codex_Submission_Status.pending:
+            pending.append(submission)
+        else:
+            result.skipped.append(submission.id)
+    return pending
+
+
+def approve_submissions(submission_ids: Sequence[int], backend: Optional[str] = None) -> ModerationResult:
+    """
+    Validate and apply many submissions in a single transaction.
+
+    New entries are bulk inserted, edits are merged per entry (in submission order) and bulk updated by primary
+    key, tags are upserted by name and entry/tag links are inserted with conflicts ignored. Applied submissions
+    are marked approved in the same transaction. Submissions are locked while they are applied and only pending
+    ones are touched, so approving the same IDs twice, or from two moderators at once, applies them once.
+
+    Args:
+        submission_ids (Sequence[int]): The IDs of the submissions to approve.
+        backend (Optional[str]): The database backend to write to.
+
+    Returns:
+        ModerationResult: Which submissions were approved, skipped or invalid.
+    """
+    _require_write_backend(backend)
+    result = ModerationResult()
+    with session_scope(backend=backend) as session:
+        submissions = _claim(session, submission_ids, result)
+        valid = []
+        for submission in submissions:
+            error = validate_submission(submission)
+            if error is None:
+                valid.append(submission)
+            else:
+                result.invalid[submission.id] = error
+
+        edited_ids = {s.data["entry_id"] for s in valid if s.submission_type == "edit"}
+        existing = set()
+        if edited_ids:
+            existing = set(session.scalars(select(CodexEntry.id).where(CodexEntry.id.in_(edited_ids))))
+        for submission in [s for s in valid if s.submission_type == "edit" and s.data["entry_id"] not in existing]:
+            result.invalid[submission.id] = f"codex entry {submission.data['entry_id']} does not exist"
+            valid.remove(submission)
+
+        new_entries = [s for s in valid if s.submission_type == "entry"]
+        if new_entries:
+            entry_ids = session.scalars(
+                insert(CodexEntry).returning(CodexEntry.id, sort_by_parameter_order=True),
+                [{key: s.data[key] for key in ENTRY_FIELDS if key in s.data} for s in new_entries],
+            ).all()
+            result.created_entry_ids = {s.id: entry_id for s, entry_id in zip(new_entries, entry_ids, strict=True)}
+
+        edits: Dict[int, Dict[str, Any]] = {}
+        for submission in valid:
+            if submission.submission_type == "edit":
+                changes = {key: submission.data[key] for key in ENTRY_FIELDS if key in submission.data}
+                if changes:
+                    edits.setdefault(submission.data["entry_id"], {"id": submission.data["entry_id"]}).update(changes)
+        if edits:
+            session.execute(update(CodexEntry), list(edits.values()))
+
+        tag_names = {s.data["name"].strip() for s in valid if s.submission_type == "tag"}
+        links = set()
+        for submission in valid:
+            if submission.submission_type == "tag":
+                continue
+            entry_id = result.created_entry_ids.get(submission.id, submission.data.get("entry_id"))
+            for name in submission.data.get("tags", []):
+                tag_names.add(name.strip())
+                links.add((entry_id, name.strip()))
+        if tag_names:
+            session.execute(
+                pg_insert(CodexTag).on_conflict_do_nothing(index_elements=[CodexTag.name]),
+                [{"name": name} for name in sorted(tag_names)],
+            )
+        if links:
+            tag_ids = dict(
+                session.execute(select(CodexTag.name, CodexTag.id).where(CodexTag.name.in_(tag_names))).tuples().all()
+            )
+            session.execute(
+                pg_insert(CodexEntryTag).on_conflict_do_nothing(),
+                [{"entry_id": entry_id, "tag_id": tag_ids[name]} for entry_id, name in sorted(links)],
+            )
+
+        result.processed = [s.id for s in valid]
+        if result.processed:
+            session.execute(
+                update(CodexUserSubmission)
+                .where(CodexUserSubmission.id.in_(result.processed))
+                .values(status=Codex_Submission_Status.approved)
+            )
+
+    if result.processed:
+        _notify_write(CodexEntry, CodexTag, CodexEntryTag, CodexUserSubmission)
+    return result
+
+
+def reject_submissions(submission_ids: Sequence[int], backend: Optional[str] = None) -> ModerationResult:
+    """
+    Reject many submissions with one statement. Submissions that are no longer pending are left as they are.
+
+    Args:
+        submission_ids (Sequence[int]): The IDs of the submissions to reject.
+        backend (Optional[str]): The database backend to write to.
+
+    Returns:
+        ModerationResult: Which submissions were rejected or skipped.
+    """
+    _require_write_backend(backend)
+    result = ModerationResult()
+    with session_scope(backend=backend) as session:
+        result.processed = [s.id for s in _claim(session, submission_ids, result)]
+        if result.processed:
+            session.execute(
+                update(CodexUserSubmission)
+                .where(CodexUserSubmission.id.in_(result.processed))
+                .values(status=Codex_Submission_Status.rejected)
+            )
+    if result.processed:
+        _notify_write(CodexUserSubmission)
+    return result
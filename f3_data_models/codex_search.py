@@ -0,0 +1,187 @@
+import heapq
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import TEXT, Select, cast, func, literal, or_, select
+from sqlalchemy.orm import Session
+
+from f3_data_models.models import CodexEntry
+from f3_data_models.utils import DbManager, add_write_listener, get_engine, session_scope
+
+_WORD_RE = re.compile(r"\w+")
+
+# Mirror the default ts_rank weights for the 'A' (title, aliases) and 'B' (definition) labels
+NAME_WEIGHT = 1.0
+DEFINITION_WEIGHT = 0.4
+# pg_trgm's default similarity threshold
+SIMILARITY_THRESHOLD = 0.3
+
+
+def _trigrams(value: str) -> Set[str]:
+    """Trigrams of a string the way pg_trgm builds them: lowercased words padded with two spaces before, one after."""
+    grams = set()
+    for word in _WORD_RE.findall(value.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def codex_search_query(term: str, limit: int = 10) -> Select:
+    """
+    Build the ranked PostgreSQL search over codex entries. Full-text matches on the generated `search_vector`
+    are combined with trigram similarity on titles and aliases, so misspelled lookups still find their entry.
+    Every predicate is served by one of the GIN indexes on codex_entries.
+
+    Args:
+        term (str): The search term, in websearch syntax (quoted phrases, `or`, `-exclusions`).
+        limit (int): The maximum number of results.
+
+    Returns:
+        Select: A statement returning (CodexEntry, rank) rows, best match first.
+    """
+    tsquery = func.websearch_to_tsquery("english", term)
+    aliases_text = cast(CodexEntry.aliases, TEXT)
+    rank = (
+        func.ts_rank_cd(CodexEntry.search_vector, tsquery)
+        + func.greatest(func.similarity(CodexEntry.title, term), func.word_similarity(term, aliases_text))
+    ).label("rank")
+    return (
+        select(CodexEntry, rank)
+        .where(
+            or_(
+                CodexEntry.search_vector.op("@@")(tsquery),
+                CodexEntry.title.op("%")(term),
+                literal(term, TEXT).op("<%")(aliases_text),
+            )
+        )
+        .order_by(rank.desc(), CodexEntry.title)
+        .limit(limit)
+    )
+
+
+class CodexSearchIndex:
+    """
+    In-memory search index over codex entries, for databases without full-text or trigram search (BigQuery, and
+    SQLite sessions in tests). Ranking approximates the PostgreSQL search: every query word must match a title,
+    alias or definition word, and titles and aliases also match by trigram similarity.
+
+    Args:
+        entries (Iterable[CodexEntry]): The entries to index.
+        similarity_threshold (float): The minimum trigram similarity for a fuzzy title or alias match.
+    """
+
+    def __init__(self, entries: Iterable[CodexEntry] = (), similarity_threshold: float = SIMILARITY_THRESHOLD):
+        self.similarity_threshold = similarity_threshold
+        self._entries: Dict[int, CodexEntry] = {}
+        self._terms: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._trigrams: Dict[str, Set[Tuple[int, int]]] = defaultdict(set)
+        self._name_sizes: Dict[Tuple[int, int], int] = {}
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry: CodexEntry) -> None:
+        if entry.id in self._entries:
+            self.remove(entry.id)
+        self._entries[entry.id] = entry
+        names = [entry.title or "", *(entry.aliases or [])]
+        for word in _WORD_RE.findall((entry.definition or "").lower()):
+            postings = self._terms[word]
+            postings[entry.id] = max(postings.get(entry.id, 0.0), DEFINITION_WEIGHT)
+        for position, name in enumerate(names):
+            for word in _WORD_RE.findall(name.lower()):
+                self._terms[word][entry.id] = NAME_WEIGHT
+            grams = _trigrams(name)
+            self._name_sizes[(entry.id, position)] = len(grams)
+            for gram in grams:
+                self._trigrams[gram].add((entry.id, position))
+
+    def remove(self, entry_id: int) -> None:
+        if self._entries.pop(entry_id, None) is None:
+            return
+        for postings in self._terms.values():
+            postings.pop(entry_id, None)
+        for names in self._trigrams.values():
+            names.difference_update({name for name in names if name[0] == entry_id})
+        for name in [name for name in self._name_sizes if name[0] == entry_id]:
+            del self._name_sizes[name]
+
+    def search(self, term: str, limit: int = 10) -> List[Tuple[CodexEntry, float]]:
+        """
+        Search the index.
+
+        Args:
+            term (str): The search term.
+            limit (int): The maximum number of results.
+
+        Returns:
+            List[Tuple[CodexEntry, float]]: Matching entries and their rank, best match first.
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        words = _WORD_RE.findall(term.lower())
+        if words:
+            postings = [self._terms.get(word, {}) for word in words]
+            for entry_id in set(postings[0]).intersection(*postings[1:]):
+                scores[entry_id] += sum(posting[entry_id] for posting in postings)
+
+        grams = _trigrams(term)
+        shared = Counter(name for gram in grams for name in self._trigrams.get(gram, ()))
+        best: Dict[int, float] = {}
+        for name, count in shared.items():
+            similarity = count / (len(grams) + self._name_sizes[name] - count)
+            if similarity >= self.similarity_threshold and similarity > best.get(name[0], 0.0):
+                best[name[0]] = similarity
+        for entry_id, similarity in best.items():
+            scores[entry_id] += similarity
+
+        ranked = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(self._entries[entry_id], score) for entry_id, score in ranked]
+
+
+_FALLBACK_INDEXES: Dict[str, CodexSearchIndex] = {}
+
+
+def _reset_fallback_indexes(tables: Set[str]) -> None:
+    if "codex_entries" in tables:
+        _FALLBACK_INDEXES.clear()
+
+
+add_write_listener(_reset_fallback_indexes)
+
+
+def search_codex(
+    term: str, limit: int = 10, backend: Optional[str] = None, session: Optional[Session] = None
+) -> List[Tuple[CodexEntry, float]]:
+    """
+    Search codex entries by title, alias and definition, tolerating typos.
+
+    On PostgreSQL this runs the indexed query from `codex_search_query`. On BigQuery it searches an in-memory
+    CodexSearchIndex, built on first use and rebuilt after DbManager writes to codex_entries. A `session` bound
+    to another database, e.g. SQLite in tests, is searched with a CodexSearchIndex of its entries built per call.
+
+    Args:
+        term (str): The search term.
+        limit (int): The maximum number of results.
+        backend (Optional[str]): The database backend to search, when no `session` is given.
+        session (Optional[Session]): A session to search in instead of one on `backend`.
+
+    Returns:
+        List[Tuple[CodexEntry, float]]: Matching entries and their rank, best match first.
+    """
+    if session is not None:
+        if session.get_bind().dialect.name == "postgresql":
+            return [(entry, rank) for entry, rank in session.execute(codex_search_query(term, limit))]
+        return CodexSearchIndex(session.scalars(select(CodexEntry))).search(term, limit)
+
+    engine = get_engine(backend=backend)
+    if engine.dialect.name == "postgresql":
+        with session_scope(backend=backend) as session:
+            rows = session.execute(codex_search_query(term, limit)).all()
+            session.expunge_all()
+        return [(entry, rank) for entry, rank in rows]
+
+    index = _FALLBACK_INDEXES.get(str(engine.url))
+    if index is None:
+        index = CodexSearchIndex(DbManager.find_records(CodexEntry, [], backend=backend))
+        _FALLBACK_INDEXES[str(engine.url)] = index
+    return index.search(term, limit)
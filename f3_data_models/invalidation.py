@@ -0,0 +1,196 @@
+import atexit
+import logging
+import select
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Set
+
+from f3_data_models.cache import LRUCache
+from f3_data_models.utils import get_engine, notify_tables
+
+CHANNEL = "f3_cache_invalidation"
+# Tables whose triggers publish invalidations (migration 1fae958b997a)
+NOTIFYING_TABLES = frozenset(
+    {
+        "orgs",
+        "event_types",
+        "event_tags",
+        "attendance_types",
+        "locations",
+        "slack_spaces",
+        "roles",
+        "permissions",
+        "positions",
+        "achievements",
+    }
+)
+
+Invalidations = Dict[str, Set[str]]
+
+
+def parse_payload(payload: str) -> tuple[str, str]:
+    """Split a '<table>:<id>' notification payload."""
+    table, _, row_id = payload.partition(":")
+    return table, row_id
+
+
+class InvalidationListener:
+    """
+    Keeps in-process caches coherent across worker processes with PostgreSQL LISTEN/NOTIFY. Triggers on the
+    reference tables publish '<table>:<id>' on CHANNEL when a write commits; this listener holds one connection
+    outside the pool on a daemon thread and, for each group of notifications, calls `utils.notify_tables` (which
+    invalidates the query cache and calls the write listeners), evicts the rows from registered caches, and calls
+    subscribers.
+
+    Notifications sent while the listener is disconnected are lost, so after reconnecting it invalidates every
+    NOTIFYING_TABLE.
+
+    Args:
+        backend (Optional[str]): The database backend to listen on.
+        channel (str): The notification channel.
+        timeout (float): Seconds to wait for notifications before checking for a stop, and, with drivers that
+            cannot wait on the socket (pg8000), how often to poll.
+        reconnect_delay (float): Seconds to wait before reconnecting after an error.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[str] = None,
+        channel: str = CHANNEL,
+        timeout: float = 5.0,
+        reconnect_delay: float = 5.0,
+    ):
+        self.backend = backend
+        self.channel = channel
+        self.timeout = timeout
+        self.reconnect_delay = reconnect_delay
+        self._subscribers: List[Callable[[Invalidations], None]] = []
+        self._caches: List[tuple[LRUCache, str, Callable[[str], object]]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, callback: Callable[[Invalidations], None]) -> None:
+        """
+        Call `callback` with the changed row ids, keyed by table, for each group of notifications. An empty set
+        means any row of the table may have changed.
+        """
+        self._subscribers.append(callback)
+
+    def register_cache(self, cache: LRUCache, table: str, key: Callable[[str], object] = int) -> None:
+        """
+        Evict rows of `table` from `cache` when they change.
+
+        Args:
+            cache (LRUCache): The cache, keyed by row id.
+            table (str): The table whose rows are cached.
+            key (Callable[[str], object]): Converts the notified id (text) to the cache key.
+        """
+        self._caches.append((cache, table, key))
+
+    def dispatch(self, invalidations: Invalidations) -> None:
+        """
+        Apply invalidations to the query cache, registered caches and subscribers. Errors are logged rather than
+        raised, so one bad payload or subscriber does not drop the listening connection: a cache whose key cannot
+        be read from a notified id is cleared instead.
+        """
+        if not invalidations:
+            return
+        try:
+            notify_tables(set(invalidations))
+        except Exception as e:
+            logging.error(f"Write listener failed for invalidations of {', '.join(sorted(invalidations))}: {e}")
+        for cache, table, key in self._caches:
+            if table not in invalidations:
+                continue
+            try:
+                keys = [key(row_id) for row_id in invalidations[table]]
+            except (TypeError, ValueError) as e:
+                logging.warning(f"Clearing the cache of {table}, unreadable notified id: {e}")
+                keys = []
+            if not keys:
+                cache.clear()
+            for cache_key in keys:
+                cache.pop(cache_key)
+        for callback in list(self._subscribers):
+            try:
+                callback(invalidations)
+            except Exception as e:
+                logging.error(f"Cache invalidation subscriber {callback!r} failed: {e}")
+
+    def _connect(self):
+        connection = get_engine(backend=self.backend).raw_connection()
+        # A dedicated connection, so listening never holds a pool slot
+        connection.detach()
+        dbapi_connection = connection.dbapi_connection
+        dbapi_connection.autocommit = True
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f'LISTEN "{self.channel}"')
+        cursor.close()
+        return connection, dbapi_connection
+
+    def _wait(self, dbapi_connection) -> List[str]:
+        if hasattr(dbapi_connection, "poll"):
+            # psycopg2: wait on the socket, then read the notifications that arrived
+            if select.select([dbapi_connection], [], [], self.timeout) == ([], [], []):
+                return []
+            dbapi_connection.poll()
+            notifies = dbapi_connection.notifies
+            payloads = [notify.payload for notify in notifies if notify.channel == self.channel]
+            notifies.clear()
+            return payloads
+        # pg8000 collects notifications while executing any statement
+        self._stop.wait(self.timeout)
+        cursor = dbapi_connection.cursor()
+        cursor.execute("SELECT 1")
+        cursor.close()
+        payloads = []
+        while dbapi_connection.notifications:
+            _, channel, payload = dbapi_connection.notifications.popleft()
+            if channel == self.channel:
+                payloads.append(payload)
+        return payloads
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection, dbapi_connection = self._connect()
+                # Anything may have changed while disconnected
+                self.dispatch({table: set() for table in NOTIFYING_TABLES})
+                while not self._stop.is_set():
+                    invalidations: Invalidations = defaultdict(set)
+                    for payload in self._wait(dbapi_connection):
+                        table, row_id = parse_payload(payload)
+                        invalidations[table].add(row_id)
+                    self.dispatch(invalidations)
+            except Exception as e:
+                logging.error(f"Cache invalidation listener failed, reconnecting: {e}")
+                self._stop.wait(self.reconnect_delay)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+    def start(self) -> "InvalidationListener":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="cache-invalidation-listener", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+_DEFAULT_LISTENER: Optional[InvalidationListener] = None
+
+
+def start_invalidation_listener() -> InvalidationListener:
+    """Start the process-wide InvalidationListener, creating it on first use."""
+    global _DEFAULT_LISTENER
+    if _DEFAULT_LISTENER is None:
+        _DEFAULT_LISTENER = InvalidationListener()
+        atexit.register(_DEFAULT_LISTENER.stop, 1.0)
+    return _DEFAULT_LISTENER.start()
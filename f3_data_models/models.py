@@ -2,7 +2,6 @@ import enum
 from datetime import date, datetime, time
 from typing import Any, Dict, List, Optional
 
-from citext import CIText
 from sqlalchemy import (
     ARRAY,
     JSON,
@@ -13,18 +12,29 @@ from sqlalchemy import (
     VARCHAR,
     BigInteger,
     Boolean,
+    Column,
+    Computed,
     DateTime,
     Enum,
+    FetchedValue,
     Float,
     ForeignKey,
+    ForeignKeyConstraint,
     Index,
     Integer,
+    Table,
     UniqueConstraint,
     Uuid,
+    case,
+    cast,
     func,
     inspect,
+    literal,
 )
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import text as sql_text
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.dialects.postgresql.base import ischema_names
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import (
     DeclarativeBase,
     Mapped,
@@ -32,8 +42,27 @@ from sqlalchemy.orm import (
     relationship,
 )
 from sqlalchemy.orm.attributes import InstrumentedAttribute
+from sqlalchemy.types import Concatenable, UserDefinedType
 from typing_extensions import Annotated
 
+from f3_data_models.times import HHMM_PATTERN, hhmm_to_time
+
+
+class CIText(Concatenable, UserDefinedType):
+    """
+    PostgreSQL's case-insensitive CITEXT type. Equivalent to sqlalchemy-citext's CIText, which imports psycopg2 as
+    a side effect and so loaded a database driver for every import of the models.
+    """
+
+    cache_ok = True
+
+    def get_col_spec(self, **kw) -> str:
+        return "CITEXT"
+
+
+# Reflect citext columns as CIText, for alembic autogenerate
+ischema_names["citext"] = CIText
+
 # Custom Annotations
 time_notz = Annotated[time, TIME(timezone=False)]
 time_with_tz = Annotated[time, TIME(timezone=True)]
@@ -51,6 +80,63 @@ dt_update = Annotated[
 ]
 
 
+def _hhmm_timestamp_sql(date_column: str, time_column: str) -> str:
+    """Generated-column expression combining a date column and an 'HHMM' string column into a timestamp."""
+    return (
+        f"CASE WHEN {time_column} ~ '{HHMM_PATTERN}' THEN {date_column} + "
+        f"make_time(substr({time_column}, 1, 2)::int, substr({time_column}, 3, 2)::int, 0) END"
+    )
+
+
+def _hhmm_time_sql(time_column: str) -> str:
+    """Index expression parsing an 'HHMM' string column into a TIME, the same as `_hhmm_time_expression`."""
+    return (
+        f"(CASE WHEN {time_column} ~ '{HHMM_PATTERN}' THEN make_time(CAST(substr({time_column}, 1, 2) AS INTEGER), "
+        f"CAST(substr({time_column}, 3, 2) AS INTEGER), 0) END)"
+    )
+
+
+def _hhmm_time_expression(column):
+    """
+    SQL expression parsing an 'HHMM' string column into a TIME, NULL when malformed. Its constants are rendered
+    inline rather than bound, so PostgreSQL can match it to the `_hhmm_time_sql` expression indexes.
+    """
+
+    def inline(value):
+        return literal(value, literal_execute=True)
+
+    return case(
+        (
+            column.regexp_match(inline(HHMM_PATTERN)),
+            func.make_time(
+                cast(func.substr(column, inline(1), inline(2)), Integer),
+                cast(func.substr(column, inline(3), inline(2)), Integer),
+                inline(0),
+            ),
+        ),
+        else_=None,
+    )
+
+
+# Deferred group of EventInstance's large text and JSON columns, loaded on first access
+CONTENT_GROUP = "content"
+
+
+def _event_instance_fk(name: str) -> ForeignKeyConstraint:
+    """
+    Foreign key to the partitioned event_instances table, whose primary key is (id, start_date). The referencing
+    table's start_date is filled from the event instance by a trigger when it is not given, and follows it when the
+    event instance is rescheduled.
+    """
+    return ForeignKeyConstraint(
+        ["event_instance_id", "start_date"],
+        ["event_instances.id", "event_instances.start_date"],
+        name=name,
+        onupdate="CASCADE",
+        ondelete="CASCADE",
+    )
+
+
 class Codex_Submission_Status(enum.Enum):
     """
     Enum representing the status of a codex submission.
@@ -245,7 +331,7 @@ class Base(DeclarativeBase):
     Methods:
         get_id: Get the primary key of the model.
         get: Get the value of a specified attribute.
-        to_json: Convert the model instance to a JSON-serializable dictionary.
+        to_json: Convert the model instance to a JSON-serializable dictionary, skipping deferred columns not loaded.
         __repr__: Get a string representation of the model instance.
         _update: Update the model instance with the provided fields.
     """
@@ -284,15 +370,36 @@ class Base(DeclarativeBase):
         Returns:
             dict: A dictionary representation of the model instance.
         """
-        return {c.key: self.get(c.key) for c in self.__table__.columns if c.key not in ["created", "updated"]}
+        unloaded = self._unloaded_columns()
+        return {
+            c.key: self.get(c.key)
+            for c in self.__table__.columns
+            if c.key not in ["created", "updated"] and c.computed is None and c.key not in unloaded
+        }
+
+    def _unloaded_columns(self) -> set:
+        """
+        The column attributes that were deferred, by the mapping or the query, and not loaded. Reading them would
+        query the database, or fail on a detached instance. Expired attributes are not included.
+        """
+        state = inspect(self)
+        if state.key is None:
+            return set()
+        return {attr.key for attr in state.mapper.column_attrs} & (state.unloaded - state.expired_attributes)
 
     def to_update_dict(self) -> Dict[InstrumentedAttribute, Any]:
         update_dict = {}
         mapper = inspect(self).mapper
 
-        # Add simple attributes
+        # Add simple attributes, skipping generated columns which the database maintains, and deferred columns that
+        # were never loaded, which would otherwise be overwritten
+        unloaded = self._unloaded_columns()
         for attr in mapper.column_attrs:
-            if attr.key not in ["created", "updated", "id"]:
+            if (
+                attr.key not in ["created", "updated", "id"]
+                and attr.columns[0].computed is None
+                and attr.key not in unloaded
+            ):
                 update_dict[attr] = getattr(self, attr.key)
 
         # Add relationships
@@ -574,16 +681,17 @@ class EventType_x_EventInstance(Base):
     Attributes:
         event_instance_id (int): The ID of the associated event instance.
         event_type_id (int): The ID of the associated event type.
+        start_date (date): The start date of the associated event instance, part of its key in the partitioned event_instances table. Filled automatically.
 
         event_instance (EventInstance): The associated event instance.
     """  # noqa: E501
 
     __tablename__ = "event_instances_x_event_types"
+    __table_args__ = (_event_instance_fk("event_instances_x_event_types_event_instance_id_fkey"),)
 
-    event_instance_id: Mapped[int] = mapped_column(
-        ForeignKey("event_instances.id", onupdate="CASCADE"), primary_key=True
-    )
+    event_instance_id: Mapped[int] = mapped_column(primary_key=True)
     event_type_id: Mapped[int] = mapped_column(ForeignKey("event_types.id"), primary_key=True)
+    start_date: Mapped[date] = mapped_column(server_default=FetchedValue())
 
     event_instance: Mapped["EventInstance"] = relationship(back_populates="event_instances_x_event_types")
 
@@ -641,16 +749,17 @@ class EventTag_x_EventInstance(Base):
     Attributes:
         event_instance_id (int): The ID of the associated event instance.
         event_tag_id (int): The ID of the associated event tag.
+        start_date (date): The start date of the associated event instance, part of its key in the partitioned event_instances table. Filled automatically.
 
         event_instance (EventInstance): The associated event instance.
     """  # noqa: E501
 
     __tablename__ = "event_tags_x_event_instances"
+    __table_args__ = (_event_instance_fk("event_tags_x_event_instances_event_instance_id_fkey"),)
 
-    event_instance_id: Mapped[int] = mapped_column(
-        ForeignKey("event_instances.id", onupdate="CASCADE"), primary_key=True
-    )
+    event_instance_id: Mapped[int] = mapped_column(primary_key=True)
     event_tag_id: Mapped[int] = mapped_column(ForeignKey("event_tags.id"), primary_key=True)
+    start_date: Mapped[date] = mapped_column(server_default=FetchedValue())
 
     event_instance: Mapped["EventInstance"] = relationship(back_populates="event_instances_x_event_tags")
 
@@ -720,7 +829,35 @@ class Location(Base):
     )
 
 
-class Event(Base):
+class EventTimesMixin:
+    """
+    Typed accessors for the 'HHMM' start_time and end_time strings shared by events and event instances.
+
+    Attributes:
+        start_time_of_day (Optional[time]): The start time parsed as a time. Usable in queries, e.g. `Event.start_time_of_day < time(6)`, which are served by an expression index.
+        end_time_of_day (Optional[time]): The end time parsed as a time. Usable in queries.
+    """  # noqa: E501
+
+    @hybrid_property
+    def start_time_of_day(self) -> Optional[time]:
+        return hhmm_to_time(self.start_time)
+
+    @start_time_of_day.inplace.expression
+    @classmethod
+    def _start_time_of_day_expression(cls):
+        return _hhmm_time_expression(cls.start_time)
+
+    @hybrid_property
+    def end_time_of_day(self) -> Optional[time]:
+        return hhmm_to_time(self.end_time)
+
+    @end_time_of_day.inplace.expression
+    @classmethod
+    def _end_time_of_day_expression(cls):
+        return _hhmm_time_expression(cls.end_time)
+
+
+class Event(EventTimesMixin, Base):
     """
     Model representing an event or series; the same model is used for both with a self-referential relationship for series.
 
@@ -736,6 +873,7 @@ class Event(Base):
         end_date (Optional[date]): The end date of the event.
         start_time (Optional[str]): The start time of the event. Format is 'HHMM', 24-hour time, timezone naive.
         end_time (Optional[str]): The end time of the event. Format is 'HHMM', 24-hour time, timezone naive.
+        start_ts (Optional[datetime]): Generated from start_date and start_time; null if start_time is missing or malformed.
         day_of_week (Optional[Day_Of_Week]): The day of the week of the event.
         name (str): The name of the event.
         description (Optional[text]): A description of the event.
@@ -770,6 +908,9 @@ class Event(Base):
     end_date: Mapped[Optional[date]]
     start_time: Mapped[Optional[str]]
     end_time: Mapped[Optional[str]]
+    start_ts: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, Computed(_hhmm_timestamp_sql("start_date", "start_time"), persisted=True)
+    )
     day_of_week: Mapped[Optional[Day_Of_Week]]
     name: Mapped[str]
     description: Mapped[Optional[text]]
@@ -786,6 +927,8 @@ class Event(Base):
         Index("idx_events_org_id", "org_id"),
         Index("idx_events_location_id", "location_id"),
         Index("idx_events_is_active", "is_active"),
+        Index("idx_events_start_ts", "start_ts"),
+        Index("idx_events_start_time_of_day", sql_text(_hhmm_time_sql("start_time"))),
     )
 
     org: Mapped[Org] = relationship(innerjoin=True, cascade="expunge", viewonly=True)
@@ -811,7 +954,7 @@ class Event(Base):
     )
 
 
-class EventInstance(Base):
+class EventInstance(EventTimesMixin, Base):
     """
     Model representing an event instance (a single occurrence of an event).
 
@@ -822,10 +965,12 @@ class EventInstance(Base):
         series_id (Optional[int]): The ID of the associated event series.
         is_active (bool): Whether the event is active. Default is True.
         highlight (bool): Whether the event is highlighted. Default is False.
-        start_date (date): The start date of the event.
+        start_date (date): The start date of the event. The table is range partitioned by month on this column (see f3_data_models.partitions).
         end_date (Optional[date]): The end date of the event.
         start_time (Optional[str]): The start time of the event. Format is 'HHMM', 24-hour time, timezone naive.
         end_time (Optional[str]): The end time of the event. Format is 'HHMM', 24-hour time, timezone naive.
+        start_ts (Optional[datetime]): Generated from start_date and start_time; null if start_time is missing or malformed.
+        end_ts (Optional[datetime]): Generated from end_date (falling back to start_date) and end_time.
         name (str): The name of the event.
         description (Optional[text]): A description of the event.
         email (Optional[str]): A contact email address associated with the event.
@@ -851,11 +996,6 @@ class EventInstance(Base):
     """  # noqa: E501
 
     __tablename__ = "event_instances"
-    __table_args__ = (
-        Index("idx_event_instances_org_id", "org_id"),
-        Index("idx_event_instances_location_id", "location_id"),
-        Index("idx_event_instances_is_active", "is_active"),
-    )
 
     id: Mapped[intpk]
     org_id: Mapped[int] = mapped_column(ForeignKey("orgs.id"))
@@ -863,24 +1003,30 @@ class EventInstance(Base):
     series_id: Mapped[Optional[int]] = mapped_column(ForeignKey("events.id", onupdate="CASCADE"))
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     highlight: Mapped[bool] = mapped_column(Boolean, default=False)
-    start_date: Mapped[date]
+    start_date: Mapped[date] = mapped_column(primary_key=True)
     end_date: Mapped[Optional[date]]
     start_time: Mapped[Optional[str]]
     end_time: Mapped[Optional[str]]
+    start_ts: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, Computed(_hhmm_timestamp_sql("start_date", "start_time"), persisted=True)
+    )
+    end_ts: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, Computed(_hhmm_timestamp_sql("coalesce(end_date, start_date)", "end_time"), persisted=True)
+    )
     name: Mapped[str]
     description: Mapped[Optional[text]]
     email: Mapped[Optional[str]]
     pax_count: Mapped[Optional[int]]
     fng_count: Mapped[Optional[int]]
-    preblast: Mapped[Optional[text]]
-    backblast: Mapped[Optional[text]]
-    preblast_rich: Mapped[Optional[Dict[str, Any]]]
-    backblast_rich: Mapped[Optional[Dict[str, Any]]]
+    preblast: Mapped[Optional[text]] = mapped_column(deferred_group=CONTENT_GROUP)
+    backblast: Mapped[Optional[text]] = mapped_column(deferred_group=CONTENT_GROUP)
+    preblast_rich: Mapped[Optional[Dict[str, Any]]] = mapped_column(deferred_group=CONTENT_GROUP)
+    backblast_rich: Mapped[Optional[Dict[str, Any]]] = mapped_column(deferred_group=CONTENT_GROUP)
     preblast_ts: Mapped[Optional[float]]
     backblast_ts: Mapped[Optional[float]]
     is_private: Mapped[bool] = mapped_column(Boolean, server_default="false", nullable=False)
     series_exception: Mapped[Optional[Series_Exception]]
-    meta: Mapped[Optional[Dict[str, Any]]]
+    meta: Mapped[Optional[Dict[str, Any]]] = mapped_column(deferred_group=CONTENT_GROUP)
     created: Mapped[dt_create]
     updated: Mapped[dt_update]
 
@@ -888,7 +1034,13 @@ class EventInstance(Base):
         Index("idx_event_instances_org_id", "org_id"),
         Index("idx_event_instances_location_id", "location_id"),
         Index("idx_event_instances_is_active", "is_active"),
+        Index("idx_event_instances_start_ts", "start_ts"),
+        Index("idx_event_instances_start_time_of_day", sql_text(_hhmm_time_sql("start_time"))),
+        {"postgresql_partition_by": "RANGE (start_date)"},
     )
+    # A partitioned table's key must include the partition column, so the table's key is (id, start_date); ids are
+    # still unique on their own, and rows are identified by id alone (e.g. session.get(EventInstance, id))
+    __mapper_args__ = {"primary_key": ["id"]}
 
     org: Mapped[Org] = relationship(innerjoin=True, cascade="expunge", viewonly=True)
     location: Mapped[Location] = relationship(innerjoin=False, cascade="expunge", viewonly=True)
@@ -1100,11 +1252,16 @@ class SlackUser(Base):
         strava_athlete_id (Optional[int]): The Strava athlete ID of the user.
         meta (Optional[Dict[str, Any]]): Additional metadata for the Slack user.
         slack_updated (Optional[int]): The last update time of the Slack user.
+        is_active (bool): Whether the Slack user is still an active member of the workspace. Default is True.
         created (datetime): The timestamp when the record was created.
         updated (datetime): The timestamp when the record was last updated.
     """  # noqa: E501
 
     __tablename__ = "slack_users"
+    __table_args__ = (
+        Index("idx_slack_users_slack_team_id_slack_id", "slack_team_id", "slack_id", unique=True),
+        Index("idx_slack_users_user_id", "user_id"),
+    )
 
     id: Mapped[intpk]
     slack_id: Mapped[str]
@@ -1122,6 +1279,7 @@ class SlackUser(Base):
     strava_athlete_id: Mapped[Optional[int]]
     meta: Mapped[Optional[Dict[str, Any]]]
     slack_updated: Mapped[Optional[int]]
+    is_active: Mapped[bool] = mapped_column(Boolean, server_default="true", nullable=False)
     created: Mapped[dt_create]
     updated: Mapped[dt_update]
 
@@ -1135,6 +1293,7 @@ class Attendance(Base):
         event_instance_id (int): The ID of the associated event instance.
         user_id (Optional[int]): The ID of the associated user.
         is_planned (bool): Whether this is planned attendance (True) vs actual attendance (False).
+        start_date (date): The start date of the event instance, so attendance can be filtered by date without a join. Filled automatically.
         meta (Optional[Dict[str, Any]]): Additional metadata for the attendance.
         created (datetime): The timestamp when the record was created.
         updated (datetime): The timestamp when the record was last updated.
@@ -1149,15 +1308,18 @@ class Attendance(Base):
     __tablename__ = "attendance"
     __table_args__ = (
         UniqueConstraint("event_instance_id", "user_id", "is_planned"),
+        _event_instance_fk("event_instance_id_fkey"),
         Index("idx_attendance_event_instance_id", "event_instance_id"),
         Index("idx_attendance_user_id", "user_id"),
         Index("idx_attendance_is_planned", "is_planned"),
+        Index("idx_attendance_start_date", "start_date"),
     )
 
     id: Mapped[intpk]
-    event_instance_id: Mapped[int] = mapped_column(ForeignKey("event_instances.id", onupdate="CASCADE"))
+    event_instance_id: Mapped[int]
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     is_planned: Mapped[bool]
+    start_date: Mapped[date] = mapped_column(server_default=FetchedValue())
     meta: Mapped[Optional[Dict[str, Any]]]
     created: Mapped[dt_create]
     updated: Mapped[dt_update]
@@ -1178,6 +1340,54 @@ class Attendance(Base):
     )
 
 
+class EventInstanceArchive(Base):
+    """
+    Model representing an archived event instance. Event instances older than the archive cutoff are moved here with their attendance (see f3_data_models.archive), keeping event_instances small; the columns mirror EventInstance, without foreign keys, and its event types and tags are kept as id arrays.
+
+    Attributes:
+        (all EventInstance attributes)
+        event_type_ids (List[int]): The IDs of the event instance's event types.
+        event_tag_ids (List[int]): The IDs of the event instance's event tags.
+        archived (datetime): The timestamp when the event instance was archived.
+    """  # noqa: E501
+
+    __table__ = Table(
+        "event_instances_archive",
+        Base.metadata,
+        *(
+            Column(c.name, c.type, primary_key=c.name == "id", nullable=c.nullable)
+            for c in EventInstance.__table__.columns
+        ),
+        Column("event_type_ids", ARRAY(Integer), server_default="{}", nullable=False),
+        Column("event_tag_ids", ARRAY(Integer), server_default="{}", nullable=False),
+        Column("archived", DateTime, server_default=func.timezone("utc", func.now()), nullable=False),
+        Index("idx_event_instances_archive_org_id_start_date", "org_id", "start_date"),
+        Index("idx_event_instances_archive_start_date", "start_date"),
+    )
+
+
+class AttendanceArchive(Base):
+    """
+    Model representing archived attendance, moved here with its event instance (see EventInstanceArchive); the columns mirror Attendance, without foreign keys, and its attendance types are kept as an id array.
+
+    Attributes:
+        (all Attendance attributes)
+        attendance_type_ids (List[int]): The IDs of the attendance's attendance types.
+        archived (datetime): The timestamp when the attendance was archived.
+    """  # noqa: E501
+
+    __table__ = Table(
+        "attendance_archive",
+        Base.metadata,
+        *(Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable) for c in Attendance.__table__.columns),
+        Column("attendance_type_ids", ARRAY(Integer), server_default="{}", nullable=False),
+        Column("archived", DateTime, server_default=func.timezone("utc", func.now()), nullable=False),
+        Index("idx_attendance_archive_event_instance_id", "event_instance_id"),
+        Index("idx_attendance_archive_user_id", "user_id"),
+        Index("idx_attendance_archive_start_date", "start_date"),
+    )
+
+
 class AttendanceExpanded(Base):
     """
     Read-only ORM mapping for the materialized view `attendance_expanded`.
@@ -1409,6 +1619,7 @@ class NextAuthSession(Base):
     """  # noqa: E501
 
     __tablename__ = "auth_sessions"
+    __table_args__ = (Index("idx_auth_sessions_expires", "expires"),)
 
     session_token: Mapped[text] = mapped_column(TEXT, primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
@@ -1430,6 +1641,7 @@ class NextAuthVerificationToken(Base):
     """  # noqa: E501
 
     __tablename__ = "auth_verification_tokens"
+    __table_args__ = (Index("idx_auth_verification_tokens_expires", "expires"),)
 
     identifier: Mapped[text] = mapped_column(VARCHAR, primary_key=True)
     token: Mapped[text] = mapped_column(VARCHAR, primary_key=True)
@@ -1493,6 +1705,10 @@ class UpdateRequest(Base):
     """  # noqa: E501
 
     __tablename__ = "update_requests"
+    __table_args__ = (
+        Index("idx_update_requests_region_id_status_created", "region_id", "status", "created"),
+        Index("idx_update_requests_token", "token"),
+    )
 
     id: Mapped[Uuid] = mapped_column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
     token: Mapped[Uuid] = mapped_column(UUID(as_uuid=True), server_default=func.gen_random_uuid())
@@ -1548,6 +1764,28 @@ class UpdateRequest(Base):
     updated: Mapped[dt_update]
 
 
+class UpdateRequestArchive(Base):
+    """
+    Model representing an archived update request. Approved and rejected requests are moved here once they are old, keeping update_requests small; the columns mirror UpdateRequest, without foreign keys.
+
+    Attributes:
+        (all UpdateRequest attributes)
+        archived (datetime): The timestamp when the request was archived.
+    """  # noqa: E501
+
+    __table__ = Table(
+        "update_requests_archive",
+        Base.metadata,
+        *(
+            Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable)
+            for c in UpdateRequest.__table__.columns
+        ),
+        Column("archived", DateTime, server_default=func.timezone("utc", func.now()), nullable=False),
+        Index("idx_update_requests_archive_region_id_created", "region_id", "created"),
+        Index("idx_update_requests_archive_token", "token"),
+    )
+
+
 # -- Main table for entries
 # CREATE TABLE IF NOT EXISTS codex_entries (
 #   id SERIAL PRIMARY KEY,
@@ -1594,6 +1832,13 @@ class UpdateRequest(Base):
 # );
 
 
+CODEX_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(jsonb_to_tsvector('english', coalesce(aliases, '[]'::jsonb), '[\"string\"]'), 'A') || "
+    "setweight(to_tsvector('english', coalesce(definition, '')), 'B')"
+)
+
+
 class CodexEntry(Base):
     """
     Model representing a Codex entry.
@@ -1605,11 +1850,22 @@ class CodexEntry(Base):
         type (str): The type of the entry.
         aliases (Optional[List[str]]): Aliases for the entry.
         video_link (Optional[str]): A link to a video related to the entry.
+        search_vector (Optional[Any]): Generated full-text search vector over title, aliases and definition. Deferred; not loaded by default.
         created (datetime): The timestamp when the record was created.
         updated (datetime): The timestamp when the record was last updated.
     """  # noqa: E501
 
     __tablename__ = "codex_entries"
+    __table_args__ = (
+        Index("idx_codex_entries_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "idx_codex_entries_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index("idx_codex_entries_aliases_trgm", sql_text("(aliases::text) gin_trgm_ops"), postgresql_using="gin"),
+    )
 
     id: Mapped[intpk]
     title: Mapped[str]
@@ -1617,6 +1873,9 @@ class CodexEntry(Base):
     type: Mapped[str]
     aliases: Mapped[Optional[List[str]]] = mapped_column(JSONB, server_default="[]")
     video_link: Mapped[Optional[str]]
+    search_vector: Mapped[Optional[Any]] = mapped_column(
+        TSVECTOR, Computed(CODEX_SEARCH_VECTOR_SQL, persisted=True), deferred=True
+    )
     created: Mapped[dt_create]
     updated: Mapped[dt_update]
 
@@ -1673,6 +1932,14 @@ class CodexUserSubmission(Base):
     """  # noqa: E501
 
     __tablename__ = "codex_user_submissions"
+    __table_args__ = (
+        Index(
+            "idx_codex_user_submissions_pending",
+            "timestamp",
+            "id",
+            postgresql_where=sql_text("status = 'pending'"),
+        ),
+    )
 
     id: Mapped[intpk]
     submission_type: Mapped[str]
@@ -1702,6 +1969,10 @@ class CodexReference(Base):
     """  # noqa: E501
 
     __tablename__ = "codex_references"
+    __table_args__ = (
+        Index("idx_codex_references_from_entry_id", "from_entry_id"),
+        Index("idx_codex_references_to_entry_id", "to_entry_id"),
+    )
 
     id: Mapped[intpk]
     from_entry_id: Mapped[int] = mapped_column(ForeignKey("codex_entries.id", ondelete="CASCADE"))
@@ -1709,3 +1980,138 @@ class CodexReference(Base):
     context: Mapped[Optional[str]]
     created: Mapped[dt_create]
     updated: Mapped[dt_update]
+
+
+class ReplicationTombstone(Base):
+    """
+    Model representing a deleted row awaiting replication. A statement-level trigger on each incrementally replicated table records its deletes here, so they can be applied to BigQuery; rows are removed once replicated.
+
+    Attributes:
+        id (int): Primary Key of the model, in delete order.
+        table_name (str): The table the row was deleted from.
+        row_id (str): The deleted row's id, as text.
+        deleted (datetime): The timestamp when the row was deleted.
+    """  # noqa: E501
+
+    __tablename__ = "replication_tombstones"
+    __table_args__ = (Index("idx_replication_tombstones_table_name_id", "table_name", "id"),)
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    table_name: Mapped[str]
+    row_id: Mapped[str]
+    deleted: Mapped[dt_create]
+
+
+class ReplicationWatermark(Base):
+    """
+    Model representing how far a table has been replicated to BigQuery.
+
+    Attributes:
+        table_name (str): Primary Key of the model, the replicated table.
+        updated_watermark (Optional[datetime]): The latest `updated` value replicated.
+        tombstone_id (int): The highest ReplicationTombstone id applied so far.
+        replicated (Optional[datetime]): The timestamp of the last successful replication.
+    """  # noqa: E501
+
+    __tablename__ = "replication_watermarks"
+
+    table_name: Mapped[str] = mapped_column(primary_key=True)
+    updated_watermark: Mapped[Optional[datetime]]
+    tombstone_id: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+    replicated: Mapped[Optional[datetime]]
+
+
+class ChangeLog(Base):
+    """
+    Model representing one row change, appended by a trigger on each captured table (see f3_data_models.cdc). Read it in (tx_id, id) order: ids are assigned in commit-independent order, but every change of a transaction shares its tx_id.
+
+    Attributes:
+        id (int): Primary Key of the model.
+        tx_id (int): The id of the writing transaction (pg_current_xact_id).
+        table_name (str): The table changed.
+        row_id (str): The changed row's id, as text.
+        operation (str): 'INSERT', 'UPDATE' or 'DELETE'.
+        diff (Optional[Dict[str, Any]]): The new row for inserts, the changed columns' new values for updates (excluding `updated`), and None for deletes.
+        changed (datetime): The timestamp of the change.
+    """  # noqa: E501
+
+    __tablename__ = "change_log"
+    __table_args__ = (Index("idx_change_log_tx_id_id", "tx_id", "id"),)
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    tx_id: Mapped[int] = mapped_column(BigInteger)
+    table_name: Mapped[str]
+    row_id: Mapped[str]
+    operation: Mapped[str]
+    diff: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB)
+    changed: Mapped[dt_create]
+
+
+class ChangeLogOffset(Base):
+    """
+    Model representing how far a change_log consumer has read.
+
+    Attributes:
+        consumer (str): Primary Key of the model, the consumer's name.
+        tx_id (int): The tx_id of the last change consumed.
+        change_id (int): The id of the last change consumed.
+        updated (datetime): The timestamp when the offset was last committed.
+    """  # noqa: E501
+
+    __tablename__ = "change_log_offsets"
+
+    consumer: Mapped[str] = mapped_column(primary_key=True)
+    tx_id: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+    change_id: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+    updated: Mapped[dt_update]
+
+
+# Named column subsets for DbManager reads (`profile=`): what list views render. Other columns are not fetched, and
+# to_json leaves them out.
+LOAD_PROFILES: Dict[str, Dict[type, List[str]]] = {
+    "summary": {
+        Org: ["id", "parent_id", "org_type", "name", "is_active", "logo_url"],
+        Event: [
+            "id",
+            "org_id",
+            "location_id",
+            "is_active",
+            "highlight",
+            "start_date",
+            "end_date",
+            "start_time",
+            "end_time",
+            "day_of_week",
+            "name",
+            "is_private",
+        ],
+        EventInstance: [
+            "id",
+            "org_id",
+            "location_id",
+            "series_id",
+            "is_active",
+            "highlight",
+            "start_date",
+            "end_date",
+            "start_time",
+            "end_time",
+            "name",
+            "pax_count",
+            "fng_count",
+            "is_private",
+        ],
+        User: ["id", "f3_name", "first_name", "last_name", "home_region_id", "avatar_url", "status"],
+        UpdateRequest: [
+            "id",
+            "region_id",
+            "request_type",
+            "status",
+            "event_name",
+            "location_name",
+            "submitted_by",
+            "created",
+            "updated",
+        ],
+    },
+}
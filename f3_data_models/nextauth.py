@@ -0,0 +1,315 @@
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, NamedTuple, Optional, Set
+
+from sqlalchemy import any_, bindparam, delete, func, literal_column, select, tuple_, update
+
+from f3_data_models.cache import LRUCache
+from f3_data_models.models import NextAuthSession, NextAuthVerificationToken, User
+from f3_data_models.utils import (
+    _require_write_backend,
+    add_write_listener,
+    get_engine,
+    remove_write_listener,
+    session_scope,
+)
+
+EXPIRING_MODELS = (NextAuthSession, NextAuthVerificationToken)
+
+
+def _expired_batch_delete(model, batch_size: int, before, postgresql: bool):
+    table = model.__table__
+    if postgresql:
+        # Locate the batch by physical row id, skipping rows other sessions hold, and delete it with a TID scan
+        ctid = literal_column("ctid")
+        batch = (
+            select(ctid)
+            .select_from(table)
+            .where(table.c.expires < before)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        return delete(table).where(ctid == any_(func.array(batch.scalar_subquery())))
+    primary_key = tuple_(*table.primary_key.columns)
+    batch = select(*table.primary_key.columns).where(table.c.expires < before).limit(batch_size)
+    return delete(table).where(primary_key.in_(batch))
+
+
+def sweep_expired(
+    model,
+    batch_size: int = 5000,
+    max_batches: Optional[int] = None,
+    before: Optional[datetime] = None,
+    backend: Optional[str] = None,
+) -> int:
+    """
+    Delete expired rows from an auth table in bounded batches. Each batch is its own short transaction found
+    through the expiry index, so the sweep never holds locks on more than `batch_size` rows or blocks sign-ins.
+
+    Args:
+        model: NextAuthSession or NextAuthVerificationToken.
+        batch_size (int): The maximum number of rows deleted per transaction.
+        max_batches (Optional[int]): Stop after this many batches; None sweeps until no expired rows remain.
+        before (Optional[datetime]): Rows expiring before this time are deleted. Defaults to the database's current
+            UTC time.
+        backend (Optional[str]): The database backend to write to.
+
+    Returns:
+        int: The number of rows deleted.
+    """
+    _require_write_backend(backend)
+    cutoff = func.timezone("utc", func.now()) if before is None else before
+    postgresql = get_engine(backend=backend).dialect.name == "postgresql"
+    stmt = _expired_batch_delete(model, batch_size, cutoff, postgresql)
+    total = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        with session_scope(backend=backend) as session:
+            deleted = session.execute(stmt).rowcount
+        total += deleted
+        batches += 1
+        if deleted < batch_size:
+            break
+    return total
+
+
+def sweep_expired_auth(
+    batch_size: int = 5000, max_batches: Optional[int] = None, backend: Optional[str] = None
+) -> Dict[str, int]:
+    """
+    Sweep expired sessions and verification tokens.
+
+    Args:
+        batch_size (int): The maximum number of rows deleted per transaction.
+        max_batches (Optional[int]): The maximum number of batches per table.
+        backend (Optional[str]): The database backend to write to.
+
+    Returns:
+        Dict[str, int]: The number of rows deleted, keyed by table name.
+    """
+    return {
+        model.__tablename__: sweep_expired(model, batch_size=batch_size, max_batches=max_batches, backend=backend)
+        for model in EXPIRING_MODELS
+    }
+
+
+class ExpiredAuthSweeper:
+    """
+    Runs `sweep_expired_auth` periodically on a daemon thread, for processes without a job scheduler.
+
+    Args:
+        interval (float): Seconds between sweeps.
+        batch_size (int): The maximum number of rows deleted per transaction.
+        max_batches (Optional[int]): The maximum number of batches per table and sweep.
+        backend (Optional[str]): The database backend to write to.
+    """
+
+    def __init__(
+        self,
+        interval: float = 3600,
+        batch_size: int = 5000,
+        max_batches: Optional[int] = 100,
+        backend: Optional[str] = None,
+    ):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.backend = backend
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> Dict[str, int]:
+        deleted = sweep_expired_auth(batch_size=self.batch_size, max_batches=self.max_batches, backend=self.backend)
+        logging.debug(f"Swept expired auth rows: {deleted}")
+        return deleted
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logging.error(f"Expired auth sweep failed: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self) -> "ExpiredAuthSweeper":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="expired-auth-sweeper", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+class AuthSession(NamedTuple):
+    """
+    A NextAuth session resolved together with its user.
+
+    Attributes:
+        session (NextAuthSession): The session. `expires` reflects sliding-expiry extensions not yet flushed.
+        user (User): The session's user.
+    """
+
+    session: NextAuthSession
+    user: User
+
+
+# Built once with a bind parameter, so every lookup reuses the same compiled statement (and, with pg8000, the
+# same server-side prepared statement)
+SESSION_LOOKUP = (
+    select(NextAuthSession, User)
+    .join(User, User.id == NextAuthSession.user_id)
+    .where(NextAuthSession.session_token == bindparam("session_token"))
+)
+EXTEND_EXPIRY = (
+    update(NextAuthSession.__table__)
+    .where(NextAuthSession.__table__.c.session_token == bindparam("b_session_token"))
+    .values(expires=bindparam("b_expires"))
+)
+AUTH_TABLES = frozenset({"auth_sessions", "users"})
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class AuthSessionResolver:
+    """
+    Fast path for the session lookup on every authenticated request: one joined query for the session and its
+    user, a short-lived cache for hot sessions, and NextAuth-style sliding expiry whose writes are batched.
+
+    A session is extended to `max_age` from now once it is older than `update_age`, as NextAuth does. Extensions
+    are applied to the cached session immediately and written together by `flush`, which runs automatically
+    once `flush_size` extensions are waiting or `flush_interval` seconds have passed.
+
+    Args:
+        ttl (float): Seconds a resolved session is served from memory. Keep it short: sign-outs in other
+            processes are only seen when it lapses.
+        maxsize (int): The maximum number of sessions kept in memory.
+        max_age (timedelta): The session lifetime after an extension, matching NextAuth's `session.maxAge`.
+        update_age (timedelta): How often a session is extended, matching NextAuth's `session.updateAge`.
+        flush_size (int): Flush once this many extensions are waiting.
+        flush_interval (float): Flush waiting extensions at least this often, in seconds.
+        backend (Optional[str]): The database backend to use.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 30,
+        maxsize: int = 10000,
+        max_age: timedelta = timedelta(days=30),
+        update_age: timedelta = timedelta(days=1),
+        flush_size: int = 100,
+        flush_interval: float = 30,
+        backend: Optional[str] = None,
+    ):
+        # Sliding expiry writes back to auth_sessions
+        _require_write_backend(backend)
+        self.max_age = max_age
+        self.update_age = update_age
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.backend = backend
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._pending: Dict[str, datetime] = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        add_write_listener(self._on_write)
+
+    def close(self) -> None:
+        """Flush waiting extensions and stop listening for writes."""
+        self.flush()
+        remove_write_listener(self._on_write)
+
+    def _on_write(self, tables: Set[str]) -> None:
+        if tables & AUTH_TABLES:
+            self._cache.clear()
+
+    def get(self, session_token: str, extend: bool = True) -> Optional[AuthSession]:
+        """
+        Resolve a session token.
+
+        Args:
+            session_token (str): The session token from the NextAuth cookie.
+            extend (bool): Whether to apply sliding expiry.
+
+        Returns:
+            Optional[AuthSession]: The session and user, or None if the token is unknown or expired.
+        """
+        resolved = self._cache.get(session_token)
+        if resolved is None:
+            with session_scope(backend=self.backend) as session:
+                row = session.execute(SESSION_LOOKUP, {"session_token": session_token}).first()
+                session.expunge_all()
+            if row is None:
+                return None
+            resolved = AuthSession(*row)
+            self._cache.set(session_token, resolved)
+
+        now = _utcnow()
+        if resolved.session.expires <= now:
+            self._cache.pop(session_token)
+            return None
+        if extend and resolved.session.expires - self.max_age + self.update_age <= now:
+            resolved.session.expires = now + self.max_age
+            with self._lock:
+                self._pending[session_token] = resolved.session.expires
+        self._maybe_flush()
+        return resolved
+
+    def _maybe_flush(self) -> None:
+        if self._pending and (
+            len(self._pending) >= self.flush_size or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Write waiting expiry extensions with a single executemany UPDATE.
+
+        Returns:
+            int: The number of sessions extended.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if pending:
+            with session_scope(backend=self.backend) as session:
+                session.execute(
+                    EXTEND_EXPIRY,
+                    [{"b_session_token": token, "b_expires": expires} for token, expires in pending.items()],
+                )
+        return len(pending)
+
+    def invalidate(self, session_token: Optional[str] = None) -> None:
+        """Drop one cached session (e.g. on sign-out), or all of them when no token is given."""
+        if session_token is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(session_token)
+            with self._lock:
+                self._pending.pop(session_token, None)
+
+
+_DEFAULT_RESOLVER: Optional[AuthSessionResolver] = None
+
+
+def get_auth_session_resolver() -> AuthSessionResolver:
+    """Get the process-wide AuthSessionResolver, creating it on first use."""
+    global _DEFAULT_RESOLVER
+    if _DEFAULT_RESOLVER is None:
+        _DEFAULT_RESOLVER = AuthSessionResolver()
+        atexit.register(_DEFAULT_RESOLVER.flush)
+    return _DEFAULT_RESOLVER
+
+
+def get_session_and_user(session_token: str) -> Optional[AuthSession]:
+    """Resolve a session token using the process-wide AuthSessionResolver. See AuthSessionResolver.get."""
+    return get_auth_session_resolver().get(session_token)
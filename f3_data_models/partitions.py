@@ -0,0 +1,221 @@
+"""
+Monthly range partitions of event_instances, by start_date (migration b5361c6ae693). Partitions are created
+ahead by the migration and by this module's CLI, which should run periodically (e.g. monthly):
+
+    python -m f3_data_models.partitions
+    python -m f3_data_models.partitions --months-ahead 36
+
+Inserting an event instance through the ORM (including DbManager), or moving one to another month, into a month
+without a partition creates it first, on a separate short-lived connection: creating a partition locks
+event_instances exclusively, and inside the caller's transaction the lock would block every read of event_instances
+until it commits. This is the rare exception (a warning is logged); keep the CLI scheduled so the months written to
+exist beforehand. Core inserts (e.g. DbManager.upsert_records) rely on the partitions created ahead.
+"""
+
+import argparse
+import logging
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+
+from f3_data_models.cache import LRUCache
+from f3_data_models.models import EventInstance
+
+# Partitioned tables and their partition columns
+PARTITIONED_TABLES = {"event_instances": "start_date"}
+MONTHS_AHEAD = 24
+# How long creating a partition outside the caller's transaction waits for its lock before giving up
+LOCK_TIMEOUT = "2s"
+
+# How long a past month's partition is remembered to exist. drop_empty_partitions forgets the partitions it drops,
+# but other processes may remember them this long; months from the current one on are never dropped
+PAST_PARTITION_TTL = 600
+
+# (database, table, month) of partitions known to exist
+_KNOWN_PARTITIONS = LRUCache(maxsize=4096)
+
+
+def add_months(month: date, months: int) -> date:
+    """The first day of the month `months` after `month`'s."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(day: date) -> Tuple[date, date]:
+    """
+    The first day of `day`'s month and of the next. Filtering the partition column with these bounds, e.g.
+    `EventInstance.start_date >= start, EventInstance.start_date < end`, reads a single partition.
+    """
+    start = day.replace(day=1)
+    return start, add_months(start, 1)
+
+
+def partition_name(table: str, day: date) -> str:
+    """The name of `table`'s partition for `day`'s month, e.g. 'event_instances_2025_01'."""
+    return f"{table}_{day:%Y_%m}"
+
+
+def _partition_key(connection: Connection, table: str, start: date) -> Tuple[str, str, date]:
+    return connection.engine.url.render_as_string(hide_password=True), table, start
+
+
+def _partition_exists(connection: Connection, table: str, start: date) -> bool:
+    key = _partition_key(connection, table, start)
+    if key in _KNOWN_PARTITIONS:
+        return True
+    exists = connection.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": partition_name(table, start)})
+    # Created partitions are only remembered once seen committed, as their transaction could still roll back
+    if exists:
+        past = start < date.today().replace(day=1)
+        _KNOWN_PARTITIONS.set(key, True, ttl=PAST_PARTITION_TTL if past else None)
+    return exists
+
+
+def ensure_partition(connection: Connection, table: str, day: date) -> None:
+    """
+    Create `table`'s partition for `day`'s month if it does not exist, in the connection's transaction. Creating
+    it locks `table` exclusively until the transaction ends.
+
+    Args:
+        connection (Connection): A PostgreSQL connection.
+        table (str): A table in PARTITIONED_TABLES.
+        day (date): Any day of the month.
+    """
+    start, end = month_range(day)
+    if not _partition_exists(connection, table, start):
+        connection.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(table, start)} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{start}') TO ('{end}')"
+            )
+        )
+
+
+def ensure_partitions(
+    connection: Connection, through: Optional[date] = None, months_ahead: int = MONTHS_AHEAD
+) -> List[str]:
+    """
+    Create any missing partitions from the current month through `through`.
+
+    Args:
+        connection (Connection): A PostgreSQL connection.
+        through (Optional[date]): The last month to cover. Defaults to `months_ahead` months from now.
+        months_ahead (int): Months to cover when `through` is not given.
+
+    Returns:
+        List[str]: The partitions checked, in order.
+    """
+    month = date.today().replace(day=1)
+    through = (through or add_months(month, months_ahead)).replace(day=1)
+    names = []
+    while month <= through:
+        for table in PARTITIONED_TABLES:
+            ensure_partition(connection, table, month)
+            names.append(partition_name(table, month))
+        month = add_months(month, 1)
+    return names
+
+
+def drop_empty_partitions(connection: Connection, table: str, before: date) -> List[str]:
+    """
+    Drop `table`'s empty partitions for months that end on or before `before`, e.g. once their rows are archived.
+    A later write to one of those months creates its partition again, though other processes may take up to
+    PAST_PARTITION_TTL seconds to notice it is gone. Partitions from the current month on are never dropped.
+
+    Args:
+        connection (Connection): A PostgreSQL connection.
+        table (str): A table in PARTITIONED_TABLES.
+        before (date): Partitions are dropped if they hold no rows on or after this date.
+
+    Returns:
+        List[str]: The partitions dropped.
+    """
+    names = connection.scalars(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:table AS regclass) ORDER BY c.relname"
+        ),
+        {"table": table},
+    ).all()
+    before = min(before, date.today().replace(day=1))
+    dropped = []
+    for name in names:
+        try:
+            month = datetime.strptime(name[len(table) + 1 :], "%Y_%m").date()
+        except ValueError:
+            continue
+        if add_months(month, 1) > before:
+            continue
+        is_empty = text(f"SELECT NOT EXISTS (SELECT 1 FROM {name})")
+        if not connection.scalar(is_empty):
+            continue
+        # Checked again under the lock, so no row can be added in between
+        connection.execute(text(f"LOCK TABLE {name} IN ACCESS EXCLUSIVE MODE"))
+        if not connection.scalar(is_empty):
+            continue
+        connection.execute(text(f"DROP TABLE {name}"))
+        _KNOWN_PARTITIONS.pop(_partition_key(connection, table, month))
+        dropped.append(name)
+    return dropped
+
+
+def _holds_lock(connection: Connection, table: str) -> bool:
+    return connection.scalar(
+        text("SELECT EXISTS (SELECT 1 FROM pg_locks WHERE pid = pg_backend_pid() AND relation = to_regclass(:table))"),
+        {"table": table},
+    )
+
+
+@event.listens_for(EventInstance, "before_insert")
+def _ensure_event_instance_partition(mapper, connection: Connection, target: EventInstance) -> None:
+    if connection.dialect.name != "postgresql" or not isinstance(target.start_date, date):
+        return
+    table = EventInstance.__tablename__
+    start = target.start_date.replace(day=1)
+    if _partition_exists(connection, table, start):
+        return
+    # Created and committed on its own connection, unless this transaction already holds a lock on the table,
+    # which the other connection would wait on forever
+    if not _holds_lock(connection, table):
+        try:
+            with connection.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as own_connection:
+                own_connection.execute(text(f"SET lock_timeout = '{LOCK_TIMEOUT}'"))
+                ensure_partition(own_connection, table, start)
+            logging.warning(f"Created partition {partition_name(table, start)} on demand; run the partitions CLI")
+            return
+        except OperationalError as e:
+            logging.warning(f"Could not create partition {partition_name(table, start)} on its own connection: {e}")
+    logging.warning(
+        f"Creating partition {partition_name(table, start)} in the current transaction; event_instances is locked "
+        "until it ends. Run the partitions CLI so months are created ahead."
+    )
+    ensure_partition(connection, table, start)
+
+
+@event.listens_for(EventInstance, "before_update")
+def _ensure_moved_event_instance_partition(mapper, connection: Connection, target: EventInstance) -> None:
+    # Only an instance whose start_date changed can need another partition
+    if inspect(target).attrs.start_date.history.has_changes():
+        _ensure_event_instance_partition(mapper, connection, target)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from f3_data_models.utils import get_engine
+
+    parser = argparse.ArgumentParser(prog="python -m f3_data_models.partitions", description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--months-ahead", type=int, default=MONTHS_AHEAD, help=f"Months to create ahead (default: {MONTHS_AHEAD})"
+    )
+    args = parser.parse_args(argv)
+
+    with get_engine().begin() as connection:
+        names = ensure_partitions(connection, months_ahead=args.months_ahead)
+    print(f"{len(names)} partitions through {names[-1]}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,166 @@
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict
+
+from sqlalchemy import Select, bindparam, select
+from sqlalchemy.orm import Session, undefer_group
+from sqlalchemy.util import LRUCache
+
+from f3_data_models.models import CONTENT_GROUP, EventInstance, SlackUser
+
+RESULT_MODES = {"one", "first", "all"}
+
+
+class _CountingCompiledCache(LRUCache):
+    """SQLAlchemy compiled-statement cache that counts lookups."""
+
+    def __init__(self, capacity: int = 500):
+        super().__init__(capacity)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        value = super().get(key, default)
+        if value is default:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+
+@dataclass
+class NamedQuery:
+    """
+    A statement registered in a QueryRegistry.
+
+    Attributes:
+        name (str): The registry name.
+        statement (Select): The statement, with a `bindparam` for every value that varies between calls.
+        result (str): 'one', 'first' or 'all' scalars.
+        calls (int): The number of times the query has been executed.
+    """
+
+    name: str
+    statement: Select
+    result: str = "all"
+    calls: int = 0
+
+
+class QueryRegistry:
+    """
+    Named, pre-built statements for the hottest lookups. Each statement is constructed once with bind parameters,
+    so a call skips building the `select`, and SQLAlchemy's cache key for it is computed once and memoized on
+    the statement. The compiled form is kept in the registry's own compiled cache, whose hit rate is reported by
+    `stats`, so the hot queries are not evicted by ad hoc ones.
+
+    Args:
+        compiled_cache_size (int): The number of compiled statements kept.
+    """
+
+    def __init__(self, compiled_cache_size: int = 500):
+        self._queries: Dict[str, NamedQuery] = {}
+        self._compiled_cache = _CountingCompiledCache(compiled_cache_size)
+        self._lock = threading.Lock()
+
+    def register(self, name: str, statement: Select, result: str = "all") -> NamedQuery:
+        """
+        Register a statement under a name, replacing any statement of the same name.
+
+        Args:
+            name (str): The query name.
+            statement (Select): The statement, using `bindparam` for its parameters.
+            result (str): 'one', 'first' or 'all'.
+
+        Returns:
+            NamedQuery: The registered query.
+        """
+        if result not in RESULT_MODES:
+            raise ValueError(f"Unsupported result '{result}'. Supported results: {', '.join(sorted(RESULT_MODES))}")
+        query = NamedQuery(name, statement, result)
+        self._queries[name] = query
+        return query
+
+    def get_by_id(self, cls) -> NamedQuery:
+        """
+        The registered primary key lookup for a model, registering it on first use. Like `DbManager.get`, it loads
+        the deferred content group; other deferred columns (e.g. CodexEntry.search_vector) stay deferred.
+        """
+        name = f"get_by_id:{cls.__name__}"
+        query = self._queries.get(name)
+        if query is None:
+            with self._lock:
+                query = self._queries.get(name) or self.register(
+                    name,
+                    select(cls).where(cls.id == bindparam("id")).options(undefer_group(CONTENT_GROUP)),
+                    result="one",
+                )
+        return query
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._queries
+
+    def execute(self, session: Session, name: str, **params: Any) -> Any:
+        """
+        Run a registered query. Returned objects stay attached to `session`.
+
+        Args:
+            session (Session): The session to execute in.
+            name (str): The query name.
+            **params: Values for the statement's bind parameters.
+
+        Returns:
+            Any: One object ('one'), an object or None ('first') or a list of objects ('all').
+        """
+        try:
+            query = self._queries[name]
+        except KeyError:
+            raise ValueError(f"No query registered as '{name}'") from None
+        query.calls += 1
+        result = session.scalars(
+            query.statement, params, execution_options={"compiled_cache": self._compiled_cache}
+        ).unique()
+        if query.result == "one":
+            return result.one()
+        if query.result == "first":
+            return result.first()
+        return result.all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Call counts per query and the compiled cache hit rate."""
+        lookups = self._compiled_cache.hits + self._compiled_cache.misses
+        return {
+            "calls": {name: query.calls for name, query in self._queries.items()},
+            "compiled_hits": self._compiled_cache.hits,
+            "compiled_misses": self._compiled_cache.misses,
+            "hit_rate": self._compiled_cache.hits / lookups if lookups else 0.0,
+        }
+
+    def reset_stats(self) -> None:
+        self._compiled_cache.hits = self._compiled_cache.misses = 0
+        for query in self._queries.values():
+            query.calls = 0
+
+
+def default_registry() -> QueryRegistry:
+    """
+    A registry with the lookups the Slack bot makes on nearly every request:
+
+    - 'slack_user_by_slack_id' (slack_team_id, slack_id): the SlackUser, or None
+    - 'event_instances_by_date' (org_id, start_date): the org's event instances on a date
+    """
+    registry = QueryRegistry()
+    registry.register(
+        "slack_user_by_slack_id",
+        select(SlackUser).where(
+            SlackUser.slack_team_id == bindparam("slack_team_id"), SlackUser.slack_id == bindparam("slack_id")
+        ),
+        result="first",
+    )
+    registry.register(
+        "event_instances_by_date",
+        select(EventInstance)
+        .where(EventInstance.org_id == bindparam("org_id"), EventInstance.start_date == bindparam("start_date"))
+        .order_by(EventInstance.start_time, EventInstance.id)
+        .options(undefer_group(CONTENT_GROUP)),
+    )
+    return registry
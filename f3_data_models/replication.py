@@ -0,0 +1,560 @@
+"""
+Incremental replication of the PostgreSQL tables to the BigQuery dataset read by the bigquery backend.
+
+    python -m f3_data_models.replication
+    python -m f3_data_models.replication --tables orgs events event_instances
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from enum import Enum as PyEnum
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import (
+    ARRAY,
+    JSON,
+    Boolean,
+    Date,
+    DateTime,
+    Float,
+    Integer,
+    LargeBinary,
+    Numeric,
+    String,
+    Table,
+    Time,
+    Uuid,
+    delete,
+    func,
+    select,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+from f3_data_models.models import Base, CIText, ReplicationTombstone, ReplicationWatermark
+from f3_data_models.partitions import PARTITIONED_TABLES
+from f3_data_models.utils import session_scope
+
+# Tables with an `updated` trigger and a tombstone trigger; copied by watermark, with deletes applied from tombstones
+INCREMENTAL_TABLES = (
+    "slack_spaces",
+    "roles",
+    "permissions",
+    "orgs",
+    "event_types",
+    "event_tags",
+    "locations",
+    "events",
+    "event_instances",
+    "attendance_types",
+    "attendance",
+    "users",
+    "slack_users",
+    "positions",
+    "expansions",
+    "update_requests",
+    "achievements",
+)
+# Append-only tables copied by watermark, without deletes
+APPEND_ONLY_TABLES = {
+    "update_requests_archive": "archived",
+    "event_instances_archive": "archived",
+    "attendance_archive": "archived",
+}
+# Association tables that grow with their parent, copied through it: a trigger bumps the parent's `updated` when
+# their rows change (migration 54467d8c1a26), so the rows of parents updated since the watermark are replaced, and
+# the rows of deleted parents are deleted with the parent's tombstones. Table: (parent, column referencing it)
+REPLICATED_WITH_PARENT = {
+    "attendance_x_attendance_types": ("attendance", "attendance_id"),
+    "event_instances_x_event_types": ("event_instances", "event_instance_id"),
+    "event_tags_x_event_instances": ("event_instances", "event_instance_id"),
+}
+# Secrets, materialized views (rebuilt in BigQuery from their sources), replication state and the change log
+EXCLUDED_TABLES = frozenset(
+    {
+        "auth_accounts",
+        "auth_sessions",
+        "auth_verification_tokens",
+        "attendance_expanded",
+        "event_instance_expanded",
+        "replication_tombstones",
+        "replication_watermarks",
+        "change_log",
+        "change_log_offsets",
+    }
+)
+# Column types not replicated
+SKIPPED_TYPES = (TSVECTOR,)
+
+# Checked in order, so subclasses come before their bases
+_BIGQUERY_TYPES = (
+    (Boolean, "BOOL"),
+    (Integer, "INT64"),
+    (Float, "FLOAT64"),
+    (Numeric, "NUMERIC"),
+    (Date, "DATE"),
+    (Time, "TIME"),
+    (JSON, "JSON"),
+    (Uuid, "STRING"),
+    (LargeBinary, "BYTES"),
+    (String, "STRING"),
+    (CIText, "STRING"),
+)
+
+
+def bigquery_type(column_type) -> str:
+    """
+    The BigQuery type for a SQLAlchemy column type. Enums are stored as their names, as in PostgreSQL.
+
+    Args:
+        column_type: The column type (not an ARRAY; see `bigquery_schema`).
+
+    Returns:
+        str: The BigQuery standard SQL type name.
+    """
+    if isinstance(column_type, DateTime):
+        return "TIMESTAMP" if column_type.timezone else "DATETIME"
+    for sqlalchemy_type, name in _BIGQUERY_TYPES:
+        if isinstance(column_type, sqlalchemy_type):
+            return name
+    raise ValueError(f"No BigQuery type for column type {column_type!r}")
+
+
+def bigquery_schema(table: Table) -> List[Dict[str, str]]:
+    """
+    Derive a BigQuery schema from a table in Base.metadata. ARRAY columns become REPEATED fields; every other
+    field is NULLABLE, so later migrations can add columns in place.
+
+    Args:
+        table (Table): The table.
+
+    Returns:
+        List[Dict[str, str]]: Fields in BigQuery's JSON schema format (name, type, mode).
+    """
+    fields = []
+    for column in table.columns:
+        if isinstance(column.type, SKIPPED_TYPES):
+            continue
+        if isinstance(column.type, ARRAY):
+            fields.append({"name": column.name, "type": bigquery_type(column.type.item_type), "mode": "REPEATED"})
+        else:
+            fields.append({"name": column.name, "type": bigquery_type(column.type), "mode": "NULLABLE"})
+    return fields
+
+
+def replicated_tables() -> List[Table]:
+    """Every table in Base.metadata except EXCLUDED_TABLES, in dependency order."""
+    return [table for table in Base.metadata.sorted_tables if table.name not in EXCLUDED_TABLES]
+
+
+def _watermark_column(table: Table) -> Optional[str]:
+    if table.name in INCREMENTAL_TABLES:
+        return "updated"
+    return APPEND_ONLY_TABLES.get(table.name)
+
+
+def _staging_field(field: Dict[str, str]) -> Dict[str, str]:
+    # JSON is loaded as a string and parsed by the MERGE
+    return {**field, "type": "STRING"} if field["type"] == "JSON" else field
+
+
+def _arrow_type(bigquery_type_name: str):
+    import pyarrow
+
+    return {
+        "BOOL": pyarrow.bool_(),
+        "INT64": pyarrow.int64(),
+        "FLOAT64": pyarrow.float64(),
+        "NUMERIC": pyarrow.decimal128(38, 9),
+        "DATE": pyarrow.date32(),
+        "TIME": pyarrow.time64("us"),
+        "DATETIME": pyarrow.timestamp("us"),
+        "TIMESTAMP": pyarrow.timestamp("us", tz="UTC"),
+        "BYTES": pyarrow.binary(),
+        "STRING": pyarrow.string(),
+    }[bigquery_type_name]
+
+
+def _arrow_value(value: Any, field: Dict[str, str]) -> Any:
+    if value is None:
+        return [] if field["mode"] == "REPEATED" else None
+    if isinstance(value, PyEnum):
+        return value.name
+    if field["mode"] == "REPEATED":
+        return [item.name if isinstance(item, PyEnum) else item for item in value]
+    if field["type"] == "STRING" and not isinstance(value, str):
+        # JSON documents and UUIDs
+        return json.dumps(value, default=str) if isinstance(value, (dict, list)) else str(value)
+    return value
+
+
+def to_parquet(fields: List[Dict[str, str]], rows: Sequence[Sequence[Any]]) -> io.BytesIO:
+    """
+    Write rows as a Parquet file with an explicit schema, so BigQuery loads them without type inference.
+
+    Args:
+        fields (List[Dict[str, str]]): The staging fields, in row order.
+        rows (Sequence[Sequence[Any]]): The rows.
+
+    Returns:
+        io.BytesIO: The Parquet file, rewound.
+    """
+    import pyarrow
+    import pyarrow.parquet
+
+    arrays = []
+    for i, field in enumerate(fields):
+        arrow_type = _arrow_type(field["type"])
+        if field["mode"] == "REPEATED":
+            arrow_type = pyarrow.list_(arrow_type)
+        arrays.append(pyarrow.array([_arrow_value(row[i], field) for row in rows], type=arrow_type))
+    buffer = io.BytesIO()
+    pyarrow.parquet.write_table(pyarrow.Table.from_arrays(arrays, names=[field["name"] for field in fields]), buffer)
+    buffer.seek(0)
+    return buffer
+
+
+@dataclass
+class ReplicationResult:
+    """
+    The outcome of replicating one table.
+
+    Attributes:
+        table (str): The table.
+        incremental (bool): Whether only rows past the watermark were copied; otherwise the table was refreshed.
+        rows (int): The rows copied.
+        deleted (int): The rows deleted in BigQuery.
+        watermark (Optional[datetime]): The watermark after the run.
+    """
+
+    table: str
+    incremental: bool
+    rows: int = 0
+    deleted: int = 0
+    watermark: Optional[datetime] = None
+
+
+def _staged_values(fields: List[Dict[str, str]]) -> List[str]:
+    # The staging table's columns, with JSON parsed back from its string form
+    return [
+        f"PARSE_JSON(S.`{field['name']}`)" if field["type"] == "JSON" else f"S.`{field['name']}`" for field in fields
+    ]
+
+
+class Replicator:
+    """
+    Copies tables from PostgreSQL to BigQuery. Each table's BigQuery schema is derived from Base.metadata, and
+    changed rows are written as Parquet load jobs into a staging table and merged into the target on the primary
+    key. Load jobs are free and atomic, unlike streaming inserts.
+
+    Tables with an `updated` column maintained by trigger (INCREMENTAL_TABLES) copy only rows updated since the
+    stored watermark, and apply deletes recorded as ReplicationTombstone rows by their delete triggers. Tables
+    in APPEND_ONLY_TABLES copy new rows only. The association tables that grow with attendance and event
+    instances (REPLICATED_WITH_PARENT) copy the rows of parents updated since the watermark, replacing those
+    parents' rows in BigQuery. Other tables, the small reference association tables (e.g. roles_x_permissions,
+    events_x_event_types), are refreshed in full on every run by a MERGE that also deletes missing rows; their
+    size does not grow with activity, so each run costs the same. A table without a watermark yet (its first
+    run, or after its replication_watermarks row is deleted to force one) is refreshed in full.
+
+    Args:
+        client: A `google.cloud.bigquery.Client`. Defaults to a client for BIGQUERY_PROJECT.
+        dataset (Optional[str]): The target dataset as 'project.dataset'. Defaults to BIGQUERY_PROJECT and
+            BIGQUERY_DATASET.
+        batch_size (int): The rows read per batch and written per load job.
+        overlap (timedelta): How far before the watermark to re-read, so rows committed late by long transactions
+            (whose `updated` is their transaction's start time) are not missed. Re-read rows merge idempotently.
+        backend (Optional[str]): The database backend to read from.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        dataset: Optional[str] = None,
+        batch_size: int = 50000,
+        overlap: timedelta = timedelta(minutes=5),
+        backend: Optional[str] = None,
+    ):
+        self._client = client
+        self.dataset = dataset or f"{os.environ['BIGQUERY_PROJECT']}.{os.environ['BIGQUERY_DATASET']}"
+        self.batch_size = batch_size
+        self.overlap = overlap
+        self.backend = backend
+
+    @property
+    def client(self):
+        if self._client is None:
+            from google.cloud import bigquery
+
+            self._client = bigquery.Client(project=self.dataset.split(".")[0])
+        return self._client
+
+    def _schema(self, fields: List[Dict[str, str]]):
+        from google.cloud import bigquery
+
+        return [bigquery.SchemaField.from_api_repr(field) for field in fields]
+
+    def sync_schema(self, tables: Optional[List[Table]] = None) -> None:
+        """
+        Create missing BigQuery tables and add columns that exist in Base.metadata but not in BigQuery. Changed
+        column types are logged, not migrated.
+        """
+        from google.api_core.exceptions import NotFound
+        from google.cloud import bigquery
+
+        for table in tables or replicated_tables():
+            fields = bigquery_schema(table)
+            table_id = f"{self.dataset}.{table.name}"
+            try:
+                existing = self.client.get_table(table_id)
+            except NotFound:
+                self.client.create_table(bigquery.Table(table_id, schema=self._schema(fields)))
+                continue
+            current = {field.name: field for field in existing.schema}
+            missing = [field for field in fields if field["name"] not in current]
+            for field in fields:
+                if field["name"] in current and current[field["name"]].field_type not in (field["type"], "RECORD"):
+                    logging.warning(
+                        f"{table_id}.{field['name']} is {current[field['name']].field_type} in BigQuery "
+                        f"but {field['type']} in the models"
+                    )
+            if missing:
+                existing.schema = list(existing.schema) + self._schema(missing)
+                self.client.update_table(existing, ["schema"])
+
+    def _load(self, destination: str, fields: List[Dict[str, str]], rows, append: bool) -> None:
+        from google.cloud import bigquery
+
+        job_config = bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.PARQUET,
+            schema=self._schema(fields),
+            write_disposition=(
+                bigquery.WriteDisposition.WRITE_APPEND if append else bigquery.WriteDisposition.WRITE_TRUNCATE
+            ),
+        )
+        parquet_options = bigquery.ParquetOptions()
+        parquet_options.enable_list_inference = True
+        job_config.parquet_options = parquet_options
+        self.client.load_table_from_file(to_parquet(fields, rows), destination, job_config=job_config).result()
+
+    def _merge_sql(self, table: Table, fields: List[Dict[str, str]], staging: str, refresh: bool) -> str:
+        # Rows of partitioned tables are still identified without the partition column, which can change
+        keys = [
+            column.name for column in table.primary_key.columns if column.name != PARTITIONED_TABLES.get(table.name)
+        ]
+        names = [f"`{field['name']}`" for field in fields]
+        values = _staged_values(fields)
+        sql = f"MERGE `{self.dataset}.{table.name}` T USING `{staging}` S ON "
+        sql += " AND ".join(f"T.`{key}` = S.`{key}`" for key in keys)
+        updates = [
+            f"{name} = {value}"
+            for field, name, value in zip(fields, names, values, strict=True)
+            if field["name"] not in keys
+        ]
+        if updates:
+            sql += f" WHEN MATCHED THEN UPDATE SET {', '.join(updates)}"
+        sql += f" WHEN NOT MATCHED THEN INSERT ({', '.join(names)}) VALUES ({', '.join(values)})"
+        if refresh:
+            sql += " WHEN NOT MATCHED BY SOURCE THEN DELETE"
+        return sql
+
+    def replicate_table(self, table: Table) -> ReplicationResult:
+        """
+        Copy one table's changes to BigQuery and advance its watermark. The watermark is only stored after the
+        MERGE succeeds, so a failed run is simply repeated.
+
+        Args:
+            table (Table): The table; its BigQuery table must exist (see `sync_schema`).
+
+        Returns:
+            ReplicationResult: What was copied.
+        """
+        if table.name in REPLICATED_WITH_PARENT:
+            return self._replicate_with_parent(table, *REPLICATED_WITH_PARENT[table.name])
+        fields = bigquery_schema(table)
+        staging_fields = [_staging_field(field) for field in fields]
+        watermark_column = _watermark_column(table)
+        tombstones_enabled = table.name in INCREMENTAL_TABLES
+        staging = f"{self.dataset}._staging_{table.name}"
+
+        with session_scope(backend=self.backend) as session:
+            state = session.get(ReplicationWatermark, table.name)
+            watermark = state.updated_watermark if state else None
+            tombstone_id = state.tombstone_id if state else 0
+
+        result = ReplicationResult(table.name, incremental=watermark_column is not None, watermark=watermark)
+        stmt = select(*(table.c[field["name"]] for field in fields))
+        if watermark_column is not None and watermark is not None:
+            stmt = stmt.where(table.c[watermark_column] >= watermark - self.overlap)
+        watermark_index = [field["name"] for field in fields].index(watermark_column) if watermark_column else None
+
+        with session_scope(backend=self.backend) as session:
+            # Every visible tombstone is unapplied, since applied ones are deleted. Ids are not a cursor: a delete
+            # committing late can hold a lower id than tombstones already seen.
+            tombstones = []
+            if tombstones_enabled:
+                tombstones = session.execute(
+                    select(ReplicationTombstone.id, ReplicationTombstone.row_id, ReplicationTombstone.deleted).where(
+                        ReplicationTombstone.table_name == table.name
+                    )
+                ).all()
+            for rows in session.execute(stmt.execution_options(yield_per=self.batch_size)).partitions():
+                self._load(staging, staging_fields, rows, append=result.rows > 0)
+                result.rows += len(rows)
+                if watermark_index is not None:
+                    latest = max(
+                        (row[watermark_index] for row in rows if row[watermark_index] is not None), default=None
+                    )
+                    if latest is not None and (result.watermark is None or latest > result.watermark):
+                        result.watermark = latest
+
+        refresh = watermark_column is None
+        if refresh and not result.rows:
+            # An empty staging table, so the refresh deletes every row
+            self._load(staging, staging_fields, [], append=False)
+        if result.rows or refresh:
+            self.client.query(self._merge_sql(table, fields, staging, refresh)).result()
+        if tombstones:
+            tombstone_table = f"{self.dataset}._tombstones_{table.name}"
+            tombstone_fields = [
+                {"name": "row_id", "type": "STRING", "mode": "NULLABLE"},
+                {"name": "deleted", "type": "DATETIME", "mode": "NULLABLE"},
+            ]
+            self._load(tombstone_table, tombstone_fields, [row[1:] for row in tombstones], append=False)
+            # A row re-inserted after its delete is newer than its tombstone and is kept
+            job = self.client.query(
+                f"DELETE FROM `{self.dataset}.{table.name}` T WHERE EXISTS (SELECT 1 FROM `{tombstone_table}` S "
+                "WHERE CAST(T.id AS STRING) = S.row_id AND T.updated <= S.deleted)"
+            )
+            job.result()
+            result.deleted = job.num_dml_affected_rows or 0
+            # Their association rows were deleted by cascade, which does not touch the deleted parent
+            for child, (parent, key) in REPLICATED_WITH_PARENT.items():
+                if parent == table.name:
+                    self.client.query(
+                        f"DELETE FROM `{self.dataset}.{child}` WHERE `{key}` IN "
+                        f"(SELECT SAFE_CAST(row_id AS INT64) FROM `{tombstone_table}`)"
+                    ).result()
+            self.client.delete_table(tombstone_table, not_found_ok=True)
+        self.client.delete_table(staging, not_found_ok=True)
+
+        applied_ids = [row[0] for row in tombstones]
+        with session_scope(backend=self.backend) as session:
+            session.merge(
+                ReplicationWatermark(
+                    table_name=table.name,
+                    updated_watermark=result.watermark,
+                    tombstone_id=max(applied_ids, default=tombstone_id),
+                    replicated=datetime.now(timezone.utc).replace(tzinfo=None),
+                )
+            )
+            if applied_ids:
+                session.execute(delete(ReplicationTombstone).where(ReplicationTombstone.id.in_(applied_ids)))
+        return result
+
+    def _replicate_with_parent(self, table: Table, parent_name: str, key: str) -> ReplicationResult:
+        """
+        Copy the rows of an association table whose parents were updated since the watermark, replacing the
+        parents' rows in BigQuery in one transaction. The first run refreshes the table in full.
+        """
+        parent = Base.metadata.tables[parent_name]
+        fields = bigquery_schema(table)
+        staging_fields = [_staging_field(field) for field in fields]
+        staging = f"{self.dataset}._staging_{table.name}"
+        parents = f"{self.dataset}._parents_{table.name}"
+        parent_fields = [{"name": key, "type": "INT64", "mode": "NULLABLE"}]
+
+        with session_scope(backend=self.backend) as session:
+            state = session.get(ReplicationWatermark, table.name)
+            watermark = state.updated_watermark if state else None
+            tombstone_id = state.tombstone_id if state else 0
+
+        result = ReplicationResult(table.name, incremental=watermark is not None, watermark=watermark)
+        stmt = select(*(table.c[field["name"]] for field in fields))
+        parent_rows = 0
+        with session_scope(backend=self.backend) as session:
+            if watermark is None:
+                # Read before the copy, so changes made during it are past the watermark
+                result.watermark = session.scalar(select(func.max(parent.c.updated)))
+            else:
+                changed = select(parent.c.id, parent.c.updated).where(parent.c.updated >= watermark - self.overlap)
+                for rows in session.execute(changed.execution_options(yield_per=self.batch_size)).partitions():
+                    self._load(parents, parent_fields, [row[:1] for row in rows], append=parent_rows > 0)
+                    parent_rows += len(rows)
+                    latest = max(row[1] for row in rows)
+                    if latest is not None and latest > result.watermark:
+                        result.watermark = latest
+                if not parent_rows:
+                    stmt = None
+                else:
+                    stmt = stmt.where(table.c[key].in_(changed.with_only_columns(parent.c.id)))
+            if stmt is not None:
+                for rows in session.execute(stmt.execution_options(yield_per=self.batch_size)).partitions():
+                    self._load(staging, staging_fields, rows, append=result.rows > 0)
+                    result.rows += len(rows)
+
+        if watermark is None or parent_rows:
+            if not result.rows:
+                self._load(staging, staging_fields, [], append=False)
+            if watermark is None:
+                self.client.query(self._merge_sql(table, fields, staging, refresh=True)).result()
+            else:
+                names = ", ".join(f"`{field['name']}`" for field in fields)
+                self.client.query(
+                    "BEGIN TRANSACTION; "
+                    f"DELETE FROM `{self.dataset}.{table.name}` WHERE `{key}` IN (SELECT `{key}` FROM `{parents}`); "
+                    f"INSERT INTO `{self.dataset}.{table.name}` ({names}) "
+                    f"SELECT {', '.join(_staged_values(fields))} FROM `{staging}` S; "
+                    "COMMIT TRANSACTION;"
+                ).result()
+                self.client.delete_table(parents, not_found_ok=True)
+            self.client.delete_table(staging, not_found_ok=True)
+
+        with session_scope(backend=self.backend) as session:
+            session.merge(
+                ReplicationWatermark(
+                    table_name=table.name,
+                    updated_watermark=result.watermark,
+                    tombstone_id=tombstone_id,
+                    replicated=datetime.now(timezone.utc).replace(tzinfo=None),
+                )
+            )
+        return result
+
+    def run(self, tables: Optional[List[Table]] = None) -> List[ReplicationResult]:
+        """
+        Sync schemas, then replicate each table.
+
+        Args:
+            tables (Optional[List[Table]]): The tables. Defaults to `replicated_tables()`.
+
+        Returns:
+            List[ReplicationResult]: One result per table.
+        """
+        tables = tables or replicated_tables()
+        self.sync_schema(tables)
+        results = []
+        for table in tables:
+            result = self.replicate_table(table)
+            logging.info(f"Replicated {result.table}: {result.rows} rows copied, {result.deleted} deleted")
+            results.append(result)
+        return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m f3_data_models.replication", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tables", nargs="*", help="Tables to replicate (default: all replicated tables)")
+    parser.add_argument("--batch-size", type=int, default=50000, help="Rows per load job (default: 50000)")
+    args = parser.parse_args(argv)
+
+    tables = [Base.metadata.tables[name] for name in args.tables] if args.tables else None
+    for result in Replicator(batch_size=args.batch_size).run(tables):
+        print(f"{result.table:>32}: {result.rows:,} copied, {result.deleted:,} deleted, watermark {result.watermark}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,284 @@
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from f3_data_models.cache import LRUCache
+from f3_data_models.models import Org, SlackUser, User
+from f3_data_models.utils import (
+    _notify_write,
+    _require_write_backend,
+    add_write_listener,
+    remove_write_listener,
+    session_scope,
+)
+
+# Tables a SlackIdentity is read from
+IDENTITY_TABLES = frozenset({"slack_users", "users", "orgs"})
+
+
+class SlackIdentity(NamedTuple):
+    """
+    A Slack user resolved to their F3 user and home region.
+
+    Attributes:
+        user (Optional[User]): The associated user, if the Slack user has been linked.
+        slack_user (SlackUser): The Slack user.
+        home_region (Optional[Org]): The user's home region, if set.
+    """
+
+    user: Optional[User]
+    slack_user: SlackUser
+    home_region: Optional[Org]
+
+
+def _identity_query(slack_team_id: str, slack_ids: Iterable[str]):
+    return (
+        select(SlackUser, User, Org)
+        .outerjoin(User, User.id == SlackUser.user_id)
+        .outerjoin(Org, Org.id == User.home_region_id)
+        .where(SlackUser.slack_team_id == slack_team_id, SlackUser.slack_id.in_(list(slack_ids)))
+    )
+
+
+class SlackIdentityResolver:
+    """
+    Maps (slack_team_id, slack_id) pairs to SlackIdentity tuples through a bounded LRU cache. Lookups that miss
+    are resolved with one indexed query, however many Slack IDs are requested. DbManager writes to IDENTITY_TABLES
+    in this process clear the cache.
+
+    Args:
+        maxsize (int): The maximum number of identities kept in memory.
+        ttl (Optional[float]): Lifetime of a cached identity in seconds, bounding staleness for changes made by
+            other processes.
+        backend (Optional[str]): The database backend to read from.
+        listen_for_writes (bool): Whether to clear the cache on DbManager writes to IDENTITY_TABLES.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 5000,
+        ttl: Optional[float] = 900,
+        backend: Optional[str] = None,
+        listen_for_writes: bool = True,
+    ):
+        self.backend = backend
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        if listen_for_writes:
+            add_write_listener(self._on_write)
+
+    def close(self) -> None:
+        remove_write_listener(self._on_write)
+
+    def _on_write(self, tables: Set[str]) -> None:
+        if tables & IDENTITY_TABLES:
+            self.invalidate()
+
+    def resolve(self, slack_team_id: str, slack_id: str) -> Optional[SlackIdentity]:
+        """
+        Resolve a single Slack user.
+
+        Args:
+            slack_team_id (str): The Slack team ID.
+            slack_id (str): The Slack user ID.
+
+        Returns:
+            Optional[SlackIdentity]: The identity, or None if the Slack user is unknown.
+        """
+        return self.resolve_many(slack_team_id, [slack_id]).get(slack_id)
+
+    def resolve_many(self, slack_team_id: str, slack_ids: Iterable[str]) -> Dict[str, SlackIdentity]:
+        """
+        Resolve many Slack users of one workspace, e.g. every PAX tagged in a backblast.
+
+        Args:
+            slack_team_id (str): The Slack team ID.
+            slack_ids (Iterable[str]): The Slack user IDs.
+
+        Returns:
+            Dict[str, SlackIdentity]: The identities keyed by Slack user ID. Unknown IDs are omitted.
+        """
+        identities: Dict[str, SlackIdentity] = {}
+        misses = []
+        for slack_id in dict.fromkeys(slack_ids):
+            cached = self._cache.get((slack_team_id, slack_id))
+            if cached is None:
+                misses.append(slack_id)
+            else:
+                identities[slack_id] = cached
+        if misses:
+            with session_scope(backend=self.backend) as session:
+                rows = session.execute(_identity_query(slack_team_id, misses)).all()
+                session.expunge_all()
+            for slack_user, user, home_region in rows:
+                identity = SlackIdentity(user, slack_user, home_region)
+                self._cache.set((slack_team_id, slack_user.slack_id), identity)
+                identities[slack_user.slack_id] = identity
+        return identities
+
+    def save(self, slack_user: SlackUser) -> SlackIdentity:
+        """
+        Write-through insert or update of a Slack user, keyed on (slack_team_id, slack_id). The cached identity is
+        replaced with the stored row.
+
+        Args:
+            slack_user (SlackUser): The Slack user to store. Its `id` is ignored.
+
+        Returns:
+            SlackIdentity: The identity of the stored Slack user.
+        """
+        _require_write_backend(self.backend)
+        values = {
+            c.key: getattr(slack_user, c.key)
+            for c in SlackUser.__table__.columns
+            if c.key not in ("id", "created", "updated") and c.key in slack_user.__dict__
+        }
+        stmt = insert(SlackUser).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SlackUser.slack_team_id, SlackUser.slack_id],
+            set_={key: stmt.excluded[key] for key in values if key not in ("slack_team_id", "slack_id")},
+        )
+        with session_scope(backend=self.backend) as session:
+            session.execute(stmt)
+            row = session.execute(_identity_query(slack_user.slack_team_id, [slack_user.slack_id])).one()
+            session.expunge_all()
+        _notify_write(SlackUser)
+        identity = SlackIdentity(row[1], row[0], row[2])
+        self._cache.set((slack_user.slack_team_id, slack_user.slack_id), identity)
+        return identity
+
+    def invalidate(self, slack_team_id: Optional[str] = None, slack_id: Optional[str] = None) -> None:
+        """Drop one cached identity, or all of them when no Slack ID is given."""
+        if slack_team_id is not None and slack_id is not None:
+            self._cache.pop((slack_team_id, slack_id))
+        else:
+            self._cache.clear()
+
+
+# Columns owned by the Slack workspace; everything else on SlackUser (user link, Strava tokens, meta) is ours
+SYNCED_COLUMNS = ("user_name", "email", "is_admin", "is_owner", "is_bot", "avatar_url", "is_active")
+
+
+@dataclass
+class SlackSyncSummary:
+    """
+    The outcome of a workspace member sync.
+
+    Attributes:
+        inserted (int): The number of new Slack users.
+        updated (int): The number of Slack users whose synced fields changed.
+        deactivated (int): The number of Slack users marked inactive.
+        unchanged (int): The number of Slack users that needed no write.
+    """
+
+    inserted: int = 0
+    updated: int = 0
+    deactivated: int = 0
+    unchanged: int = 0
+
+
+def member_to_row(member: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a member object from the Slack `users.list` API into SlackUser column values.
+
+    Args:
+        member (Dict[str, Any]): The Slack member object.
+
+    Returns:
+        Dict[str, Any]: The values for `slack_id`, `slack_updated` and the synced columns.
+    """
+    profile = member.get("profile") or {}
+    return {
+        "slack_id": member["id"],
+        "user_name": profile.get("display_name") or profile.get("real_name") or member.get("name") or member["id"],
+        "email": profile.get("email") or "",
+        "is_admin": bool(member.get("is_admin", False)),
+        "is_owner": bool(member.get("is_owner", False)),
+        "is_bot": bool(member.get("is_bot", False)),
+        "avatar_url": profile.get("image_192"),
+        "is_active": not member.get("deleted", False),
+        "slack_updated": member.get("updated"),
+    }
+
+
+def _content_hash(row) -> bytes:
+    return hashlib.blake2b(repr(tuple(row[c] for c in SYNCED_COLUMNS)).encode(), digest_size=16).digest()
+
+
+def sync_workspace_users(
+    slack_team_id: str,
+    members: Iterable[Dict[str, Any]],
+    deactivate_missing: bool = True,
+    to_row: Callable[[Dict[str, Any]], Dict[str, Any]] = member_to_row,
+    backend: Optional[str] = None,
+) -> SlackSyncSummary:
+    """
+    Sync a workspace's full member list into slack_users with a set-based diff: one read of the stored rows, then
+    at most one bulk insert, one bulk update and one deactivation statement, all in a single transaction.
+
+    A member is only compared field by field when its Slack `updated` stamp differs from `slack_updated`; the
+    comparison itself uses a content hash of the synced columns, so a bumped stamp with no visible change only
+    writes the new stamp (and is counted as unchanged).
+
+    Args:
+        slack_team_id (str): The Slack team ID.
+        members (Iterable[Dict[str, Any]]): Every member of the workspace, as returned by `users.list`.
+        deactivate_missing (bool): Whether stored Slack users absent from `members` are marked inactive.
+        to_row (Callable): Converts a member object into column values. Defaults to `member_to_row`.
+        backend (Optional[str]): The database backend to write to.
+
+    Returns:
+        SlackSyncSummary: The number of rows inserted, updated, deactivated and left unchanged.
+    """
+    _require_write_backend(backend)
+    incoming = {row["slack_id"]: row for row in map(to_row, members)}
+    summary = SlackSyncSummary()
+    stored_columns = [getattr(SlackUser, c) for c in ("id", "slack_id", "slack_updated", *SYNCED_COLUMNS)]
+
+    with session_scope(backend=backend) as session:
+        stored = {
+            row.slack_id: row
+            for row in session.execute(select(*stored_columns).where(SlackUser.slack_team_id == slack_team_id))
+        }
+
+        inserts: List[Dict[str, Any]] = []
+        updates: List[Dict[str, Any]] = []
+        # Stamps of members that changed nothing visible, stored so the next sync skips them on the stamp alone
+        restamps: List[Dict[str, Any]] = []
+        for slack_id, row in incoming.items():
+            current = stored.get(slack_id)
+            if current is None:
+                inserts.append({**row, "slack_team_id": slack_team_id})
+            elif (
+                row["slack_updated"] is not None
+                and current.slack_updated == row["slack_updated"]
+                and current.is_active == row["is_active"]
+            ):
+                summary.unchanged += 1
+            elif _content_hash(current._mapping) == _content_hash(row):
+                summary.unchanged += 1
+                if current.slack_updated != row["slack_updated"]:
+                    restamps.append({"id": current.id, "slack_updated": row["slack_updated"]})
+            else:
+                updates.append({**row, "id": current.id})
+
+        deactivations = []
+        if deactivate_missing:
+            deactivations = [row.id for slack_id, row in stored.items() if slack_id not in incoming and row.is_active]
+
+        if inserts:
+            session.execute(
+                insert(SlackUser).on_conflict_do_nothing(index_elements=[SlackUser.slack_team_id, SlackUser.slack_id]),
+                inserts,
+            )
+        if updates or restamps:
+            session.execute(update(SlackUser), updates + restamps)
+        if deactivations:
+            session.execute(update(SlackUser).where(SlackUser.id.in_(deactivations)).values(is_active=False))
+        summary.inserted, summary.updated, summary.deactivated = len(inserts), len(updates), len(deactivations)
+
+    if inserts or updates or restamps or deactivations:
+        _notify_write(SlackUser)
+    return summary
@@ -0,0 +1,104 @@
+from datetime import date, datetime, time
+from typing import Iterable, List, Optional
+
+# Every valid 'HHMM' string maps to a prebuilt time object, so parsing is a single dict lookup
+_HHMM_LOOKUP: dict[str, time] = {f"{h:02d}{m:02d}": time(h, m) for h in range(24) for m in range(60)}
+
+# Postgres regex matching a valid 'HHMM' string, used to guard generated columns against malformed values
+HHMM_PATTERN = "^([01][0-9]|2[0-3])[0-5][0-9]$"
+
+
+def parse_hhmm(value: Optional[str]) -> Optional[time]:
+    """
+    Parse an 'HHMM' string (24-hour time, timezone naive) into a time object.
+
+    Args:
+        value (Optional[str]): The time string, e.g. '0530'. Values like '5:30' or '530' are tolerated.
+
+    Returns:
+        Optional[time]: The parsed time, or None if value is None or empty.
+
+    Raises:
+        ValueError: If the value is not a valid time.
+    """
+    if value is None:
+        return None
+    parsed = _HHMM_LOOKUP.get(value)
+    if parsed is not None:
+        return parsed
+    cleaned = value.strip().replace(":", "")
+    if not cleaned:
+        return None
+    parsed = _HHMM_LOOKUP.get(cleaned.zfill(4))
+    if parsed is None:
+        raise ValueError(f"Invalid 'HHMM' time string: {value!r}")
+    return parsed
+
+
+def hhmm_to_time(value: Optional[str]) -> Optional[time]:
+    """
+    Convert a well-formed 'HHMM' string to a time, mirroring the SQL-side parsing: malformed values become None.
+
+    Args:
+        value (Optional[str]): The time string.
+
+    Returns:
+        Optional[time]: The time, or None if value is None or not exactly 'HHMM'.
+    """
+    return _HHMM_LOOKUP.get(value) if value is not None else None
+
+
+def parse_hhmm_many(values: Iterable[Optional[str]], strict: bool = False) -> List[Optional[time]]:
+    """
+    Bulk-parse 'HHMM' strings. Well-formed values are resolved with a C-level map over the lookup table;
+    only the leftovers fall back to the tolerant per-value parser.
+
+    Args:
+        values (Iterable[Optional[str]]): The time strings to parse.
+        strict (bool): If True, raise on malformed values. Otherwise malformed values become None.
+
+    Returns:
+        List[Optional[time]]: The parsed times, in the same order as the input.
+    """
+    values = values if isinstance(values, list) else list(values)
+    parsed = list(map(_HHMM_LOOKUP.get, values))
+    for i, result in enumerate(parsed):
+        if result is None and values[i] is not None:
+            try:
+                parsed[i] = parse_hhmm(values[i])
+            except ValueError:
+                if strict:
+                    raise
+    return parsed
+
+
+def format_hhmm(value: Optional[time]) -> Optional[str]:
+    """
+    Format a time object as an 'HHMM' string.
+
+    Args:
+        value (Optional[time]): The time to format.
+
+    Returns:
+        Optional[str]: The 'HHMM' string, or None if value is None.
+    """
+    if value is None:
+        return None
+    return f"{value.hour:02d}{value.minute:02d}"
+
+
+def combine_hhmm(day: Optional[date], value: Optional[str]) -> Optional[datetime]:
+    """
+    Combine a date and an 'HHMM' string into a naive datetime, mirroring the generated `start_ts` columns.
+
+    Args:
+        day (Optional[date]): The date.
+        value (Optional[str]): The 'HHMM' time string.
+
+    Returns:
+        Optional[datetime]: The combined datetime, or None if either part is missing or malformed.
+    """
+    parsed = hhmm_to_time(value)
+    if day is None or parsed is None:
+        return None
+    return datetime.combine(day, parsed)
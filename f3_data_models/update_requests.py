@@ -0,0 +1,422 @@
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import delete, insert, select, tuple_, update
+
+from f3_data_models.models import (
+    Event,
+    EventType_x_Event,
+    Location,
+    Org,
+    Org_Type,
+    Request_Type,
+    Update_Request_Status,
+    UpdateRequest,
+    UpdateRequestArchive,
+)
+from f3_data_models.utils import _notify_write, _require_write_backend, session_scope
+
+APPLIED = "applied"
+CONFLICT = "conflict"
+SKIPPED = "skipped"
+INVALID = "invalid"
+
+# UpdateRequest snapshot fields mapped to the columns they are applied to
+EVENT_FIELDS = {
+    "event_series_id": "series_id",
+    "event_is_active": "is_active",
+    "event_highlight": "highlight",
+    "event_start_date": "start_date",
+    "event_end_date": "end_date",
+    "event_start_time": "start_time",
+    "event_end_time": "end_time",
+    "event_day_of_week": "day_of_week",
+    "event_name": "name",
+    "event_description": "description",
+    "event_recurrence_pattern": "recurrence_pattern",
+    "event_recurrence_interval": "recurrence_interval",
+    "event_index_within_interval": "index_within_interval",
+    "event_meta": "meta",
+    "event_contact_email": "email",
+}
+LOCATION_FIELDS = {
+    "location_name": "name",
+    "location_description": "description",
+    "location_address": "address_street",
+    "location_address2": "address_street2",
+    "location_city": "address_city",
+    "location_state": "address_state",
+    "location_zip": "address_zip",
+    "location_country": "address_country",
+    "location_lat": "latitude",
+    "location_lng": "longitude",
+    "location_contact_email": "email",
+}
+AO_FIELDS = {
+    "ao_name": "name",
+    "ao_logo": "logo_url",
+    "ao_website": "website",
+}
+
+
+@dataclass
+class UpdateRequestOutcome:
+    """
+    The result of applying one update request.
+
+    Attributes:
+        request_id (uuid.UUID): The ID of the update request.
+        status (str): 'applied', 'conflict' (a target row changed after the request was made), 'skipped' (already
+            applied or rejected) or 'invalid'.
+        message (Optional[str]): Why the request was not applied.
+        event_id (Optional[int]): The event created or changed by the request.
+        location_id (Optional[int]): The location created or changed by the request.
+        ao_id (Optional[int]): The AO created or changed by the request.
+    """
+
+    request_id: uuid.UUID
+    status: str
+    message: Optional[str] = None
+    event_id: Optional[int] = None
+    location_id: Optional[int] = None
+    ao_id: Optional[int] = None
+
+
+def _values(request: UpdateRequest, fields: Dict[str, str]) -> Dict[str, Any]:
+    """The columns a request sets. Fields left empty on the request leave the target column unchanged."""
+    return {column: getattr(request, field) for field, column in fields.items() if getattr(request, field) is not None}
+
+
+def _edited_targets(request: UpdateRequest) -> List[str]:
+    """The existing rows ('event', 'location', 'ao') a request writes to, as opposed to only referencing."""
+    if request.request_type == Request_Type.delete_event:
+        return ["event"]
+    if request.request_type == Request_Type.create_location:
+        return ["location"] if request.location_id else []
+    if request.request_type == Request_Type.edit:
+        targets = ["event"]
+        if request.location_id and _values(request, LOCATION_FIELDS):
+            targets.append("location")
+        if request.ao_id and _values(request, AO_FIELDS):
+            targets.append("ao")
+        return targets
+    # New events only reference their location and AO
+    return []
+
+
+def _load_updated(session, model, ids) -> Dict[int, datetime]:
+    if not ids:
+        return {}
+    query = select(model.id, model.updated).where(model.id.in_(ids)).with_for_update()
+    return dict(session.execute(query).tuples().all())
+
+
+def apply_update_requests(
+    request_ids: Sequence[uuid.UUID], reviewed_by: Optional[str] = None, backend: Optional[str] = None
+) -> List[UpdateRequestOutcome]:
+    """
+    Apply a batch of update requests to orgs, locations, events and events_x_event_types in one transaction.
+
+    The batch becomes at most one bulk insert and one bulk update per table (plus one delete and one insert for
+    event types), whatever the number of requests. Pending requests are approved by this call; rejected
+    requests, and requests already applied (stamped with `meta["applied_at"]`), are skipped, so re-running a
+    batch is safe. A request conflicts when the event, location or AO it edits was updated after the request
+    was created, or was edited by an earlier request in the same batch; conflicting requests are left untouched
+    for a reviewer to look at again. Rows a request only references, such as the AO of a new event, are not
+    checked, so many requests for the same AO can be applied together.
+
+    create_location requests create or edit a location only; create_event requests create an event (and a new
+    location and AO when they name them); edit requests edit an event, its location and its AO; delete_event
+    requests deactivate an event.
+
+    Args:
+        request_ids (Sequence[uuid.UUID]): The IDs of the update requests to apply.
+        reviewed_by (Optional[str]): Recorded as the reviewer of requests approved by this call.
+        backend (Optional[str]): The database backend to write to.
+
+    Returns:
+        List[UpdateRequestOutcome]: One outcome per requested ID, in the order given.
+    """
+    _require_write_backend(backend)
+    outcomes: Dict[uuid.UUID, UpdateRequestOutcome] = {
+        request_id: UpdateRequestOutcome(request_id, INVALID, "update request not found") for request_id in request_ids
+    }
+    applied_at = datetime.now(timezone.utc)
+
+    with session_scope(backend=backend) as session:
+        requests = session.scalars(
+            select(UpdateRequest)
+            .where(UpdateRequest.id.in_(list(outcomes)))
+            .order_by(UpdateRequest.created, UpdateRequest.id)
+            .with_for_update()
+        ).all()
+
+        event_updated = _load_updated(session, Event, {r.event_id for r in requests if r.event_id})
+        location_updated = _load_updated(session, Location, {r.location_id for r in requests if r.location_id})
+        ao_updated = _load_updated(session, Org, {r.ao_id for r in requests if r.ao_id})
+        targets = (("event", event_updated), ("location", location_updated), ("ao", ao_updated))
+
+        accepted: List[UpdateRequest] = []
+        edited_in_batch = set()
+        for request in requests:
+            outcome = outcomes[request.id] = UpdateRequestOutcome(
+                request.id, APPLIED, event_id=request.event_id, location_id=request.location_id, ao_id=request.ao_id
+            )
+            if request.status == Update_Request_Status.rejected:
+                outcome.status, outcome.message = SKIPPED, "update request was rejected"
+                continue
+            if (request.meta or {}).get("applied_at"):
+                outcome.status, outcome.message = SKIPPED, "update request was already applied"
+                continue
+            if request.request_type in (Request_Type.edit, Request_Type.delete_event) and not request.event_id:
+                outcome.status, outcome.message = INVALID, f"{request.request_type.name} requests need an event_id"
+                continue
+            if request.request_type == Request_Type.create_event and not request.event_start_date:
+                outcome.status, outcome.message = INVALID, "new events need a start date"
+                continue
+            if request.request_type == Request_Type.create_location and not (
+                request.location_id or request.location_name
+            ):
+                outcome.status, outcome.message = INVALID, "create_location requests need a location_id or name"
+                continue
+            edited = _edited_targets(request)
+            for name, updated in targets:
+                target_id = getattr(outcome, f"{name}_id")
+                if target_id is None:
+                    continue
+                if target_id not in updated:
+                    outcome.status, outcome.message = INVALID, f"{name} {target_id} does not exist"
+                elif name not in edited:
+                    continue
+                elif (name, target_id) in edited_in_batch:
+                    outcome.status, outcome.message = CONFLICT, f"{name} {target_id} was edited earlier in this batch"
+                elif updated[target_id] is not None and updated[target_id] > request.created:
+                    outcome.status, outcome.message = CONFLICT, f"{name} {target_id} changed after the request was made"
+                if outcome.status != APPLIED:
+                    break
+            if outcome.status != APPLIED:
+                continue
+            edited_in_batch.update((name, getattr(outcome, f"{name}_id")) for name in edited)
+            accepted.append(request)
+
+        # Locations first, then AOs (which default to their new location), then events
+        new_locations = [
+            r
+            for r in accepted
+            if r.request_type != Request_Type.delete_event and r.location_id is None and r.location_name
+        ]
+        if new_locations:
+            location_ids = session.scalars(
+                insert(Location).returning(Location.id, sort_by_parameter_order=True),
+                [{**_values(r, LOCATION_FIELDS), "org_id": r.region_id, "is_active": True} for r in new_locations],
+            ).all()
+            for request, location_id in zip(new_locations, location_ids, strict=True):
+                outcomes[request.id].location_id = location_id
+        location_edits = [
+            {**_values(r, LOCATION_FIELDS), "id": r.location_id}
+            for r in accepted
+            if r.location_id is not None
+            and r.request_type in (Request_Type.edit, Request_Type.create_location)
+            and _values(r, LOCATION_FIELDS)
+        ]
+        if location_edits:
+            session.execute(update(Location), location_edits)
+
+        new_aos = [
+            r for r in accepted if r.request_type != Request_Type.create_location and r.ao_id is None and r.ao_name
+        ]
+        if new_aos:
+            ao_ids = session.scalars(
+                insert(Org).returning(Org.id, sort_by_parameter_order=True),
+                [
+                    {
+                        **_values(r, AO_FIELDS),
+                        "parent_id": r.region_id,
+                        "org_type": Org_Type.ao,
+                        "is_active": True,
+                        "default_location_id": outcomes[r.id].location_id,
+                    }
+                    for r in new_aos
+                ],
+            ).all()
+            for request, ao_id in zip(new_aos, ao_ids, strict=True):
+                outcomes[request.id].ao_id = ao_id
+        ao_edits = [
+            {**_values(r, AO_FIELDS), "id": r.ao_id}
+            for r in accepted
+            if r.ao_id is not None and r.request_type == Request_Type.edit and _values(r, AO_FIELDS)
+        ]
+        if ao_edits:
+            session.execute(update(Org), ao_edits)
+
+        new_events = [r for r in accepted if r.request_type == Request_Type.create_event]
+        if new_events:
+            event_ids = session.scalars(
+                insert(Event).returning(Event.id, sort_by_parameter_order=True),
+                [
+                    {
+                        **_values(r, EVENT_FIELDS),
+                        "org_id": outcomes[r.id].ao_id or r.region_id,
+                        "location_id": outcomes[r.id].location_id,
+                    }
+                    for r in new_events
+                ],
+            ).all()
+            for request, event_id in zip(new_events, event_ids, strict=True):
+                outcomes[request.id].event_id = event_id
+        event_edits = []
+        for request in accepted:
+            if request.request_type not in (Request_Type.edit, Request_Type.delete_event):
+                continue
+            if request.request_type == Request_Type.delete_event:
+                event_edits.append({"id": request.event_id, "is_active": False})
+            else:
+                values = {**_values(request, EVENT_FIELDS), "id": request.event_id}
+                if outcomes[request.id].location_id is not None:
+                    values["location_id"] = outcomes[request.id].location_id
+                if outcomes[request.id].ao_id is not None:
+                    values["org_id"] = outcomes[request.id].ao_id
+                event_edits.append(values)
+        if event_edits:
+            session.execute(update(Event), event_edits)
+
+        event_types = {
+            outcomes[r.id].event_id: r.event_type_ids
+            for r in accepted
+            if r.request_type in (Request_Type.create_event, Request_Type.edit) and r.event_type_ids is not None
+        }
+        if event_types:
+            session.execute(delete(EventType_x_Event).where(EventType_x_Event.event_id.in_(list(event_types))))
+            links = [
+                {"event_id": event_id, "event_type_id": event_type_id}
+                for event_id, event_type_ids in event_types.items()
+                for event_type_id in dict.fromkeys(event_type_ids)
+            ]
+            if links:
+                session.execute(insert(EventType_x_Event), links)
+
+        if accepted:
+            session.execute(
+                update(UpdateRequest),
+                [
+                    {
+                        "id": r.id,
+                        "status": Update_Request_Status.approved,
+                        "reviewed_by": r.reviewed_by if r.status == Update_Request_Status.approved else reviewed_by,
+                        "reviewed_at": r.reviewed_at or applied_at.replace(tzinfo=None),
+                        "event_id": outcomes[r.id].event_id,
+                        "location_id": outcomes[r.id].location_id,
+                        "ao_id": outcomes[r.id].ao_id,
+                        "meta": {**(r.meta or {}), "applied_at": applied_at.isoformat()},
+                    }
+                    for r in accepted
+                ],
+            )
+
+    if accepted:
+        _notify_write(Location, Org, Event, EventType_x_Event, UpdateRequest)
+    return [outcomes[request_id] for request_id in request_ids]
+
+
+def region_inbox(
+    region_id: int,
+    status: Update_Request_Status = Update_Request_Status.pending,
+    limit: int = 50,
+    after: Optional[Tuple[datetime, uuid.UUID]] = None,
+    backend: Optional[str] = None,
+) -> List[UpdateRequest]:
+    """
+    Page through a region's update requests, oldest first, using the (region_id, status, created) index.
+
+    Args:
+        region_id (int): The region ID.
+        status (Update_Request_Status): The status to list. Defaults to pending.
+        limit (int): The page size.
+        after (Optional[Tuple[datetime, uuid.UUID]]): The (created, id) of the last request on the previous page.
+        backend (Optional[str]): The database backend to read from.
+
+    Returns:
+        List[UpdateRequest]: The next page of update requests.
+    """
+    query = select(UpdateRequest).where(UpdateRequest.region_id == region_id, UpdateRequest.status == status)
+    if after is not None:
+        query = query.where(tuple_(UpdateRequest.created, UpdateRequest.id) > tuple_(*after))
+    query = query.order_by(UpdateRequest.created, UpdateRequest.id).limit(limit)
+    with session_scope(backend=backend) as session:
+        requests = session.scalars(query).all()
+        session.expunge_all()
+    return list(requests)
+
+
+def find_by_token(
+    token: uuid.UUID, include_archived: bool = True, backend: Optional[str] = None
+) -> Optional[Union[UpdateRequest, UpdateRequestArchive]]:
+    """
+    Look up an update request from the token in an email link.
+
+    Args:
+        token (uuid.UUID): The request token.
+        include_archived (bool): Whether to fall back to the archive when the request is no longer in update_requests.
+        backend (Optional[str]): The database backend to read from.
+
+    Returns:
+        Optional[Union[UpdateRequest, UpdateRequestArchive]]: The request, or None if the token is unknown.
+    """
+    with session_scope(backend=backend) as session:
+        request = session.scalars(select(UpdateRequest).where(UpdateRequest.token == token)).first()
+        if request is None and include_archived:
+            request = session.scalars(select(UpdateRequestArchive).where(UpdateRequestArchive.token == token)).first()
+        session.expunge_all()
+    return request
+
+
+def archive_update_requests(
+    older_than: timedelta = timedelta(days=180), batch_size: int = 5000, backend: Optional[str] = None
+) -> int:
+    """
+    Move approved and rejected update requests that have not changed in `older_than` to update_requests_archive.
+
+    Each batch is a single DELETE ... RETURNING feeding an INSERT, in its own short transaction, so the job can be
+    interrupted and resumed and never holds locks on many rows. Rows locked by other sessions are skipped and
+    picked up on the next run.
+
+    Args:
+        older_than (timedelta): How long a reviewed request stays in update_requests.
+        batch_size (int): The number of requests moved per transaction.
+        backend (Optional[str]): The database backend to write to.
+
+    Returns:
+        int: The number of requests archived.
+    """
+    _require_write_backend(backend)
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - older_than
+    columns = [c.name for c in UpdateRequest.__table__.columns]
+    batch = (
+        select(UpdateRequest.id)
+        .where(
+            UpdateRequest.status.in_([Update_Request_Status.approved, Update_Request_Status.rejected]),
+            UpdateRequest.updated < cutoff,
+        )
+        .order_by(UpdateRequest.updated)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    moved = (
+        delete(UpdateRequest)
+        .where(UpdateRequest.id.in_(batch.scalar_subquery()))
+        .returning(*UpdateRequest.__table__.columns)
+    )
+    stmt = insert(UpdateRequestArchive).from_select(columns, select(*moved.cte("moved").c))
+
+    total = 0
+    while True:
+        with session_scope(backend=backend) as session:
+            count = session.execute(stmt).rowcount
+        total += count
+        if count < batch_size:
+            break
+    if total:
+        _notify_write(UpdateRequest, UpdateRequestArchive)
+    return total
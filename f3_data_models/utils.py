@@ -1,22 +1,36 @@
+import atexit
 import logging
 import os
 import sys
+import threading
+import time
 from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import Generic, List, Optional, Tuple, Type, TypeVar  # noqa
+from typing import Callable, Generic, Iterable, List, Optional, Tuple, Type, TypeVar  # noqa
 
 import sqlalchemy
 from sqlalchemy import Select, and_, inspect, select
-from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.engine import Engine
-from sqlalchemy.orm import class_mapper, joinedload, sessionmaker
+from sqlalchemy.orm import Load, class_mapper, joinedload, load_only, sessionmaker
+from sqlalchemy.orm import defer as orm_defer
 from sqlalchemy.orm.collections import InstrumentedList
+from sqlalchemy.sql.util import find_tables
 
-from f3_data_models.models import Base
+from f3_data_models import partitions  # noqa: F401 (creates event_instances partitions on ORM writes)
+from f3_data_models.cache import QueryCache
+from f3_data_models.models import CONTENT_GROUP, LOAD_PROFILES, Base
+from f3_data_models.queries import QueryRegistry, default_registry
 
-logging_level = logging.DEBUG if os.environ.get("LOG_LEVEL", "INFO").upper() == "DEBUG" else logging.INFO
-logging.getLogger("google.cloud.sql.connector").setLevel(logging_level)
-logging.basicConfig(stream=sys.stdout, level=logging_level)
+
+def configure_logging() -> None:
+    """
+    Log to stdout at the level named by LOG_LEVEL (DEBUG, otherwise INFO), including the Cloud SQL connector's
+    logger. Call once from the application's entry point; importing this module no longer configures logging.
+    """
+    logging_level = logging.DEBUG if os.environ.get("LOG_LEVEL", "INFO").upper() == "DEBUG" else logging.INFO
+    logging.getLogger("google.cloud.sql.connector").setLevel(logging_level)
+    logging.basicConfig(stream=sys.stdout, level=logging_level)
 
 
 @dataclass
@@ -46,13 +60,92 @@ def _default_echo() -> bool:
     return os.environ.get("SQL_ECHO", "False").lower() == "true"
 
 
-def _create_postgresql_engine(echo: bool) -> Engine:
-    host = os.environ["DATABASE_HOST"]
+_CLOUD_SQL_CONNECTOR = None
+_CLOUD_SQL_CONNECTOR_LOCK = threading.Lock()
+
+
+def get_cloud_sql_connector():
+    """
+    Get the process-wide Cloud SQL Python Connector, creating it on first use. It uses lazy refresh, fetching
+    instance metadata and ephemeral certificates only when a connection is opened, which suits Cloud Run and Cloud
+    Functions where CPU is throttled between requests. The connector is closed at exit.
+
+    Returns:
+        google.cloud.sql.connector.Connector: The connector shared by every Cloud SQL engine in the process.
+    """
+    global _CLOUD_SQL_CONNECTOR
+    if _CLOUD_SQL_CONNECTOR is None:
+        with _CLOUD_SQL_CONNECTOR_LOCK:
+            if _CLOUD_SQL_CONNECTOR is None:
+                from google.cloud.sql.connector import Connector
+
+                _CLOUD_SQL_CONNECTOR = Connector(refresh_strategy="lazy")
+                atexit.register(_CLOUD_SQL_CONNECTOR.close)
+    return _CLOUD_SQL_CONNECTOR
+
+
+def create_cloud_sql_engine(
+    instance_connection_name: str,
+    user: str,
+    database: str,
+    password: str | None = None,
+    enable_iam_auth: bool = False,
+    ip_type: str | None = None,
+    connector=None,
+    echo: bool = False,
+    **engine_kwargs,
+) -> Engine:
+    """
+    Create a pg8000 engine whose pool opens connections through the Cloud SQL Python Connector, without the Cloud
+    SQL Auth Proxy.
+
+    Args:
+        instance_connection_name (str): The instance, as 'project:region:instance'.
+        user (str): The database user. With IAM authentication, the IAM principal (e.g. the service account email
+            without '.gserviceaccount.com').
+        database (str): The database name.
+        password (str | None): The password; unused with IAM authentication.
+        enable_iam_auth (bool): Authenticate with the runtime's IAM credentials instead of a password.
+        ip_type (str | None): 'public', 'private' or 'psc'; defaults to the connector's default (public).
+        connector: Any object with the Connector's `connect(instance, driver, **kwargs)` method returning a DB-API
+            connection, e.g. a fake for local testing. Defaults to `get_cloud_sql_connector()`.
+        echo (bool): Whether to log SQL.
+        **engine_kwargs: Passed to `sqlalchemy.create_engine` (e.g. pool_size).
+
+    Returns:
+        Engine: The engine.
+    """
+    connect_kwargs = {"user": user, "db": database, "enable_iam_auth": enable_iam_auth}
+    if password is not None and not enable_iam_auth:
+        connect_kwargs["password"] = password
+    if ip_type is not None:
+        connect_kwargs["ip_type"] = ip_type
+
+    def creator():
+        return (connector or get_cloud_sql_connector()).connect(instance_connection_name, "pg8000", **connect_kwargs)
+
+    return sqlalchemy.create_engine("postgresql+pg8000://", creator=creator, echo=echo, **engine_kwargs)
+
+
+def _create_postgresql_engine(echo: bool, host: str | None = None) -> Engine:
+    host = host or os.environ["DATABASE_HOST"]
     user = os.environ["DATABASE_USER"]
-    passwd = os.environ["DATABASE_PASSWORD"]
     database = os.environ["DATABASE_SCHEMA"]
     port = os.environ.get("DATABASE_PORT", "5432")
 
+    if os.environ.get("USE_CLOUD_SQL_CONNECTOR", "false").lower() == "true":
+        # DATABASE_HOST is the instance connection name, as with USE_GCP_AUTH_PROXY
+        return create_cloud_sql_engine(
+            host,
+            user,
+            database,
+            password=os.environ.get("DATABASE_PASSWORD"),
+            enable_iam_auth=os.environ.get("DATABASE_IAM_AUTH", "false").lower() == "true",
+            ip_type=os.environ.get("CLOUD_SQL_IP_TYPE"),
+            echo=echo,
+        )
+
+    passwd = os.environ["DATABASE_PASSWORD"]
     if os.environ.get("USE_GCP_AUTH_PROXY", "false").lower() == "false":
         db_url = sqlalchemy.engine.URL.create(
             drivername="postgresql",
@@ -111,6 +204,124 @@ def get_session(backend: str | None = None):
     return session_factory()
 
 
+READ_STRATEGIES = {"round_robin", "least_connections"}
+
+
+class ReplicaSet:
+    """
+    Read-only engines for DbManager's read methods.
+
+    Args:
+        engines (List[Engine]): The replica engines.
+        strategy (str): 'round_robin', or 'least_connections' to pick the replica with the fewest checked-out
+            pool connections.
+        stickiness (float): Seconds after a DbManager write during which reads in the same context (thread or
+            asyncio task) still go to the primary, so they see the write despite replication lag.
+    """
+
+    def __init__(self, engines: List[Engine], strategy: str = "round_robin", stickiness: float = 5.0):
+        if not engines:
+            raise ValueError("A ReplicaSet needs at least one engine")
+        if strategy not in READ_STRATEGIES:
+            supported = ", ".join(sorted(READ_STRATEGIES))
+            raise ValueError(f"Unsupported read strategy '{strategy}'. Supported strategies: {supported}")
+        self.engines = list(engines)
+        self.strategy = strategy
+        self.stickiness = stickiness
+        self._session_factories = {engine: sessionmaker(bind=engine) for engine in self.engines}
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, echo: bool = False) -> Optional["ReplicaSet"]:
+        """
+        Build replicas from DATABASE_READ_HOST, a comma-separated list of hosts (or instance connection names)
+        sharing the primary's credentials and connection mode, and DATABASE_READ_STRATEGY.
+
+        Returns:
+            Optional[ReplicaSet]: The replicas, or None if DATABASE_READ_HOST is unset.
+        """
+        hosts = [host.strip() for host in os.environ.get("DATABASE_READ_HOST", "").split(",") if host.strip()]
+        if not hosts:
+            return None
+        return cls(
+            [_create_postgresql_engine(echo=echo, host=host) for host in hosts],
+            strategy=os.environ.get("DATABASE_READ_STRATEGY", "round_robin").lower(),
+        )
+
+    def choose(self) -> Engine:
+        if self.strategy == "least_connections":
+            return min(self.engines, key=lambda engine: getattr(engine.pool, "checkedout", lambda: 0)())
+        with self._lock:
+            engine = self.engines[self._next % len(self.engines)]
+            self._next += 1
+        return engine
+
+    def session(self):
+        return self._session_factories[self.choose()]()
+
+    def dispose(self) -> None:
+        for engine in self.engines:
+            engine.dispose()
+
+
+READ_REPLICAS: Optional[ReplicaSet] = None
+_READ_REPLICAS_LOADED = False
+_PIN_PRIMARY: ContextVar[bool] = ContextVar("pin_primary", default=False)
+_LAST_WRITE: ContextVar[float] = ContextVar("last_write", default=float("-inf"))
+
+
+def configure_read_replicas(replicas: Optional[ReplicaSet]) -> None:
+    """
+    Route DbManager reads to these replicas (or, with None, to the primary). Without a call, replicas are built
+    from DATABASE_READ_HOST on first read.
+    """
+    global READ_REPLICAS, _READ_REPLICAS_LOADED
+    READ_REPLICAS = replicas
+    _READ_REPLICAS_LOADED = True
+
+
+def _read_replicas() -> Optional[ReplicaSet]:
+    global READ_REPLICAS, _READ_REPLICAS_LOADED
+    if not _READ_REPLICAS_LOADED:
+        READ_REPLICAS = ReplicaSet.from_env(echo=_default_echo())
+        _READ_REPLICAS_LOADED = True
+    return READ_REPLICAS
+
+
+@contextmanager
+def use_primary():
+    """Send every DbManager read in this block to the primary, e.g. to read your own writes in a unit of work."""
+    token = _PIN_PRIMARY.set(True)
+    try:
+        yield
+    finally:
+        _PIN_PRIMARY.reset(token)
+
+
+@contextmanager
+def read_session_scope(backend: str | None = None):
+    """
+    Like `session_scope`, for reads that can be served by a read replica. Reads go to the primary inside
+    `use_primary()` and shortly after a DbManager write in the same context.
+    """
+    replicas = _read_replicas() if _normalize_backend(backend) == "postgresql" else None
+    if replicas is None or _PIN_PRIMARY.get() or time.monotonic() - _LAST_WRITE.get() < replicas.stickiness:
+        with session_scope(backend=backend) as session:
+            yield session
+        return
+
+    session = replicas.session()
+    try:
+        yield session
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        raise e
+    finally:
+        session.close()
+
+
 def _require_write_backend(backend: str | None) -> None:
     selected_backend = _normalize_backend(backend)
     if selected_backend in READ_ONLY_BACKENDS:
@@ -133,24 +344,153 @@ def session_scope(backend: str | None = None):
 
 T = TypeVar("T")
 
+QUERY_CACHE: Optional[QueryCache] = None
+WRITE_LISTENERS: List[Callable[[set[str]], None]] = []
+QUERY_REGISTRY: QueryRegistry = default_registry()
+
+
+def configure_query_cache(cache: Optional[QueryCache]) -> None:
+    """Enable (or, with None, disable) result caching for DbManager read methods."""
+    global QUERY_CACHE
+    QUERY_CACHE = cache
+
+
+def add_write_listener(listener: Callable[[set[str]], None]) -> None:
+    """Register a callback receiving the table names written by each committed DbManager write."""
+    if listener not in WRITE_LISTENERS:
+        WRITE_LISTENERS.append(listener)
+
+
+def remove_write_listener(listener: Callable[[set[str]], None]) -> None:
+    if listener in WRITE_LISTENERS:
+        WRITE_LISTENERS.remove(listener)
+
+
+def notify_tables(tables: set[str]) -> None:
+    """
+    Invalidate cached reads of these tables and call the write listeners, for writes made outside DbManager (e.g.
+    by another process, as seen through the change feed).
+    """
+    if QUERY_CACHE is not None:
+        QUERY_CACHE.invalidate(tables)
+    for listener in list(WRITE_LISTENERS):
+        listener(tables)
+
+
+def _notify_write(*classes) -> None:
+    _LAST_WRITE.set(time.monotonic())
+    notify_tables({cls.__tablename__ for cls in classes})
 
-def _joinedloads(cls: T, query: Select, joinedloads: list | str = None) -> Select:
-    if joinedloads is None:
-        return query
+
+def run_query(name: str, backend: str | None = None, **params):
+    """Run a named query from QUERY_REGISTRY (see `queries.default_registry`). Returned objects are detached."""
+    with read_session_scope(backend=backend) as session:
+        result = QUERY_REGISTRY.execute(session, name, **params)
+        session.expunge_all()
+    return result
+
+
+def _relationship_classes(cls, fields) -> set:
+    relationships = class_mapper(cls).relationships
+    keys = {attr if isinstance(attr, str) else attr.key for attr in fields}
+    return {relationships[key].mapper.class_ for key in keys if key in relationships}
+
+
+def _undefer_content(*classes) -> list:
+    return [Load(cls).undefer_group(CONTENT_GROUP) for cls in classes]
+
+
+def _joinedloads(cls: T, query: Select, joinedloads: list | str = None, load_content: bool = True) -> Select:
     if joinedloads == "all":
         joinedloads = [getattr(cls, relationship.key) for relationship in cls.__mapper__.relationships]
-    return query.options(*[joinedload(load) for load in joinedloads])
+    loads = [joinedload(load) for load in joinedloads or []]
+    if load_content:
+        # Records are returned detached, so deferred content can't be loaded on first access later
+        query = query.options(*_undefer_content(cls))
+        loads = [load.undefer_group(CONTENT_GROUP) for load in loads]
+    return query.options(*loads) if loads else query
+
+
+def _load_columns(cls: T, query: Select, only: list = None, defer: list = None, profile: str = None) -> Select:
+    if profile is not None:
+        try:
+            only = [*LOAD_PROFILES[profile][cls], *(only or [])]
+        except KeyError:
+            raise ValueError(f"No '{profile}' load profile for {cls.__name__}") from None
+    if only:
+        query = query.options(load_only(*[getattr(cls, a) if isinstance(a, str) else a for a in only]))
+    if defer:
+        query = query.options(*[orm_defer(getattr(cls, a) if isinstance(a, str) else a) for a in defer])
+    return query
+
+
+def _cache_tags(cls, query: Select, joinedloads: list | str = None) -> set[str]:
+    tags = {table.name for table in find_tables(query, include_aliases=True)} | {cls.__tablename__}
+    if joinedloads == "all":
+        relationships = list(cls.__mapper__.relationships)
+    else:
+        relationships = [load.property for load in joinedloads or []]
+    for relationship in relationships:
+        tags.add(relationship.mapper.local_table.name)
+        if relationship.secondary is not None:
+            tags.add(relationship.secondary.name)
+    return tags
+
+
+def _cache_enabled(cls, use_cache: bool) -> bool:
+    return use_cache and QUERY_CACHE is not None and QUERY_CACHE.is_cacheable(cls)
+
+
+def _cached_read(kind: str, cls, query: Select, joinedloads, backend: str | None, use_cache: bool, loader):
+    if not _cache_enabled(cls, use_cache):
+        return loader()
+    selected_backend = _normalize_backend(backend)
+    return QUERY_CACHE.get_or_load(
+        kind,
+        selected_backend,
+        query,
+        get_engine(backend=selected_backend).dialect,
+        _cache_tags(cls, query, joinedloads),
+        loader,
+    )
 
 
 class DbManager:
     @staticmethod
-    def get(cls: Type[T], id: int, joinedloads: list | str = None, backend: str | None = None) -> T:
-        with session_scope(backend=backend) as session:
-            query = select(cls).filter(cls.id == id)
-            query = _joinedloads(cls, query, joinedloads)
-            record = session.scalars(query).unique().one()
-            session.expunge(record)
-            return record
+    def get(
+        cls: Type[T],
+        id: int,
+        joinedloads: list | str = None,
+        backend: str | None = None,
+        use_cache: bool = True,
+        load_content: bool = True,
+        only: list = None,
+        defer: list = None,
+        profile: str = None,
+    ) -> T:
+        if (
+            joinedloads is None
+            and load_content
+            and not (only or defer or profile)
+            and not _cache_enabled(cls, use_cache)
+        ):
+            # Plain primary key lookups reuse a pre-built statement instead of constructing a new select
+            with read_session_scope(backend=backend) as session:
+                record = QUERY_REGISTRY.execute(session, QUERY_REGISTRY.get_by_id(cls).name, id=id)
+                session.expunge(record)
+                return record
+
+        query = select(cls).filter(cls.id == id)
+        query = _joinedloads(cls, query, joinedloads, load_content)
+        query = _load_columns(cls, query, only, defer, profile)
+
+        def load():
+            with read_session_scope(backend=backend) as session:
+                record = session.scalars(query).unique().one()
+                session.expunge(record)
+                return record
+
+        return _cached_read("get", cls, query, joinedloads, backend, use_cache, load)
 
     @staticmethod
     def find_records(
@@ -158,15 +498,25 @@ class DbManager:
         filters: Optional[List],
         joinedloads: List | str = None,
         backend: str | None = None,
+        use_cache: bool = True,
+        load_content: bool = True,
+        only: list = None,
+        defer: list = None,
+        profile: str = None,
     ) -> List[T]:
-        with session_scope(backend=backend) as session:
-            query = select(cls)
-            query = _joinedloads(cls, query, joinedloads)
-            query = query.filter(*filters)
-            records = session.scalars(query).unique().all()
-            for r in records:
-                session.expunge(r)
-            return records
+        query = select(cls)
+        query = _joinedloads(cls, query, joinedloads, load_content)
+        query = _load_columns(cls, query, only, defer, profile)
+        query = query.filter(*filters)
+
+        def load():
+            with read_session_scope(backend=backend) as session:
+                records = session.scalars(query).unique().all()
+                for r in records:
+                    session.expunge(r)
+                return records
+
+        return _cached_read("find_records", cls, query, joinedloads, backend, use_cache, load)
 
     @staticmethod
     def find_first_record(
@@ -174,20 +524,35 @@ class DbManager:
         filters: Optional[List],
         joinedloads: List | str = None,
         backend: str | None = None,
+        use_cache: bool = True,
+        load_content: bool = True,
+        only: list = None,
+        defer: list = None,
+        profile: str = None,
     ) -> T:
-        with session_scope(backend=backend) as session:
-            query = select(cls)
-            query = _joinedloads(cls, query, joinedloads)
-            query = query.filter(*filters)
-            record = session.scalars(query).unique().first()
-            if record:
-                session.expunge(record)
-            return record
+        query = select(cls)
+        query = _joinedloads(cls, query, joinedloads, load_content)
+        query = _load_columns(cls, query, only, defer, profile)
+        query = query.filter(*filters)
+
+        def load():
+            with read_session_scope(backend=backend) as session:
+                record = session.scalars(query).unique().first()
+                if record:
+                    session.expunge(record)
+                return record
+
+        return _cached_read("find_first_record", cls, query, joinedloads, backend, use_cache, load)
 
     @staticmethod
-    def find_join_records2(left_cls: T, right_cls: T, filters, backend: str | None = None) -> List[Tuple[T]]:
-        with session_scope(backend=backend) as session:
-            result = session.execute(select(left_cls, right_cls).join(right_cls).filter(and_(*filters)))
+    def find_join_records2(
+        left_cls: T, right_cls: T, filters, backend: str | None = None, load_content: bool = True
+    ) -> List[Tuple[T]]:
+        query = select(left_cls, right_cls).join(right_cls).filter(and_(*filters))
+        if load_content:
+            query = query.options(*_undefer_content(left_cls, right_cls))
+        with read_session_scope(backend=backend) as session:
+            result = session.execute(query)
             records = result.all()
             session.expunge_all()
             return records
@@ -200,15 +565,19 @@ class DbManager:
         filters,
         left_join=False,
         backend: str | None = None,
+        load_content: bool = True,
     ) -> List[Tuple[T]]:
-        with session_scope(backend=backend) as session:
-            result = session.execute(
-                select(left_cls, right_cls1, right_cls2)
-                .select_from(left_cls)
-                .join(right_cls1, isouter=left_join)
-                .join(right_cls2, isouter=left_join)
-                .filter(and_(*filters))
-            )
+        query = (
+            select(left_cls, right_cls1, right_cls2)
+            .select_from(left_cls)
+            .join(right_cls1, isouter=left_join)
+            .join(right_cls2, isouter=left_join)
+            .filter(and_(*filters))
+        )
+        if load_content:
+            query = query.options(*_undefer_content(left_cls, right_cls1, right_cls2))
+        with read_session_scope(backend=backend) as session:
+            result = session.execute(query)
             records = result.all()
             session.expunge_all()
             return records
@@ -254,6 +623,7 @@ class DbManager:
                             }
                             related_record = related_class(**{og_primary_key: id, **update_dict})
                             session.add(related_record)
+        _notify_write(cls, *_relationship_classes(cls, fields))
 
     @staticmethod
     def update_records(cls, filters, fields, backend: str | None = None):
@@ -305,6 +675,7 @@ class DbManager:
                                 session.add(related_record)
 
             session.flush()
+        _notify_write(cls, *_relationship_classes(cls, fields))
 
     @staticmethod
     def create_record(record: Base, backend: str | None = None) -> Base:
@@ -313,7 +684,8 @@ class DbManager:
             session.add(record)
             session.flush()
             session.expunge(record)
-            return record  # noqa
+        _notify_write(type(record))
+        return record
 
     @staticmethod
     def create_records(records: List[Base], backend: str | None = None):
@@ -322,10 +694,13 @@ class DbManager:
             session.add_all(records)
             session.flush()
             session.expunge_all()
-            return records  # noqa
+        _notify_write(*{type(record) for record in records})
+        return records
 
     @staticmethod
     def create_or_ignore(cls: T, records: List[Base], backend: str | None = None):
+        from sqlalchemy.dialects.postgresql import insert
+
         _require_write_backend(backend)
         with session_scope(backend=backend) as session:
             for record in records:
@@ -333,9 +708,12 @@ class DbManager:
                 stmt = insert(cls).values(record_dict).on_conflict_do_nothing()
                 session.execute(stmt)
             session.flush()
+        _notify_write(cls)
 
     @staticmethod
     def upsert_records(cls, records, backend: str | None = None):
+        from sqlalchemy.dialects.postgresql import insert
+
         _require_write_backend(backend)
         with session_scope(backend=backend) as session:
             for record in records:
@@ -348,6 +726,7 @@ class DbManager:
                 )
                 session.execute(stmt)
             session.flush()
+        _notify_write(cls)
 
     @staticmethod
     def delete_record(cls: T, id, backend: str | None = None):
@@ -355,18 +734,20 @@ class DbManager:
         with session_scope(backend=backend) as session:
             session.query(cls).filter(cls.id == id).delete()
             session.flush()
+        _notify_write(cls)
 
     @staticmethod
     def delete_records(cls: T, filters, joinedloads: List | str = None, backend: str | None = None):
         _require_write_backend(backend)
         with session_scope(backend=backend) as session:
             query = select(cls)
-            query = _joinedloads(cls, query, joinedloads)
+            query = _joinedloads(cls, query, joinedloads, load_content=False)
             query = query.filter(*filters)
             records = session.scalars(query).unique().all()
             for r in records:
                 session.delete(r)
             session.flush()
+        _notify_write(cls)
 
     @staticmethod
     def execute_sql_query(sql_query, backend: str | None = None):
@@ -0,0 +1,88 @@
+import os
+
+import pytest
+from sqlalchemy import ARRAY, JSON, Column, Computed, MetaData, create_engine, text
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.schema import DefaultClause
+
+from f3_data_models import utils
+from f3_data_models.models import Base
+
+
+@pytest.fixture
+def codex_engine():
+    """An in-memory SQLite database with a codex_entries table."""
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        # search_vector is generated on PostgreSQL; here it is a plain column
+        connection.execute(
+            text(
+                "CREATE TABLE codex_entries (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, definition TEXT NOT NULL,"
+                " type VARCHAR NOT NULL, aliases JSON DEFAULT '[]', video_link VARCHAR, search_vector TEXT,"
+                " created DATETIME DEFAULT CURRENT_TIMESTAMP, updated DATETIME DEFAULT CURRENT_TIMESTAMP)"
+            )
+        )
+    yield engine
+    engine.dispose()
+
+
+def _sqlite_copy(table, metadata):
+    """
+    A copy of `table` that SQLite can create: without expression or partial indexes, generated columns or
+    PostgreSQL-only types.
+    """
+    table = table.to_metadata(metadata)
+    for index in list(table.indexes):
+        if index.dialect_options["postgresql"]["where"] is not None or not all(
+            isinstance(expression, Column) for expression in index.expressions
+        ):
+            table.indexes.discard(index)
+    for column in table.columns:
+        if isinstance(column.server_default, Computed):
+            column.server_default = column.computed = None
+        elif isinstance(column.server_default, DefaultClause) and not isinstance(column.server_default.arg, str):
+            column.server_default = DefaultClause(text("CURRENT_TIMESTAMP"))
+        if isinstance(column.type, ARRAY):
+            column.type = JSON()
+        column.autoincrement = column.autoincrement if len(table.primary_key) == 1 else False
+    return table
+
+
+@pytest.fixture
+def sqlite_database(monkeypatch):
+    """
+    Create the named tables in an in-memory SQLite database, and make it the default DbManager database. Returns
+    the engine.
+    """
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    monkeypatch.setitem(utils.ENGINE_CACHE, (utils._normalize_backend(None), utils._default_echo()), engine)
+    monkeypatch.setattr(utils, "SESSION_FACTORY_CACHE", {})
+
+    def create(*tables):
+        # Every table is copied, so foreign keys resolve, but only the named ones are created
+        metadata = MetaData()
+        copies = {name: _sqlite_copy(table, metadata) for name, table in Base.metadata.tables.items()}
+        metadata.create_all(engine, tables=[copies[name] for name in tables])
+        return engine
+
+    yield create
+    engine.dispose()
+
+
+@pytest.fixture
+def postgresql_engine():
+    """The engine for the database named by the DATABASE_* variables, which should be a scratch database."""
+    if "DATABASE_HOST" not in os.environ:
+        pytest.skip("DATABASE_HOST is not set")
+    from f3_data_models.utils import get_engine
+
+    return get_engine()
+
+
+@pytest.fixture
+def postgresql_connection(postgresql_engine):
+    """A connection in a transaction that is rolled back afterwards."""
+    with postgresql_engine.connect() as connection:
+        transaction = connection.begin()
+        yield connection
+        transaction.rollback()
@@ -0,0 +1,131 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import func, insert, select
+
+from f3_data_models.attendance import record_backblast
+from f3_data_models.models import (
+    Attendance,
+    Attendance_x_AttendanceType,
+    AttendanceArchive,
+    AttendanceType,
+    EventInstance,
+    Org,
+    User,
+)
+
+PAX, Q, CO_Q = 1, 2, 3
+EVENT_DAY = date(2025, 3, 4)
+
+
+@pytest.fixture
+def database(sqlite_database):
+    engine = sqlite_database(
+        "orgs",
+        "users",
+        "event_instances",
+        "attendance",
+        "attendance_types",
+        "attendance_x_attendance_types",
+        "attendance_archive",
+    )
+    with engine.begin() as connection:
+        connection.execute(insert(Org), [{"id": 1, "name": "The Forge", "org_type": "ao", "is_active": True}])
+        connection.execute(
+            insert(User),
+            [{"id": user_id, "f3_name": f"PAX {user_id}", "email": f"{user_id}@f3.test"} for user_id in range(1, 7)],
+        )
+        connection.execute(
+            insert(AttendanceType), [{"id": PAX, "type": "PAX"}, {"id": Q, "type": "Q"}, {"id": CO_Q, "type": "Co-Q"}]
+        )
+        connection.execute(
+            insert(EventInstance),
+            [
+                {"id": instance_id, "org_id": 1, "name": "Beatdown", "start_date": start_date}
+                | {"is_active": True, "highlight": False, "is_private": False}
+                for instance_id, start_date in ((6, date(2025, 3, 1)), (7, EVENT_DAY))
+            ],
+        )
+        # User 1 posted before; user 2 posted before, but only in the archive; user 5 planned to attend
+        connection.execute(
+            insert(Attendance),
+            [
+                {"event_instance_id": 6, "user_id": 1, "is_planned": False, "start_date": date(2025, 3, 1)},
+                {"event_instance_id": 7, "user_id": 5, "is_planned": True, "start_date": EVENT_DAY},
+            ],
+        )
+        archived = datetime(2024, 1, 1)
+        connection.execute(
+            insert(AttendanceArchive),
+            [
+                {"id": 99, "event_instance_id": 1, "user_id": 2, "is_planned": False, "start_date": date(2020, 1, 1)}
+                | {"created": archived, "updated": archived, "archived": archived}
+            ],
+        )
+    return engine
+
+
+def roster(engine, is_planned=False):
+    """Attendance types by user for event instance 7."""
+    with engine.connect() as connection:
+        rows = connection.execute(
+            select(Attendance.user_id, Attendance_x_AttendanceType.attendance_type_id)
+            .outerjoin(Attendance_x_AttendanceType)
+            .where(Attendance.event_instance_id == 7, Attendance.is_planned.is_(is_planned))
+        ).all()
+    types = {}
+    for user_id, attendance_type_id in rows:
+        types.setdefault(user_id, set()).update({attendance_type_id} - {None})
+    return types
+
+
+def counts(engine):
+    with engine.connect() as connection:
+        return connection.execute(select(EventInstance.pax_count, EventInstance.fng_count).filter_by(id=7)).one()
+
+
+def test_records_the_roster_and_counts(database):
+    outcome = record_backblast(7, [1, 2], {3: [Q]})
+    assert (outcome.added, outcome.removed, outcome.retyped) == ([1, 2, 3], [], [])
+    assert roster(database) == {1: {PAX}, 2: {PAX}, 3: {Q}}
+    # Only user 3 has never posted; user 2's earlier post is in the archive
+    assert (outcome.pax_count, outcome.fng_count) == (3, 1)
+    assert tuple(counts(database)) == (3, 1)
+    assert roster(database, is_planned=True) == {5: set()}
+
+
+def test_resubmitting_changes_nothing(database):
+    record_backblast(7, [1, 2], {3: [Q]})
+    with database.connect() as connection:
+        before = connection.execute(select(Attendance.id, Attendance.user_id).order_by(Attendance.id)).all()
+    outcome = record_backblast(7, [2, 1], {3: [Q]})
+    assert (outcome.added, outcome.removed, outcome.retyped) == ([], [], [])
+    assert (outcome.pax_count, outcome.fng_count) == (3, 1)
+    with database.connect() as connection:
+        assert connection.execute(select(Attendance.id, Attendance.user_id).order_by(Attendance.id)).all() == before
+        assert connection.scalar(select(func.count()).select_from(Attendance_x_AttendanceType)) == 3
+
+
+def test_diffs_against_the_recorded_roster(database):
+    record_backblast(7, [1, 2, 3], {3: [Q, PAX]})
+    outcome = record_backblast(7, [3, 4], {3: [CO_Q], 4: [Q]})
+    assert (outcome.added, outcome.removed, outcome.retyped) == ([4], [1, 2], [3])
+    assert roster(database) == {3: {CO_Q}, 4: {Q}}
+    assert (outcome.pax_count, outcome.fng_count) == (2, 2)
+    with database.connect() as connection:
+        assert connection.scalar(select(func.count()).select_from(Attendance_x_AttendanceType)) == 2
+
+
+def test_given_counts_replace_recomputed_ones(database):
+    outcome = record_backblast(7, [1, 3], counts={"pax_count": 9})
+    assert (outcome.pax_count, outcome.fng_count) == (9, 1)
+
+
+def test_rejects_unknown_counts(database):
+    with pytest.raises(ValueError, match="Unknown counts: kotter_count"):
+        record_backblast(7, [1], counts={"kotter_count": 1})
+
+
+def test_rejects_missing_instance(database):
+    with pytest.raises(ValueError, match="Event instance 8 not found"):
+        record_backblast(8, [1])
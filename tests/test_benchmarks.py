@@ -0,0 +1,7 @@
+from f3_data_models.benchmarks import IMPORT_TIME_BUDGET_MS, bench_import_time
+
+
+def test_import_loads_no_drivers_and_stays_within_budget():
+    results = bench_import_time(runs=3, module="f3_data_models.utils")
+    assert results["drivers_loaded"] == 0
+    assert results["p50_ms"] < IMPORT_TIME_BUDGET_MS
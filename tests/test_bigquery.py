@@ -0,0 +1,49 @@
+import pytest
+
+from f3_data_models.bigquery import DuckDBReadBackend, read_arrow, row_restriction
+from f3_data_models.models import EventInstance, Org
+
+
+def test_row_restriction_keeps_like_patterns():
+    assert row_restriction([Org.name.like("F3 %")]) == "(name LIKE 'F3 %')"
+
+
+def test_row_restriction_joins_unqualified_conditions():
+    filters = [EventInstance.org_id == 5, EventInstance.name.in_(["50% off", "a_b"])]
+    assert row_restriction(filters) == "(org_id = 5) AND (name IN ('50% off', 'a_b'))"
+
+
+def test_row_restriction_without_filters():
+    assert row_restriction([]) is None
+
+
+@pytest.fixture
+def duckdb_backend():
+    duckdb = pytest.importorskip("duckdb")
+    pytest.importorskip("pyarrow")
+    connection = duckdb.connect()
+    connection.execute("CREATE TABLE orgs (id INTEGER, name VARCHAR, description VARCHAR)")
+    connection.execute(
+        "INSERT INTO orgs VALUES (1, 'F3 Alpha', 'a'), (2, 'F3 Bravo', 'b'), (3, 'Other', 'c'), (4, 'F3 Delta', 'd')"
+    )
+    yield DuckDBReadBackend(connection, batch_size=2)
+    connection.close()
+
+
+def test_read_arrow_streams_batches(duckdb_backend):
+    read = read_arrow(Org, columns=[Org.id, "name"], filters=[Org.name.like("F3 %")], backend=duckdb_backend)
+    assert read.stats.rows == 0
+    batches = list(read)
+    assert [batch.num_rows for batch in batches] == [2, 1]
+    assert [batch.schema.names for batch in batches] == [["id", "name"]] * 2
+    assert (read.stats.rows, read.stats.batches, read.stats.streams) == (3, 2, 1)
+    assert read.stats.selected_fields == ["id", "name"]
+    assert read.stats.row_restriction == "(name LIKE 'F3 %')"
+
+
+def test_read_arrow_bills_selected_columns_of_the_whole_table(duckdb_backend):
+    everything = read_arrow(Org, backend=duckdb_backend)
+    projected = read_arrow(Org, columns=[Org.id], filters=[Org.id == 1], backend=duckdb_backend)
+    assert 0 < projected.stats.bytes_scanned < everything.stats.bytes_scanned
+    assert projected.to_arrow().to_pydict() == {"id": [1]}
+    assert everything.to_arrow().num_rows == 4
@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from f3_data_models import cache as cache_module
+from f3_data_models import utils
+from f3_data_models.cache import LocalRedisClient, QueryCache, RedisCacheBackend
+from f3_data_models.models import EventTag, EventType
+from f3_data_models.utils import _notify_write, configure_query_cache
+
+DIALECT = postgresql.dialect()
+
+
+class Loader:
+    def __init__(self, value="rows"):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+@pytest.fixture
+def client():
+    return LocalRedisClient()
+
+
+@pytest.fixture
+def query_cache(client):
+    cache = QueryCache(models=[EventType], backend=RedisCacheBackend(client, ttl=60))
+    previous = utils.QUERY_CACHE
+    configure_query_cache(cache)
+    yield cache
+    configure_query_cache(previous)
+
+
+def load(cache, loader, statement=None, backend="postgresql", tags=("event_types",)):
+    statement = select(EventType) if statement is None else statement
+    return cache.get_or_load("find_records", backend, statement, DIALECT, tags, loader)
+
+
+def test_second_read_is_a_hit(query_cache):
+    loader = Loader()
+    assert load(query_cache, loader) == "rows"
+    assert load(query_cache, loader) == "rows"
+    assert loader.calls == 1
+    assert query_cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_write_bumps_the_tag_version(query_cache, client):
+    loader = Loader()
+    load(query_cache, loader)
+    _notify_write(EventType)
+    load(query_cache, loader)
+    assert loader.calls == 2
+    assert client.get("f3:cache:version:event_types") == b"1"
+
+
+def test_write_to_another_table_keeps_the_entry(query_cache):
+    loader = Loader()
+    load(query_cache, loader)
+    _notify_write(EventTag)
+    load(query_cache, loader)
+    assert loader.calls == 1
+
+
+def test_entries_expire(query_cache, monkeypatch):
+    now = cache_module.time.monotonic()
+    loader = Loader()
+    load(query_cache, loader)
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now + 61)
+    load(query_cache, loader)
+    assert loader.calls == 2
+
+
+def test_keys_differ_by_backend_and_statement(query_cache):
+    loader = Loader()
+    load(query_cache, loader)
+    load(query_cache, loader, backend="bigquery")
+    load(query_cache, loader, statement=select(EventType).where(EventType.id == 1))
+    load(query_cache, loader, statement=select(EventType).where(EventType.id == 2))
+    assert loader.calls == 4
+    load(query_cache, loader, statement=select(EventType).where(EventType.id == 2))
+    assert loader.calls == 4
+
+
+def test_clear_only_removes_prefixed_keys(query_cache, client):
+    client.set("other:key", b"kept")
+    load(query_cache, Loader())
+    query_cache.clear()
+    assert client.get("other:key") == b"kept"
+    assert list(client.scan_iter(match="f3:cache:*")) == []
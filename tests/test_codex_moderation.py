@@ -0,0 +1,34 @@
+import pytest
+
+from f3_data_models.codex_moderation import validate_submission
+from f3_data_models.models import CodexUserSubmission
+
+ENTRY = {"title": "Merkin", "definition": "A beard cover", "type": "term"}
+
+
+def submission(submission_type, data):
+    return CodexUserSubmission(submission_type=submission_type, data=data)
+
+
+def test_valid_submissions():
+    assert validate_submission(submission("entry", {**ENTRY, "aliases": ["Face Sweater"], "tags": ["gear"]})) is None
+    assert validate_submission(submission("edit", {"entry_id": 1, "definition": "A wig"})) is None
+    assert validate_submission(submission("tag", {"name": "gear"})) is None
+
+
+@pytest.mark.parametrize("entry_id", [True, False, "1", None, 1.0])
+def test_edit_needs_an_integer_entry_id(entry_id):
+    data = {"entry_id": entry_id, "title": "Merkin"}
+    assert validate_submission(submission("edit", data)) == "edit submissions need an integer entry_id"
+
+
+@pytest.mark.parametrize("key", ["aliases", "tags"])
+@pytest.mark.parametrize("names", [[""], ["gear", "  "], ["gear", 1], "gear"])
+def test_aliases_and_tags_need_non_blank_strings(key, names):
+    for submission_type, data in (("entry", ENTRY), ("edit", {"entry_id": 1})):
+        problem = validate_submission(submission(submission_type, {**data, key: names}))
+        assert problem == f"{key} must be a list of non-blank strings"
+
+
+def test_tag_needs_a_name():
+    assert validate_submission(submission("tag", {"name": " "})) == "tag submissions need a name"
@@ -0,0 +1,56 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from f3_data_models.codex_search import CodexSearchIndex, search_codex
+from f3_data_models.models import CodexEntry
+
+ENTRIES = [
+    CodexEntry(id=1, title="Merkin", definition="A cold weather beard cover", type="term", aliases=["Face Sweater"]),
+    CodexEntry(id=2, title="Burpee", definition="A squat thrust with a jump", type="exercise", aliases=[]),
+    CodexEntry(id=3, title="Mumblechatter", definition="Talk during the beatdown", type="term", aliases=["Chatter"]),
+]
+
+
+@pytest.fixture
+def index():
+    return CodexSearchIndex(ENTRIES)
+
+
+def titles(results):
+    return [entry.title for entry, _ in results]
+
+
+def test_search_tolerates_typos(index):
+    assert titles(index.search("burpe")) == ["Burpee"]
+    assert titles(index.search("Murkin")) == ["Merkin"]
+
+
+def test_search_matches_aliases(index):
+    assert titles(index.search("face sweater")) == ["Merkin"]
+    assert titles(index.search("chatter"))[0] == "Mumblechatter"
+
+
+def test_search_requires_every_word(index):
+    assert titles(index.search("beard cover")) == ["Merkin"]
+    assert index.search("beard jump") == []
+
+
+def test_search_ranks_names_above_definitions(index):
+    index.add(CodexEntry(id=4, title="Cover", definition="Shelter from rain", type="term", aliases=[]))
+    assert titles(index.search("cover")) == ["Cover", "Merkin"]
+
+
+def test_remove_drops_entry(index):
+    index.remove(1)
+    assert index.search("merkin") == []
+    assert index.search("face sweater") == []
+
+
+def test_search_codex_on_a_sqlite_session(codex_engine):
+    with Session(codex_engine) as session:
+        session.add_all(
+            CodexEntry(title=entry.title, definition=entry.definition, type=entry.type, aliases=entry.aliases)
+            for entry in ENTRIES
+        )
+        session.commit()
+        assert titles(search_codex("merkn sweater", session=session)) == ["Merkin"]
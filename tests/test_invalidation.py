@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+from sqlalchemy import text
+
+from f3_data_models.cache import LRUCache
+from f3_data_models.invalidation import CHANNEL, InvalidationListener, parse_payload
+from f3_data_models.utils import add_write_listener, remove_write_listener
+
+
+@pytest.fixture
+def orgs():
+    cache = LRUCache()
+    for org_id in (1, 2, 3):
+        cache.set(org_id, f"org {org_id}")
+    return cache
+
+
+@pytest.fixture
+def listener(orgs):
+    listener = InvalidationListener()
+    listener.register_cache(orgs, "orgs")
+    return listener
+
+
+def test_parse_payload():
+    assert parse_payload("orgs:12") == ("orgs", "12")
+    assert parse_payload("orgs:") == ("orgs", "")
+    assert parse_payload("orgs") == ("orgs", "")
+
+
+def test_dispatch_evicts_notified_rows(listener, orgs):
+    listener.dispatch({"orgs": {"1", "3"}, "locations": {"1"}})
+    assert (1 in orgs, 2 in orgs, 3 in orgs) == (False, True, False)
+
+
+def test_dispatch_clears_on_an_empty_set(listener, orgs):
+    listener.dispatch({"orgs": set()})
+    assert len(orgs) == 0
+
+
+def test_dispatch_leaves_other_tables_alone(listener, orgs):
+    listener.dispatch({"event_types": set()})
+    assert len(orgs) == 3
+
+
+def test_dispatch_clears_on_an_unreadable_id(listener, orgs):
+    listener.dispatch({"orgs": {"1", "not-an-id"}})
+    assert len(orgs) == 0
+
+
+def test_dispatch_calls_subscribers_and_write_listeners(listener):
+    received, written = [], []
+    listener.subscribe(received.append)
+    add_write_listener(written.append)
+    try:
+        listener.dispatch({"orgs": {"1"}})
+        listener.dispatch({})
+    finally:
+        remove_write_listener(written.append)
+    assert received == [{"orgs": {"1"}}]
+    assert written == [{"orgs"}]
+
+
+def test_failing_subscriber_does_not_stop_the_others(listener, orgs):
+    received = []
+
+    def failing(invalidations):
+        raise RuntimeError("boom")
+
+    listener.subscribe(failing)
+    listener.subscribe(received.append)
+    listener.dispatch({"orgs": {"2"}})
+    assert received == [{"orgs": {"2"}}]
+    assert 2 not in orgs
+
+
+@pytest.mark.postgresql
+def test_listener_receives_notifications(postgresql_engine, orgs):
+    received = threading.Event()
+    listener = InvalidationListener(timeout=0.1, reconnect_delay=0.1)
+    listener.register_cache(orgs, "orgs")
+    listener.subscribe(lambda invalidations: "2" in invalidations.get("orgs", ()) and received.set())
+    listener.start()
+    try:
+        # The first dispatch after connecting clears every cache; wait for it, then refill
+        for _ in range(50):
+            if len(orgs) == 0:
+                break
+            received.wait(0.1)
+        orgs.set(1, "org 1")
+        orgs.set(2, "org 2")
+        for _ in range(20):
+            with postgresql_engine.begin() as connection:
+                connection.execute(text("SELECT pg_notify(:channel, 'orgs:2')"), {"channel": CHANNEL})
+            if received.wait(0.5):
+                break
+    finally:
+        listener.stop(1.0)
+    assert received.is_set()
+    assert 2 not in orgs
+    assert 1 in orgs
@@ -0,0 +1,33 @@
+from datetime import time
+
+from sqlalchemy import literal_column, select
+from sqlalchemy.dialects import postgresql
+
+from f3_data_models.models import Event, EventInstance, _hhmm_time_expression, _hhmm_time_sql
+
+
+def render(statement):
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"render_postcompile": True}))
+
+
+def test_time_of_day_queries_match_the_expression_index():
+    rendered = render(_hhmm_time_expression(literal_column("start_time")))
+    # The compiler parenthesizes the condition, which PostgreSQL ignores when matching the index
+    assert f"({rendered})".replace("WHEN (", "WHEN ").replace("') THEN", "' THEN") == _hhmm_time_sql("start_time")
+    for cls in (Event, EventInstance):
+        indexes = {index.name: index for index in cls.__table__.indexes}
+        index = indexes[f"idx_{cls.__tablename__}_start_time_of_day"]
+        assert str(index.expressions[0]) == _hhmm_time_sql("start_time")
+
+
+def test_time_of_day_constants_are_not_bound():
+    statement = select(Event.id).where(Event.start_time_of_day < time(6))
+    rendered = render(statement)
+    assert "substr(events.start_time, 1, 2)" in rendered
+    # Only the compared time is sent as a parameter
+    assert rendered.count("%(") == 1
+
+
+def test_time_of_day_in_python():
+    assert Event(start_time="0530").start_time_of_day == time(5, 30)
+    assert EventInstance(start_time="2460").start_time_of_day is None
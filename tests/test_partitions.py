@@ -0,0 +1,103 @@
+from datetime import date
+from unittest import mock
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import make_transient_to_detached
+
+from f3_data_models.models import EventInstance
+from f3_data_models.partitions import (
+    _KNOWN_PARTITIONS,
+    _ensure_moved_event_instance_partition,
+    _partition_exists,
+    add_months,
+    drop_empty_partitions,
+    ensure_partition,
+    month_range,
+    partition_name,
+)
+
+
+@pytest.fixture(autouse=True)
+def forget_partitions():
+    _KNOWN_PARTITIONS.clear()
+    yield
+    _KNOWN_PARTITIONS.clear()
+
+
+def fake_connection(exists=True, partitions=()):
+    connection = mock.MagicMock()
+    connection.dialect.name = "postgresql"
+    connection.engine.url.render_as_string.return_value = "postgresql://scratch"
+    connection.scalar.return_value = exists
+    connection.scalars.return_value.all.return_value = list(partitions)
+    return connection
+
+
+def test_add_months():
+    assert add_months(date(2025, 1, 31), 1) == date(2025, 2, 1)
+    assert add_months(date(2025, 12, 5), 1) == date(2026, 1, 1)
+    assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert add_months(date(2025, 3, 1), 24) == date(2027, 3, 1)
+
+
+def test_month_range():
+    assert month_range(date(2025, 2, 14)) == (date(2025, 2, 1), date(2025, 3, 1))
+    assert month_range(date(2024, 12, 31)) == (date(2024, 12, 1), date(2025, 1, 1))
+
+
+def test_partition_name():
+    assert partition_name("event_instances", date(2025, 1, 17)) == "event_instances_2025_01"
+
+
+def test_past_partitions_are_remembered_until_dropped():
+    connection = fake_connection(partitions=["event_instances_2020_05", "event_instances_default"])
+    assert _partition_exists(connection, "event_instances", date(2020, 5, 1))
+    assert _partition_exists(connection, "event_instances", date(2020, 5, 1))
+    assert connection.scalar.call_count == 1
+
+    assert drop_empty_partitions(connection, "event_instances", date(2021, 1, 1)) == ["event_instances_2020_05"]
+    connection.scalar.reset_mock()
+    _partition_exists(connection, "event_instances", date(2020, 5, 1))
+    assert connection.scalar.call_count == 1
+
+
+def test_missing_partitions_are_not_remembered():
+    connection = fake_connection(exists=False)
+    assert not _partition_exists(connection, "event_instances", date(2020, 5, 1))
+    assert not _partition_exists(connection, "event_instances", date(2020, 5, 1))
+    assert connection.scalar.call_count == 2
+
+
+def test_update_hook_only_runs_when_start_date_changes():
+    instance = EventInstance(id=1, org_id=1, name="Beatdown", start_date=date(2020, 5, 4))
+    make_transient_to_detached(instance)
+    connection = fake_connection()
+
+    instance.name = "Renamed"
+    _ensure_moved_event_instance_partition(None, connection, instance)
+    connection.scalar.assert_not_called()
+
+    instance.start_date = date(2020, 6, 4)
+    _ensure_moved_event_instance_partition(None, connection, instance)
+    connection.scalar.assert_called_once()
+    assert connection.scalar.call_args.args[1] == {"name": "event_instances_2020_06"}
+
+
+@pytest.mark.postgresql
+def test_partition_created_on_demand(postgresql_connection):
+    connection = postgresql_connection
+    connection.execute(
+        text("CREATE TABLE partitions_test (id integer, start_date date NOT NULL) PARTITION BY RANGE (start_date)")
+    )
+
+    ensure_partition(connection, "partitions_test", date(2020, 5, 17))
+    connection.execute(text("INSERT INTO partitions_test VALUES (1, '2020-05-31')"))
+    assert connection.scalar(text("SELECT to_regclass('partitions_test_2020_05') IS NOT NULL"))
+    # It exists now, so the second call creates nothing
+    ensure_partition(connection, "partitions_test", date(2020, 5, 1))
+
+    assert drop_empty_partitions(connection, "partitions_test", date(2021, 1, 1)) == []
+    connection.execute(text("DELETE FROM partitions_test"))
+    assert drop_empty_partitions(connection, "partitions_test", date(2021, 1, 1)) == ["partitions_test_2020_05"]
+    assert not connection.scalar(text("SELECT to_regclass('partitions_test_2020_05') IS NOT NULL"))
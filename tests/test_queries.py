@@ -0,0 +1,42 @@
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import Session
+
+from f3_data_models.models import CodexEntry, EventInstance
+from f3_data_models.queries import QueryRegistry
+from f3_data_models.utils import _joinedloads
+
+
+def select_list(statement):
+    return str(statement.compile()).split("\nFROM ")[0]
+
+
+def normal_path(cls, id):
+    return _joinedloads(cls, select(cls).filter(cls.id == id))
+
+
+def test_get_by_id_selects_the_columns_of_the_normal_path():
+    registry = QueryRegistry()
+    for cls in (EventInstance, CodexEntry):
+        fast = registry.get_by_id(cls).statement
+        assert select_list(fast) == select_list(normal_path(cls, 1))
+
+
+def test_get_by_id_loads_the_same_attributes_and_reuses_the_compiled_statement(codex_engine):
+    with Session(codex_engine) as session:
+        session.add(CodexEntry(id=1, title="Merkin", definition="A beard cover", type="term", aliases=[]))
+        session.commit()
+
+    registry = QueryRegistry()
+    name = registry.get_by_id(CodexEntry).name
+    with Session(codex_engine) as session:
+        fast = registry.execute(session, name, id=1)
+        assert inspect(fast).unloaded == {"search_vector"}
+    with Session(codex_engine) as session:
+        normal = session.scalars(normal_path(CodexEntry, 1)).unique().one()
+        assert inspect(normal).unloaded == inspect(fast).unloaded
+
+    with Session(codex_engine) as session:
+        assert registry.execute(session, name, id=1).title == "Merkin"
+    stats = registry.stats()
+    assert stats["calls"] == {name: 2}
+    assert (stats["compiled_hits"], stats["compiled_misses"]) == (1, 1)
@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy import event, select
+
+from f3_data_models.models import SlackUser
+from f3_data_models.slack import sync_workspace_users
+
+TEAM = "T0001"
+
+
+def member(slack_id, name, updated, **fields):
+    return {"id": slack_id, "name": name, "updated": updated, "profile": {"display_name": name}, **fields}
+
+
+@pytest.fixture
+def database(sqlite_database):
+    return sqlite_database("slack_users")
+
+
+@pytest.fixture
+def statements(database):
+    executed = []
+    event.listen(database, "before_cursor_execute", lambda *args: executed.append(args[2]))
+    return executed
+
+
+def stored(engine):
+    with engine.connect() as connection:
+        rows = connection.execute(
+            select(SlackUser.slack_id, SlackUser.user_name, SlackUser.slack_updated, SlackUser.is_active).order_by(
+                SlackUser.slack_id
+            )
+        )
+        return {row.slack_id: (row.user_name, row.slack_updated, row.is_active) for row in rows}
+
+
+def test_sync_inserts_updates_and_deactivates(database):
+    summary = sync_workspace_users(TEAM, [member("U1", "Moneyball", 100), member("U2", "Gambit", 100)])
+    assert (summary.inserted, summary.updated, summary.deactivated, summary.unchanged) == (2, 0, 0, 0)
+
+    summary = sync_workspace_users(TEAM, [member("U1", "Money Ball", 200), member("U3", "Dredd", 100)])
+    assert (summary.inserted, summary.updated, summary.deactivated, summary.unchanged) == (1, 1, 1, 0)
+    assert stored(database) == {
+        "U1": ("Money Ball", 200, True),
+        "U2": ("Gambit", 100, False),
+        "U3": ("Dredd", 100, True),
+    }
+
+
+def test_unchanged_stamp_skips_the_comparison(database, statements):
+    sync_workspace_users(TEAM, [member("U1", "Moneyball", 100)])
+    statements.clear()
+    summary = sync_workspace_users(TEAM, [member("U1", "Moneyball", 100)])
+    assert summary.unchanged == 1
+    assert [statement.split()[0] for statement in statements] == ["SELECT"]
+
+
+def test_bumped_stamp_without_changes_only_stores_the_stamp(database, statements):
+    sync_workspace_users(TEAM, [member("U1", "Moneyball", 100)])
+    summary = sync_workspace_users(TEAM, [member("U1", "Moneyball", 150)])
+    assert (summary.updated, summary.unchanged) == (0, 1)
+    assert stored(database) == {"U1": ("Moneyball", 150, True)}
+
+    statements.clear()
+    sync_workspace_users(TEAM, [member("U1", "Moneyball", 150)])
+    assert [statement.split()[0] for statement in statements] == ["SELECT"]